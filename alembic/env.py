@@ -0,0 +1,36 @@
+"""
+Alembic environment.
+
+Ulanish satri va metadata ilovaning o'zidan olinadi (Settings, Base).
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.infrastructure.db.database import Base, engine
+from app.infrastructure.db import models  # noqa: F401 - jadvallarni Base.metadata'ga ro'yxatdan o'tkazish
+
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_online() -> None:
+    """Ilova engine'i orqali migratsiyalarni bajarish."""
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    # Migratsiyalar mavjud sxemani tekshirib ishlaydi (idempotent) - bazaga ulanish shart
+    raise RuntimeError("Offline (--sql) rejim qo'llab-quvvatlanmaydi: migratsiyalar bazaga ulanib bajariladi")
+
+run_migrations_online()
@@ -0,0 +1,75 @@
+"""initial schema: users, transactions, upload_tasks
+
+Avval jadvallar Base.metadata.create_all va migrate_db.py orqali yaratilgan -
+mavjud bazalarda bu revision faqat yetishmayotgan jadval/ustunlarni qo'shadi.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("password_hash", sa.Text(), nullable=True),
+            sa.Column("google_id", sa.String(255), nullable=True, unique=True),
+            sa.Column("auth_provider", sa.String(50), nullable=False),
+            sa.Column("business_type", sa.String(100), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+    elif "business_type" not in {column["name"] for column in inspector.get_columns("users")}:
+        op.add_column("users", sa.Column("business_type", sa.String(100), nullable=True))
+
+    if "transactions" not in tables:
+        op.create_table(
+            "transactions",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("date", sa.DateTime(), nullable=False),
+            sa.Column("amount", sa.DECIMAL(15, 2), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("category", sa.String(100), nullable=True),
+            sa.Column("is_expense", sa.Boolean(), nullable=False),
+            sa.Column("is_fixed", sa.Boolean(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+
+    if "upload_tasks" not in tables:
+        op.create_table(
+            "upload_tasks",
+            sa.Column("id", sa.String(36), primary_key=True),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("progress", sa.Integer(), nullable=False),
+            sa.Column("message", sa.Text(), nullable=True),
+            sa.Column("result", sa.JSON(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("lease_owner", sa.String(255), nullable=True),
+            sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_upload_tasks_updated_at", "upload_tasks", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("upload_tasks")
+    op.drop_table("transactions")
+    op.drop_table("users")
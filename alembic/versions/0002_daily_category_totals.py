@@ -0,0 +1,56 @@
+"""daily_category_totals aggregate table
+
+Jadval yo'q bo'lsa yaratiladi va har doim mavjud tranzaksiyalardan qayta to'ldiriladi:
+jadvalni startup'dagi create_all yaratgan (bo'sh) yoki migratsiyadan oldin yozilgan
+uploadlar uni qisman to'ldirgan bo'lishi mumkin.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if "daily_category_totals" not in sa.inspect(op.get_bind()).get_table_names():
+        _create_table()
+
+    # Backfill (DailyTotalsStore.rebuild bilan bir xil guruhlash) - mavjud qatorlar tranzaksiyalardan qayta quriladi
+    op.execute("DELETE FROM daily_category_totals")
+    op.execute(
+        """
+        INSERT INTO daily_category_totals
+            (user_id, day, category, is_expense, total_amount, txn_count, min_amount, max_amount)
+        SELECT user_id, date(date), coalesce(category, ''), is_expense,
+               sum(amount), count(*), min(amount), max(amount)
+        FROM transactions
+        GROUP BY user_id, date(date), coalesce(category, ''), is_expense
+        """
+    )
+
+
+def _create_table() -> None:
+    op.create_table(
+        "daily_category_totals",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("category", sa.String(100), primary_key=True),
+        sa.Column("is_expense", sa.Boolean(), primary_key=True),
+        sa.Column("total_amount", sa.DECIMAL(18, 2), nullable=False),
+        sa.Column("txn_count", sa.Integer(), nullable=False),
+        sa.Column("min_amount", sa.DECIMAL(15, 2), nullable=True),
+        sa.Column("max_amount", sa.DECIMAL(15, 2), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_category_totals")
@@ -0,0 +1,40 @@
+"""composite indexes for per-user time-range access on transactions
+
+PostgreSQL'da indekslar CONCURRENTLY quriladi - katta jadvalga yozish bloklanmaydi.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    "ix_transactions_user_id_date": ["user_id", "date"],
+    "ix_transactions_user_id_category_date": ["user_id", "category", "date"],
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = {index["name"] for index in sa.inspect(bind).get_indexes("transactions")}
+    concurrently = bind.dialect.name == "postgresql"
+
+    # CONCURRENTLY tranzaksiya ichida ishlamaydi
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            if name not in existing:
+                op.create_index(name, "transactions", columns, postgresql_concurrently=concurrently)
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.drop_index(name, table_name="transactions")
@@ -1,8 +1,12 @@
 
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from datetime import datetime, timedelta
 
+# Bir kun (nanosekundlarda) - sanalarni kun raqamiga aylantirish uchun
+DAY_NS = 86_400_000_000_000
+
 class AnalyticsService:
     """
     Dashboard analitikasi va ma'lumotlarni agregatsiya qilish servisi.
@@ -22,29 +26,14 @@ class AnalyticsService:
         if df.empty:
             return df
 
-        # Hozirgi sana
-        now = datetime.now()
-        
-        # Filtrlash mantiqi
-        if filter_type == 'last_7_days':
-            cutoff = now - timedelta(days=7)
-            df = df[df['date'] >= cutoff]
-        elif filter_type == 'this_month':
-            cutoff = now.replace(day=1)
-            df = df[df['date'] >= cutoff]
-        elif filter_type == 'last_month':
-            first_day_this_month = now.replace(day=1)
-            last_day_last_month = first_day_this_month - timedelta(days=1)
-            first_day_last_month = last_day_last_month.replace(day=1)
-            df = df[(df['date'] >= first_day_last_month) & (df['date'] <= last_day_last_month)]
-        elif filter_type == 'this_year':
-            cutoff = now.replace(month=1, day=1)
-            df = df[df['date'] >= cutoff]
-        elif filter_type == 'custom':
-            if start_date:
-                df = df[df['date'] >= pd.to_datetime(start_date)]
-            if end_date:
-                df = df[df['date'] <= pd.to_datetime(end_date)]
+        # Sana oralig'i (chegaralar ichida)
+        period_start, period_end = self.resolve_period(filter_type, start_date, end_date)
+        if period_start is not None and period_end is not None:
+            df = df[(df['date'] >= period_start) & (df['date'] <= period_end)]
+        elif period_start is not None:
+            df = df[df['date'] >= period_start]
+        elif period_end is not None:
+            df = df[df['date'] <= period_end]
         
         # Additional filters
         if 'category' in kwargs and kwargs['category']:
@@ -58,68 +47,110 @@ class AnalyticsService:
                 
         return df
 
-    def get_dashboard_data(self, transactions: List[Dict[str, Any]], filter_type: str, start_date: str = None, end_date: str = None, **kwargs) -> Dict[str, Any]:
+    def resolve_period(self, filter_type: str, start_date: str = None, end_date: str = None):
+        """
+        Filtr turi uchun sana oralig'i (start, end) - ikkala chegara ham kiradi, None - chegara yo'q.
+        filter_transactions va SQL darajasidagi filtrlash (transaction_loader) shu oraliqdan foydalanadi.
+        """
+        # Hozirgi sana
+        now = datetime.now()
+        
+        if filter_type == 'last_7_days':
+            return now - timedelta(days=7), None
+        if filter_type == 'this_month':
+            return now.replace(day=1), None
+        if filter_type == 'last_month':
+            first_day_this_month = now.replace(day=1)
+            last_day_last_month = first_day_this_month - timedelta(days=1)
+            first_day_last_month = last_day_last_month.replace(day=1)
+            return first_day_last_month, last_day_last_month
+        if filter_type == 'this_year':
+            return now.replace(month=1, day=1), None
+        if filter_type == 'custom':
+            return (
+                pd.to_datetime(start_date) if start_date else None,
+                pd.to_datetime(end_date) if end_date else None,
+            )
+        return None, None
+
+    def get_dashboard_data(self, transactions: Union[pd.DataFrame, List[Dict[str, Any]]], filter_type: str, start_date: str = None, end_date: str = None, **kwargs) -> Dict[str, Any]:
         """
         Dashboard uchun tayyor ma'lumotlarni qaytaradi.
+        transactions: transaction_loader DataFrame'i, kunlik agregat (daily_totals) DataFrame'i
+        yoki dict'lar ro'yxati. Agregatda amount - kunlik summa, shuning uchun
+        min_amount/max_amount filtrlari xom tranzaksiyalarni talab qiladi: ular transactions'da
+        yoki kwargs['rows']da (masalan, davr va kategoriya bo'yicha bazada filtrlangan qatorlar) beriladi.
+
+        Qatorlar bir marta (is_expense, category, date) bo'yicha guruhlanadi; balans,
+        KPI'lar, o'sish, kategoriya tafsilotlari va trend shu kichik jadvaldan olinadi.
         """
-        # DataFrame yaratish
-        df_all = pd.DataFrame(transactions)
+        df_all = self._to_frame(transactions)
         
-        # Ensure date column is datetime objects for comparison
-        if not df_all.empty and 'date' in df_all.columns:
-            df_all['date'] = pd.to_datetime(df_all['date'])
+        # 1. Yagona agregatsiya (barcha vaqtlar uchun)
+        grouped_all = self._group(df_all)
         
-        # 1. Current Balance (Joriy Qoldiq - Barcha vaqtlar uchun)
-        # 1. Real Current Balance (Joriy Qoldiq - Barcha vaqtlar uchun, filtrlardan qat'iy nazar)
-        current_balance = 0
-        if not df_all.empty:
-            # Type casting agar kerak bo'lsa
-            # df_all['amount'] = pd.to_numeric(df_all['amount']) # bular allaqachon float bo'lishi kerak
-            
-            # Real balansni hisoblash (barcha tranzaksiyalar)
-            total_inc_all = df_all[df_all['is_expense'] == False]['amount'].sum()
-            total_exp_all = df_all[df_all['is_expense'] == True]['amount'].sum()
-            current_balance = total_inc_all - total_exp_all
+        return self._build_dashboard(df_all, grouped_all, filter_type, start_date, end_date, **kwargs)
+
+    def get_dashboard_batch(self, transactions: Union[pd.DataFrame, List[Dict[str, Any]]], filters: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Bir nechta filtr uchun dashboardlar (filters - get_dashboard_data argumentlari: filter_type,
+        start_date, end_date, category, min_amount, max_amount). Qatorlar faqat bir marta
+        guruhlanadi; natijalar filters tartibida qaytariladi.
+        """
+        df_all = self._to_frame(transactions)
+        grouped_all = self._group(df_all)
+        
+        dashboards = []
+        for spec in filters:
+            spec = dict(spec)
+            filter_type = spec.pop('filter_type', 'this_month')
+            start_date, end_date = spec.pop('start_date', None), spec.pop('end_date', None)
+            dashboards.append(self._build_dashboard(df_all, grouped_all, filter_type, start_date, end_date, **spec))
+        return dashboards
+
+    def _build_dashboard(self, df_all: pd.DataFrame, grouped_all: pd.DataFrame, filter_type: str, start_date: str = None, end_date: str = None, **kwargs) -> Dict[str, Any]:
+        """Bitta filtr uchun dashboard (df_all - kirish qatorlari, grouped_all - ularning _group natijasi)."""
+        # Real Current Balance (Joriy Qoldiq - Barcha vaqtlar uchun, filtrlardan qat'iy nazar)
+        flags_all = grouped_all['is_expense'].to_numpy(dtype=bool)
+        amounts_all = grouped_all['amount'].to_numpy(dtype=float)
+        current_balance = amounts_all[~flags_all].sum() - amounts_all[flags_all].sum()
+        
+        # Summa filtrlari alohida tranzaksiyalarga tegishli - ular bo'lsa filtrlangan qatorlar qayta guruhlanadi.
+        # rows - bazada oldindan filtrlangan xom qatorlar (transactions esa kunlik agregat bo'lishi mumkin)
+        min_amount, max_amount = kwargs.get('min_amount'), kwargs.get('max_amount')
+        rows = kwargs.get('rows')
+        if min_amount is not None or max_amount is not None:
+            source = df_all if rows is None else rows
+            grouped = self._group(self.filter_transactions(source, None, min_amount=min_amount, max_amount=max_amount))
+        else:
+            grouped = grouped_all
         
-        # Filterlash (df_all dan foydalanib)
-        df = self.filter_transactions(df_all, filter_type, start_date, end_date, **kwargs)
+        # Sana va kategoriya filtrlari guruhlangan jadvalda (date va category - guruh kalitlari)
+        df = self.filter_transactions(grouped, filter_type, start_date, end_date, category=kwargs.get('category'))
         
         if df.empty:
              empty = self._empty_dashboard()
              empty['current_balance'] = float(current_balance)
              return empty
 
+        # Qolgan hisoblar guruhlangan jadval ustunlarida (numpy massivlar)
+        flags = df['is_expense'].to_numpy(dtype=bool)
+        amounts = df['amount'].to_numpy(dtype=float)
+        dates = df['date'].to_numpy(dtype='datetime64[ns]')
+
         # Asosiy ko'rsatkichlar (KPIs)
-        total_income = df[df['is_expense'] == False]['amount'].sum()
-        total_expense = df[df['is_expense'] == True]['amount'].sum()
+        total_income = amounts[~flags].sum()
+        total_expense = amounts[flags].sum()
         net_profit = total_income - total_expense
-        
-        # O'rtacha ko'rsatkichlar
-        avg_income = df[df['is_expense'] == False]['amount'].mean() if not df[df['is_expense'] == False].empty else 0
-        avg_expense = df[df['is_expense'] == True]['amount'].mean() if not df[df['is_expense'] == True].empty else 0
 
-        # 2. Growth Percentage (O'sish dinamikasi)
+        # 2. Growth Percentage (O'sish dinamikasi) - o'tgan davr bilan solishtirish
         growth_percentage = 0.0
         try:
-            # O'tgan davrni aniqlash
-            prev_start = None
-            prev_end = None
-            now = datetime.now()
-            
-            if filter_type == 'this_month':
-                # O'tgan oy
-                first_this = now.replace(day=1)
-                prev_end = first_this - timedelta(days=1)
-                prev_start = prev_end.replace(day=1)
-            elif filter_type == 'last_7_days':
-                # Oldingi 7 kun
-                start_curr = now - timedelta(days=7)
-                prev_end = start_curr - timedelta(days=1)
-                prev_start = prev_end - timedelta(days=7)
-            
-            if prev_start and prev_end and not df_all.empty:
-                prev_df = df_all[(df_all['date'] >= prev_start) & (df_all['date'] <= prev_end)]
-                prev_income = prev_df[prev_df['is_expense'] == False]['amount'].sum()
+            prev_start, prev_end = self._previous_period(filter_type)
+            if prev_start and prev_end:
+                dates_all = grouped_all['date'].to_numpy(dtype='datetime64[ns]')
+                in_prev = (dates_all >= np.datetime64(prev_start)) & (dates_all <= np.datetime64(prev_end))
+                prev_income = amounts_all[in_prev & ~flags_all].sum()
                 
                 if prev_income > 0:
                     growth_percentage = ((total_income - prev_income) / prev_income) * 100
@@ -128,118 +159,53 @@ class AnalyticsService:
         except Exception as e:
             print(f"Growth calc error: {e}")
 
-        # Chart 1: Categories Breakdown (Pie Chart) - Faqat xarajatlar
-        expenses_df = df[df['is_expense'] == True]
-        if not expenses_df.empty:
-            cat_groups = expenses_df.groupby('category')['amount'].sum().sort_values(ascending=False)
-            pie_chart = {
-                'labels': cat_groups.index.tolist(),
-                'series': cat_groups.values.tolist()
-            }
-        else:
-            pie_chart = {'labels': [], 'series': []}
-
-        # Chart 2: Income vs Expense Trend (List[ChartPoint]) - Full Date Range Logic
-        resample_rule = 'D'
-        date_format = '%Y-%m-%d'
-        
-        # Sana oraliqlarini aniqlash (to'liq chart chizish uchun)
-        now = datetime.now()
-        chart_start_date = now - timedelta(days=30) # Default
-        chart_end_date = now
-
-        if filter_type == 'last_7_days':
-            chart_end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-            chart_start_date = (now - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
-        elif filter_type == 'this_month':
-            # Oyning boshi va oxiri
-            chart_start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Find last day of month
-            next_month = now.replace(day=28) + timedelta(days=4)
-            chart_end_date = (next_month - timedelta(days=next_month.day)).replace(hour=23, minute=59, second=59, microsecond=999999)
-            
-        elif filter_type == 'last_month':
-            first_this = now.replace(day=1)
-            chart_end_date = (first_this - timedelta(days=1)).replace(hour=23, minute=59, second=59, microsecond=999999)
-            chart_start_date = chart_end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        elif filter_type == 'custom' and start_date and end_date:
-            chart_start_date = pd.to_datetime(start_date).replace(hour=0, minute=0, second=0, microsecond=0)
-            chart_end_date = pd.to_datetime(end_date).replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        # Fix for 'this_year' specifically
-        if filter_type == 'this_year':
-             resample_rule = 'ME' # Reduce to 12 points as user requested "not squeezed"
-             date_format = '%b'   # Show Month Name (Jan, Feb...)
-             chart_start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-             chart_end_date = now.replace(month=12, day=31, hour=23, minute=59, second=59, microsecond=999999)
-        
-        # Override specifically to fix the bug (redundant block removed, merged above)
-
-        # Full date range yaratish
+        # Chart: Income vs Expense Trend (List[ChartPoint]) - to'liq sana oralig'i, bo'sh kunlar 0
+        chart_start_date, chart_end_date, resample_rule, date_format = self._chart_range(filter_type, start_date, end_date)
         full_idx = pd.date_range(start=chart_start_date, end=chart_end_date, freq=resample_rule)
         
-        # Resample and fill missing dates with 0 via reindex
-        # 1. Group by date and sum
-        if not df.empty:
-             # Create a dedicated chart dataframe to avoid SettingWithCopyWarning
-             chart_df = df.copy()
-             chart_df['date'] = pd.to_datetime(chart_df['date'])
-             
-             # Normalize chart_df dates to remove any potential time part (crucial!)
-             # For Monthly resampling, normalize is good but resample('ME') handles days automatically.
-             # However, let's keep it clean.
-             chart_df['date'] = chart_df['date'].dt.normalize()
-
-             income_grouped = chart_df[chart_df['is_expense'] == False].set_index('date').resample(resample_rule)['amount'].sum()
-             expense_grouped = chart_df[chart_df['is_expense'] == True].set_index('date').resample(resample_rule)['amount'].sum()
-             
-             # 2. Reindex with full range
-             # Normalize full_idx just in case? pd.date_range with start/end normalized should be creating normalized range if freq=D.
-             # But our fix above ensures start/end are normalized.
-             
-             income_trend = income_grouped.reindex(full_idx, fill_value=0)
-             expense_trend = expense_grouped.reindex(full_idx, fill_value=0)
-        else:
-             # Agar df bo'sh bo'lsa, hammasi 0 bo'lgan series yaratamiz
-             income_trend = pd.Series(0, index=full_idx)
-             expense_trend = pd.Series(0, index=full_idx)
-        
-        trend_df = pd.DataFrame({'income': income_trend, 'expense': expense_trend})
-        trend_df['net_change'] = trend_df['income'] - trend_df['expense']
+        # Har bir guruhning grafikdagi nuqtasi: kun yoki oy oxiri (resample 'ME' yorlig'i)
+        buckets = dates.astype('datetime64[D]')
+        if resample_rule == 'ME':
+            buckets = (dates.astype('datetime64[M]') + 1).astype('datetime64[D]') - np.timedelta64(1, 'D')
+        positions = full_idx.get_indexer(buckets.astype('datetime64[ns]'))
+        in_chart = positions >= 0
+        income_trend = np.bincount(positions[in_chart & ~flags], weights=amounts[in_chart & ~flags], minlength=len(full_idx))
+        expense_trend = np.bincount(positions[in_chart & flags], weights=amounts[in_chart & flags], minlength=len(full_idx))
         
-        chart_points = []
-        for date, row in trend_df.iterrows():
-            chart_points.append({
-                "date": date.strftime(date_format),
-                "income": float(row['income']),
-                "expense": float(row['expense']),
-                "net_change": float(row['net_change'])
-            })
+        chart_points = [
+            {"date": label, "income": income, "expense": expense, "net_change": income - expense}
+            for label, income, expense in zip(
+                full_idx.strftime(date_format).tolist(),
+                income_trend.tolist(),
+                expense_trend.tolist(),
+            )
+        ]
+
+        # Kategoriya tafsilotlari (kategoriyasiz guruhlar kirmaydi)
+        category_codes = df['category'].cat.codes.to_numpy()
+        categories = df['category'].cat.categories
 
-        # Details helpers
-        def get_category_details(sub_df, total):
-            if sub_df.empty or total == 0:
+        def get_category_details(mask: np.ndarray, total: float) -> List[Dict[str, Any]]:
+            mask = mask & (category_codes >= 0)
+            if total == 0 or not mask.any():
                 return []
-            groups = sub_df.groupby('category')['amount'].sum().sort_values(ascending=False)
-            details = []
-            for cat, amount in groups.items():
-                details.append({
-                    'category': cat,
-                    'amount': float(amount),
-                    'percentage': round((amount / total) * 100, 1)
-                })
-            return details
+            counts = np.bincount(category_codes[mask], minlength=len(categories))
+            sums = np.bincount(category_codes[mask], weights=amounts[mask], minlength=len(categories))
+            present = np.flatnonzero(counts)
+            order = present[np.argsort(-sums[present], kind='stable')]
+            percentages = np.round((sums[order] / total) * 100, 1)
+            return [
+                {'category': category, 'amount': amount, 'percentage': percentage}
+                for category, amount, percentage in zip(categories[order].tolist(), sums[order].tolist(), percentages.tolist())
+            ]
 
-        income_details = get_category_details(df[df['is_expense'] == False], total_income)
-        expense_details = get_category_details(df[df['is_expense'] == True], total_expense)
+        income_details = get_category_details(~flags, total_income)
+        expense_details = get_category_details(flags, total_expense)
 
         # 3. Top Expenses (Top 3)
         top_expenses = expense_details[:3]
         
-        # Calculate daily averages (non-zero days only or total period?)
-        # User wants "Linear AVG". total / period_length seems appropriate for visual reference.
-        # Or better: average of non-zero days? Usually financial planning uses total / days.
-        # Let's use simple average over the period.
+        # Kunlik o'rtacha: davr summasi / davr uzunligi (kunlarda)
         period_days = (chart_end_date - chart_start_date).days + 1
         avg_daily_income = total_income / period_days if period_days > 0 else 0
         avg_daily_expense = total_expense / period_days if period_days > 0 else 0
@@ -265,6 +231,134 @@ class AnalyticsService:
             }
         }
 
+    def _group(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Qatorlarni (is_expense, category, date) bo'yicha summalash.
+        Kategoriyasiz qatorlar ham saqlanadi (balans va jami summalar uchun).
+
+        Har bir guruh bitta butun son kalitga kodlanadi va np.bincount bilan summalanadi -
+        ko'p ustunli pandas groupby'dan bir necha barobar tez.
+        """
+        if df.empty:
+            return pd.DataFrame({
+                'is_expense': pd.Series(dtype=bool),
+                'category': pd.Series(dtype=object),
+                'date': pd.Series(dtype='datetime64[ns]'),
+                'amount': pd.Series(dtype=float),
+            })
+        
+        # Sana kodlari: kun aniqligidagi sanalar (loader va agregat frame'lari) hash'siz - kun raqami bo'yicha
+        dates = df['date'] if pd.api.types.is_datetime64_any_dtype(df['date']) else pd.to_datetime(df['date'])
+        date_ns = dates.to_numpy(dtype='datetime64[ns]').view('i8')
+        first_day = None
+        days = date_ns // DAY_NS
+        # NaT (int64 minimumi) kunga karrali emas - bunday frame factorize yo'lidan ketadi
+        if np.array_equal(days * DAY_NS, date_ns):
+            first_day = days.min()
+            date_codes = days - first_day
+            n_dates = int(date_codes.max()) + 1
+        else:
+            date_codes, date_values = pd.factorize(date_ns)
+            n_dates = len(date_values)
+        
+        # Kategoriya kodlari; oxirgi kod - kategoriyasiz (NaN)
+        if 'category' not in df.columns:
+            cat_codes, cat_values = np.full(len(df), -1), pd.Index([])
+        elif isinstance(df['category'].dtype, pd.CategoricalDtype):
+            cat_codes, cat_values = df['category'].cat.codes.to_numpy(), df['category'].cat.categories
+        else:
+            cat_codes, cat_values = pd.factorize(df['category'])
+        n_cats = len(cat_values) + 1
+        cat_codes = np.where(cat_codes < 0, n_cats - 1, cat_codes)
+        
+        flags = df['is_expense'].to_numpy(dtype=bool)
+        amounts = pd.to_numeric(df['amount']).to_numpy(dtype=float)
+        if np.isnan(amounts).any():
+            amounts = np.nan_to_num(amounts)
+        
+        key = date_codes.astype(np.int64)
+        key *= n_cats
+        key += cat_codes
+        key *= 2
+        key += flags
+        # Sana oralig'i juda keng bo'lsa (siyrak kalitlar) - kalitlarni zichlashtiramiz
+        if n_dates * n_cats * 2 > max(4 * len(key), 1 << 20):
+            codes, key_values = pd.factorize(key)
+        else:
+            codes, key_values = key, None
+        counts = np.bincount(codes)
+        sums = np.bincount(codes, weights=amounts)
+        present = np.flatnonzero(counts)
+        group_keys = present if key_values is None else key_values[present]
+        
+        group_dates, rest = np.divmod(group_keys // 2, n_cats)
+        group_cats = np.where(rest == n_cats - 1, -1, rest)
+        if first_day is not None:
+            group_dates = ((group_dates + first_day) * DAY_NS).astype('datetime64[ns]')
+        else:
+            group_dates = date_values[group_dates].astype('datetime64[ns]')
+        
+        return pd.DataFrame({
+            'is_expense': (group_keys % 2).astype(bool),
+            'category': pd.Categorical.from_codes(group_cats, categories=cat_values),
+            'date': group_dates,
+            'amount': sums[present],
+        })
+
+    def _previous_period(self, filter_type: str):
+        """O'sish foizi uchun solishtiriladigan oldingi davr (bo'lmasa - (None, None))."""
+        now = datetime.now()
+        
+        if filter_type == 'this_month':
+            # O'tgan oy
+            first_this = now.replace(day=1)
+            prev_end = first_this - timedelta(days=1)
+            return prev_end.replace(day=1), prev_end
+        if filter_type == 'last_7_days':
+            # Oldingi 7 kun
+            start_curr = now - timedelta(days=7)
+            prev_end = start_curr - timedelta(days=1)
+            return prev_end - timedelta(days=7), prev_end
+        return None, None
+
+    def _chart_range(self, filter_type: str, start_date: str = None, end_date: str = None):
+        """Trend grafigi oralig'i, resample qoidasi va sana formati."""
+        resample_rule = 'D'
+        date_format = '%Y-%m-%d'
+        
+        now = datetime.now()
+        chart_start_date = now - timedelta(days=30) # Default
+        chart_end_date = now
+
+        if filter_type == 'last_7_days':
+            chart_end_date = now.replace(hour=23, minute=59, second=59, microsecond=999999)
+            chart_start_date = (now - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0)
+        elif filter_type == 'this_month':
+            # Oyning boshi va oxiri
+            chart_start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            next_month = now.replace(day=28) + timedelta(days=4)
+            chart_end_date = (next_month - timedelta(days=next_month.day)).replace(hour=23, minute=59, second=59, microsecond=999999)
+        elif filter_type == 'last_month':
+            first_this = now.replace(day=1)
+            chart_end_date = (first_this - timedelta(days=1)).replace(hour=23, minute=59, second=59, microsecond=999999)
+            chart_start_date = chart_end_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        elif filter_type == 'custom' and start_date and end_date:
+            chart_start_date = pd.to_datetime(start_date).replace(hour=0, minute=0, second=0, microsecond=0)
+            chart_end_date = pd.to_datetime(end_date).replace(hour=23, minute=59, second=59, microsecond=999999)
+        elif filter_type == 'this_year':
+            resample_rule = 'ME' # 12 ta nuqta (oylar)
+            date_format = '%b'   # Show Month Name (Jan, Feb...)
+            chart_start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+            chart_end_date = now.replace(month=12, day=31, hour=23, minute=59, second=59, microsecond=999999)
+
+        return chart_start_date, chart_end_date, resample_rule, date_format
+
+    def _to_frame(self, transactions: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
+        """Kirish ma'lumotini DataFrame'ga aylantirish (DataFrame nusxalanmaydi - servis uni o'zgartirmaydi)."""
+        if isinstance(transactions, pd.DataFrame):
+            return transactions
+        return pd.DataFrame(transactions)
+
     def _empty_dashboard(self):
         return {
             "current_balance": 0.0,
@@ -280,11 +374,11 @@ class AnalyticsService:
             }
         }
 
-    def get_filter_options(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def get_filter_options(self, transactions: Union[pd.DataFrame, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """
         Tranzaksiyalardan filtrlash uchun kerakli ma'lumotlarni yig'adi.
         """
-        df = pd.DataFrame(transactions)
+        df = self._to_frame(transactions)
         
         if df.empty:
             return {
@@ -300,14 +394,18 @@ class AnalyticsService:
         categories.sort()
         
         # Sanalar check
-        df['date'] = pd.to_datetime(df['date'])
-        min_date = df['date'].min().strftime('%Y-%m-%d')
-        max_date = df['date'].max().strftime('%Y-%m-%d')
+        dates = pd.to_datetime(df['date'])
+        min_date = dates.min().strftime('%Y-%m-%d')
+        max_date = dates.max().strftime('%Y-%m-%d')
         
-        # Summalar
-        df['amount'] = pd.to_numeric(df['amount'])
-        min_amount = float(df['amount'].min())
-        max_amount = float(df['amount'].max())
+        # Summalar (kunlik agregatda - alohida tranzaksiyalarning min/max ustunlari)
+        if 'min_amount' in df.columns:
+            min_amount = float(df['min_amount'].min())
+            max_amount = float(df['max_amount'].max())
+        else:
+            amounts = pd.to_numeric(df['amount'])
+            min_amount = float(amounts.min())
+            max_amount = float(amounts.max())
         
         return {
             "categories": categories,
@@ -0,0 +1,312 @@
+"""
+Domain Service - CSV Mapping Service
+
+"Iflos" CSV fayllarni LLM'siz, qoidalar asosida o'qish: ajratuvchini har bir
+qator uchun aniqlash, o'zbek/rus/ingliz sarlavha sinonimlari, turli sana va
+summa formatlari. Faqat haqiqatan o'qib bo'lmaydigan qatorlar LLM'ga qoladi.
+"""
+
+import csv
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+# Qo'llab-quvvatlanadigan ajratuvchilar
+DELIMITERS = [",", ";", "|", "\t"]
+
+# Sarlavha sinonimlari -> standart ustun nomi
+HEADER_SYNONYMS = {
+    "date": ["date", "sana", "kun", "vaqt", "дата", "день", "transaction date", "operation date"],
+    "amount": ["amount", "summa", "sum", "miqdor", "qiymat", "сумма", "total"],
+    "description": ["description", "tavsif", "mazmun", "mazmuni", "nomi", "описание", "назначение", "details"],
+    "category": ["category", "kategoriya", "toifa", "turi", "категория", "type"],
+    "income": ["kirim", "tushum", "приход", "credit"],
+    "expense": ["chiqim", "xarajat", "расход", "debit"],
+    "is_expense": ["is_expense"],
+    "is_fixed": ["is_fixed"],
+}
+
+_HEADER_LOOKUP = {
+    synonym: column for column, synonyms in HEADER_SYNONYMS.items() for synonym in synonyms
+}
+
+# Oy nomlari (o'zbek, ingliz, rus qisqartmalari); uzunroq prefikslar oldin tekshiriladi
+MONTHS = {
+    "yan": 1, "jan": 1, "янв": 1,
+    "fev": 2, "feb": 2, "фев": 2,
+    "mar": 3, "мар": 3,
+    "apr": 4, "апр": 4,
+    "may": 5, "май": 5, "мая": 5,
+    "iyun": 6, "jun": 6, "июн": 6,
+    "iyul": 7, "jul": 7, "июл": 7,
+    "avg": 8, "aug": 8, "авг": 8,
+    "sen": 9, "sep": 9, "сен": 9,
+    "okt": 10, "oct": 10, "окт": 10,
+    "noy": 11, "nov": 11, "ноя": 11,
+    "dek": 12, "dec": 12, "дек": 12,
+}
+_MONTH_PREFIXES = sorted(MONTHS.items(), key=lambda item: len(item[0]), reverse=True)
+
+# Yo'nalish so'zlari (kategoriya ustunida ko'p uchraydi)
+EXPENSE_WORDS = {"chiqim", "rasxod", "расход", "expense", "xarajat", "debit"}
+INCOME_WORDS = {"kirim", "tushum", "income", "daromad", "приход", "доход", "credit"}
+
+# Aniq yo'nalish bo'lmaganda xarajat deb hisoblanadigan kalit so'zlar (LLM prompt qoidalari bilan bir xil)
+EXPENSE_KEYWORDS = [
+    "ijara", "arenda", "soliq", "oylik", "maosh", "kommunal", "svet", "gaz", "internet",
+    "shtraf", "reklama", "marketing", "ta'mir", "remont", "xarid",
+]
+
+# Ma'nosiz kategoriya qiymatlari
+EMPTY_VALUES = {"", "nan", "none", "null", "unknown", "???", "-", "n/a"}
+
+_ISO_DATE_RE = re.compile(r"^(\d{4})[-./](\d{1,2})[-./](\d{1,2})")
+_DAY_FIRST_DATE_RE = re.compile(r"^(\d{1,2})[-./](\d{1,2})[-./](\d{2,4})$")
+_MONTH_NAME_DATE_RE = re.compile(r"^(\d{1,2})[-./ ]([^\d\s./-]+)\.?[-./ ](\d{2,4})$")
+
+_MULTIPLIERS = [
+    (re.compile(r"(mlrd|млрд|billion|bn)\.?$"), 1e9),
+    (re.compile(r"(mln|млн|million|m)\.?$"), 1e6),
+    (re.compile(r"(ming|тыс|k)\.?$"), 1e3),
+]
+_CURRENCY_RE = re.compile(r"(uzs|usd|so'm|som|сум|sum|\$|~|≈)", re.IGNORECASE)
+_AMOUNT_RE = re.compile(r"^[-+]?\d+(\.\d+)?$")
+
+
+class CsvMappingService:
+    """
+    CSV matnini standart ustunli DataFrame'ga aylantirish
+    (date, amount, description, category, is_expense).
+    """
+
+    def map_columns(self, columns: List[Any]) -> Dict[Any, str]:
+        """Sarlavha nomlarini standart ustunlarga moslash (topilmaganlari tashlab ketiladi)."""
+        mapping = {}
+        for column in columns:
+            name = str(column).strip().strip('"').lower()
+            canonical = _HEADER_LOOKUP.get(name)
+            if canonical and canonical not in mapping.values():
+                mapping[column] = canonical
+        return mapping
+
+    def normalize_frame(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        pd.read_csv natijasini standart ustunlarga o'tkazish.
+        Faqat barcha qatorlarda sana va summa toza o'qilsa DataFrame qaytaradi, aks holda None.
+        """
+        mapping = self.map_columns(list(df.columns))
+        df = df[list(mapping.keys())].rename(columns=mapping)
+        if "date" not in df.columns or "amount" not in df.columns:
+            return None
+
+        amounts = pd.to_numeric(df["amount"], errors="coerce")
+        dates = pd.to_datetime(df["date"], errors="coerce", format="ISO8601")
+        if amounts.isna().any() or dates.isna().any():
+            return None
+
+        df = df.copy()
+        df["amount"] = amounts
+        df["date"] = dates
+        return df
+
+    def parse_text(self, text: str) -> Tuple[Optional[pd.DataFrame], List[str]]:
+        """
+        CSV matnini qatorma-qator o'qish.
+
+        Returns:
+            (standart ustunli DataFrame, o'qib bo'lmagan qatorlar).
+            Sarlavhada sana va summa ustunlari topilmasa - (None, []).
+        """
+        lines = text.lstrip("\ufeff").splitlines()
+        header_index = next((i for i, line in enumerate(lines) if line.strip()), None)
+        if header_index is None:
+            return None, []
+
+        header = self._split_line(lines[header_index])
+        mapping = self.map_columns(header)
+        positions = {canonical: header.index(column) for column, canonical in mapping.items()}
+        if "date" not in positions or ("amount" not in positions and "income" not in positions and "expense" not in positions):
+            return None, []
+
+        rows = []
+        unparsed = []
+        for line in lines[header_index + 1:]:
+            # Raqamsiz qatorlar (takroriy sarlavha, "--- BU KUN YOZILMAGAN ---") tranzaksiya emas
+            if not any(ch.isdigit() for ch in line):
+                continue
+
+            fields = self._split_line(line)
+            row = self._parse_row(fields, positions)
+            if row is None:
+                # Nolga teng bo'lmagan summa yo'q bo'lsa, AI ham tranzaksiya topa olmaydi
+                if any(self.parse_amount(value) for value in fields):
+                    unparsed.append(line)
+            elif row["amount"] != 0:
+                rows.append(row)
+
+        df = pd.DataFrame(rows, columns=["date", "amount", "description", "category", "is_expense"])
+        return df, unparsed
+
+    def _split_line(self, line: str) -> List[str]:
+        """Qatordagi eng ko'p uchragan ajratuvchi bo'yicha bo'lish (qo'shtirnoqlarni hisobga olgan holda)."""
+        delimiter = max(DELIMITERS, key=line.count)
+        if line.count(delimiter) == 0:
+            return [line.strip()]
+        fields = next(csv.reader([line], delimiter=delimiter), [])
+        return [field.strip() for field in fields]
+
+    def _parse_row(self, fields: List[str], positions: Dict[str, int]) -> Optional[Dict[str, Any]]:
+        def field(name: str) -> str:
+            index = positions.get(name)
+            return fields[index] if index is not None and index < len(fields) else ""
+
+        txn_date = self.parse_date(field("date"))
+        if "amount" in positions:
+            amount = self.parse_amount(field("amount"))
+        else:
+            # Alohida kirim/chiqim ustunlari (bank ko'chirmalari)
+            income = self.parse_amount(field("income")) or 0.0
+            expense = self.parse_amount(field("expense")) or 0.0
+            amount = income - abs(expense) if income or expense else None
+
+        if txn_date is None or amount is None:
+            # Ustunlar siljigan qator (masalan, kategoriya tushib qolgan) - maydonlarni turiga qarab topamiz
+            return self._parse_shifted_row(fields)
+
+        return self._build_row(txn_date, amount, field("description"), field("category"), field("is_expense"))
+
+    def _parse_shifted_row(self, fields: List[str]) -> Optional[Dict[str, Any]]:
+        date_index = next((i for i, value in enumerate(fields) if self.parse_date(value) is not None), None)
+        if date_index is None:
+            return None
+
+        rest = [(i, value) for i, value in enumerate(fields) if i != date_index and value]
+        amount_index = next((i for i, value in reversed(rest) if self.parse_amount(value) is not None), None)
+        if amount_index is None:
+            return None
+
+        texts = [value for i, value in rest if i != amount_index]
+        description = texts[0] if texts else ""
+        category = texts[1] if len(texts) > 1 else ""
+        return self._build_row(
+            self.parse_date(fields[date_index]), self.parse_amount(fields[amount_index]), description, category, ""
+        )
+
+    def _build_row(self, txn_date: date, amount: float, description: str, category: str, raw_is_expense: str) -> Dict[str, Any]:
+        category_lower = category.lower()
+        is_expense = None
+
+        flag = raw_is_expense.strip().lower()
+        if flag in ("true", "1", "yes", "ha"):
+            is_expense = True
+        elif flag in ("false", "0", "no", "yo'q"):
+            is_expense = False
+        elif amount < 0:
+            is_expense = True
+        elif category_lower in EXPENSE_WORDS:
+            is_expense = True
+        elif category_lower in INCOME_WORDS:
+            is_expense = False
+        else:
+            text = f"{category_lower} {description.lower()}"
+            if any(word in text for word in EXPENSE_KEYWORDS):
+                is_expense = True
+
+        # Yo'nalish so'zi yoki bo'sh qiymat kategoriya emas
+        if category_lower in EXPENSE_WORDS or category_lower in INCOME_WORDS or category_lower in EMPTY_VALUES:
+            category = "Boshqa"
+
+        return {
+            "date": pd.Timestamp(txn_date),
+            "amount": amount,
+            "description": description,
+            "category": category,
+            "is_expense": is_expense,
+        }
+
+    def parse_date(self, value: str) -> Optional[date]:
+        """
+        Sanani o'qish: 2024-01-22, 2024.1.26, 31/3/2024, 5.05.2024 (kun birinchi),
+        27-Iyun-2024, 3 Dek 2025.
+        """
+        value = value.strip().strip('"')
+        if not value or not value[0].isdigit():
+            return None
+
+        match = _ISO_DATE_RE.match(value)
+        if match:
+            year, month, day = (int(part) for part in match.groups())
+            return self._make_date(year, month, day)
+
+        match = _DAY_FIRST_DATE_RE.match(value)
+        if match:
+            day, month, year = (int(part) for part in match.groups())
+            return self._make_date(year, month, day)
+
+        match = _MONTH_NAME_DATE_RE.match(value)
+        if match:
+            day, month_name, year = match.groups()
+            month_name = month_name.lower()
+            month = next((number for prefix, number in _MONTH_PREFIXES if month_name.startswith(prefix)), None)
+            if month is not None:
+                return self._make_date(int(year), month, int(day))
+
+        return None
+
+    def _make_date(self, year: int, month: int, day: int) -> Optional[date]:
+        if year < 100:
+            year += 2000
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    def parse_amount(self, value: str) -> Optional[float]:
+        """
+        Summani o'qish: 1919900, -300000, "1 919 900", "UZS 2180786", "~1846371",
+        "3.5 mln", "1,250,000.50", "(5000)".
+        """
+        text = _CURRENCY_RE.sub("", value.strip().strip('"').lower())
+        text = text.replace(" ", "").replace(" ", "").replace("'", "")
+        if not text:
+            return None
+
+        negative = False
+        if text.startswith("(") and text.endswith(")"):
+            negative, text = True, text[1:-1]
+
+        multiplier = 1.0
+        for pattern, factor in _MULTIPLIERS:
+            if pattern.search(text):
+                text = pattern.sub("", text)
+                multiplier = factor
+                break
+
+        # Kasr va minglik ajratuvchilari
+        if "," in text and "." in text:
+            if text.rfind(",") > text.rfind("."):
+                text = text.replace(".", "").replace(",", ".")
+            else:
+                text = text.replace(",", "")
+        elif text.count(".") > 1:
+            # 1.250.000 - nuqtalar minglik ajratuvchi
+            text = text.replace(".", "")
+        elif "," in text:
+            head, _, tail = text.rpartition(",")
+            if len(tail) == 3 and multiplier == 1.0:
+                text = text.replace(",", "")
+            else:
+                text = head.replace(",", "") + "." + tail
+
+        if not _AMOUNT_RE.match(text):
+            return None
+
+        amount = float(text) * multiplier
+        return -amount if negative else amount
+
+
+# Global instance
+csv_mapping_service = CsvMappingService()
@@ -1,13 +1,18 @@
 
+import asyncio
 import io
+import os
+import tempfile
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from datetime import datetime
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple, Union
 from fastapi import UploadFile
-import pypdf
-import docx
-import openpyxl
 
-from app.infrastructure.llm.local_llm_client import llm_client
+from app.domain.services.csv_mapping_service import csv_mapping_service
+from app.infrastructure.db.database import settings
+from app.infrastructure.db.transaction_loader import TRANSACTION_FRAME_COLUMNS
+from app.infrastructure.llm.local_llm_client import NoTransactionsFound, llm_client
 
 class FileParsingService:
     """
@@ -15,30 +20,86 @@ class FileParsingService:
     Qo'llab-quvvatlaydi: .csv, .xlsx, .pdf, .docx, .txt
     """
 
-    async def parse_file(self, file: UploadFile, task_id: Optional[str] = None, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def parse_file(self, file: UploadFile, task_id: Optional[str] = None, business_type: Optional[str] = None) -> pd.DataFrame:
         """
         Fayl formatiga qarab tegishli parserni chaqiradi.
         Agar task_id berilsa, progress update qilinadi.
         business_type: AI parsing uchun (prompt customization).
+
+        Returns:
+            Barcha tranzaksiyalar bitta batch'da (ustunli DataFrame, qarang: to_batch).
+            Katta fayllar uchun spool_upload + iter_file_batches ishlatiladi.
+        """
+        path = await self.spool_upload(file)
+        try:
+            batches = [batch async for batch in self.iter_file_batches(path, file.filename, task_id, business_type)]
+        finally:
+            os.remove(path)
+            await file.seek(0)
+
+        if not batches:
+            return self.to_batch([])
+        return pd.concat(batches, ignore_index=True)
+
+    async def spool_upload(self, file: UploadFile) -> str:
+        """
+        Yuklangan faylni bo'laklab vaqtinchalik faylga yozish (butun fayl xotiraga olinmaydi).
+
+        Returns:
+            Vaqtinchalik fayl yo'li (chaqiruvchi o'chiradi)
+        """
+        suffix = os.path.splitext(file.filename or "")[1].lower()
+        spool = tempfile.NamedTemporaryFile(delete=False, prefix="lqx_upload_", suffix=suffix)
+        try:
+            while True:
+                chunk = await file.read(settings.upload_spool_chunk_bytes)
+                if not chunk:
+                    break
+                spool.write(chunk)
+        finally:
+            spool.close()
+        return spool.name
+
+    async def iter_file_batches(
+        self,
+        path: str,
+        filename: str,
+        task_id: Optional[str] = None,
+        business_type: Optional[str] = None
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Diskdagi faylni bo'laklab o'qib, tranzaksiya batch'larini ketma-ket qaytarish.
+        Xotira sarfi fayl hajmiga emas, bo'lak o'lchamiga (settings.upload_block_lines) bog'liq.
         """
         from app.infrastructure.task_manager import task_manager
-        
-        filename = file.filename.lower()
-        content = await file.read()
-        
+
+        filename = filename.lower()
+        total_rows = 0
+
         try:
             if filename.endswith('.csv'):
-                return await self._parse_csv(content, task_id, business_type)
+                batches = self._iter_csv_batches(path, task_id, business_type)
             elif filename.endswith('.xlsx'):
-                return await self._parse_excel(content, task_id, business_type)
+                batches = self._iter_excel_batches(path, task_id)
             elif filename.endswith('.pdf'):
-                return await self._parse_pdf(content, task_id, business_type)
+                batches = self._iter_text_batches(self._pdf_line_blocks(path, task_id), task_id, business_type)
             elif filename.endswith('.docx'):
-                return await self._parse_docx(content, task_id, business_type)
+                batches = self._iter_text_batches(self._docx_line_blocks(path, task_id), task_id, business_type)
             elif filename.endswith('.txt'):
-                return await self._parse_txt(content, task_id, business_type)
+                batches = self._iter_text_batches(
+                    self._file_line_blocks(path, settings.upload_llm_block_lines), task_id, business_type
+                )
             else:
                 raise ValueError("Qo'llab-quvvatlanmaydigan fayl formati")
+
+            async for batch in batches:
+                if batch.empty:
+                    continue
+                total_rows += len(batch)
+                yield batch
+
+            if total_rows == 0:
+                raise ValueError("Faylda tranzaksiyalar topilmadi.")
         except ValueError as ve:
             if task_id:
                 task_manager.update_task(task_id, error=str(ve))
@@ -48,12 +109,19 @@ class FileParsingService:
             if task_id:
                 task_manager.update_task(task_id, error=error_msg)
             raise ValueError(error_msg)
-        finally:
-            await file.seek(0)
 
-    async def _process_chunks_with_llm(self, text_content: str, task_id: Optional[str] = None, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def _process_chunks_with_llm(
+        self,
+        text_content: str,
+        task_id: Optional[str] = None,
+        business_type: Optional[str] = None,
+        progress_range: Tuple[int, int] = (0, 90)
+    ) -> List[Dict[str, Any]]:
         """
-        Katta matnni chunklarga bo'lib, LLM orqali qayta ishlash.
+        Katta matnni chunklarga bo'lib, LLM orqali parallel qayta ishlash.
+        Bir vaqtda ko'pi bilan settings.llm_chunk_concurrency ta so'rov yuboriladi,
+        natijalar chunklarning asl tartibida yig'iladi.
+        progress_range: task progressi shu oraliqda yangilanadi (fayl bo'laklari uchun).
         """
         from app.infrastructure.task_manager import task_manager
         
@@ -61,181 +129,307 @@ class FileParsingService:
         total_lines = len(lines)
         # Chunk size (optimal: 50 qator)
         chunk_size = 50 
-        chunks = [lines[i:i + chunk_size] for i in range(0, total_lines, chunk_size)]
+        chunks = [
+            (i // chunk_size + 1, "\n".join(lines[i:i + chunk_size]))
+            for i in range(0, total_lines, chunk_size)
+        ]
+        chunks = [(number, chunk_text) for number, chunk_text in chunks if chunk_text.strip()]
         total_chunks = len(chunks)
         
-        all_transactions = []
+        print(f"INFO: Processing {total_lines} lines in {total_chunks} chunks (concurrency={settings.llm_chunk_concurrency}).")
         
-        print(f"INFO: Processing {total_lines} lines in {total_chunks} chunks.")
-        
-        for i, chunk_lines in enumerate(chunks):
-            # Progress update
+        semaphore = asyncio.Semaphore(max(1, settings.llm_chunk_concurrency))
+        completed = 0
+        progress_low, progress_high = progress_range
+
+        if task_id:
+            task_manager.update_task(
+                task_id,
+                progress=progress_low,
+                message=f"AI tahlil qilmoqda ({business_type or 'General'}): 0/{total_chunks} qism..."
+            )
+
+        async def process_chunk(number: int, chunk_text: str) -> List[Dict[str, Any]]:
+            nonlocal completed
+            async with semaphore:
+                transactions = await self._parse_chunk_with_retry(number, chunk_text, business_type)
+
+            # Progress tugallangan chunklar soniga qarab (90% gacha - parsing jarayoni)
+            completed += 1
             if task_id:
-                percent = int(((i) / total_chunks) * 90) # 90% gacha (parsing jarayoni)
                 task_manager.update_task(
-                    task_id, 
-                    progress=percent, 
-                    message=f"AI tahlil qilmoqda ({business_type or 'General'}): {i+1}-qism ({total_chunks} dan)..."
+                    task_id,
+                    progress=progress_low + int((completed / total_chunks) * (progress_high - progress_low)),
+                    message=f"AI tahlil qilmoqda ({business_type or 'General'}): {completed}/{total_chunks} qism tayyor..."
                 )
-            
-            chunk_text = "\n".join(chunk_lines)
-            if not chunk_text.strip():
-                continue
-                
-            try:
-                # LLM ga yuborish
-                transactions = await llm_client.parse_text_to_transactions(chunk_text, business_type)
-                all_transactions.extend(transactions)
-            except Exception as e:
-                print(f"Chunk {i+1} failed: {e}")
-                # Bitta chunk xato bersa to'xtab qolmaymiz, davom etamiz
-                continue
+            return transactions
+
+        # gather natijalarni chunklar tartibida qaytaradi
+        results = await asyncio.gather(*(process_chunk(number, chunk_text) for number, chunk_text in chunks))
+
+        all_transactions = []
+        for transactions in results:
+            all_transactions.extend(transactions)
         
         if not all_transactions and total_lines > 0:
              raise ValueError("AI hech qanday ma'lumotni o'qiy olmadi.")
 
         return all_transactions
 
-    async def _parse_csv(self, content: bytes, task_id: Optional[str] = None, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """CSV faylni o'qish (Pandas -> Fallback to LLM with Chunking)."""
+    async def _parse_chunk_with_retry(self, number: int, chunk_text: str, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Bitta chunkni LLM ga yuborish; xato bo'lsa eksponensial kutish bilan qayta urinish."""
+        max_retries = max(0, settings.llm_chunk_max_retries)
+        for attempt in range(max_retries + 1):
+            try:
+                return await llm_client.parse_text_to_transactions(chunk_text, business_type)
+            except NoTransactionsFound:
+                # Chunkda tranzaksiya yo'q (masalan, faqat sarlavha) - qayta so'rash befoyda
+                return []
+            except Exception as e:
+                if attempt == max_retries:
+                    print(f"Chunk {number} failed after {attempt + 1} attempts: {e}")
+                    # Bitta chunk xato bersa to'xtab qolmaymiz, davom etamiz
+                    return []
+                delay = settings.llm_chunk_retry_backoff_seconds * (2 ** attempt)
+                print(f"Chunk {number} failed ({e}), retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+        return []
+
+    async def _iter_csv_batches(self, path: str, task_id: Optional[str] = None, business_type: Optional[str] = None) -> AsyncIterator[pd.DataFrame]:
+        """CSV faylni settings.upload_block_lines qatorli bo'laklarda o'qish (har bir bo'lakka sarlavha qo'shiladi)."""
         from app.infrastructure.task_manager import task_manager
-        
+
+        if task_id: task_manager.update_task(task_id, message="Fayl o'qilmoqda...", progress=5)
+
+        header = None
+        header_recognised = False
+        previous_fraction = 0.0
+
+        for lines, fraction in self._file_line_blocks(path, settings.upload_block_lines):
+            if header is None:
+                first = next((i for i, line in enumerate(lines) if line.strip()), None)
+                if first is None:
+                    continue
+                header, lines = lines[first], lines[first + 1:]
+                header_recognised = csv_mapping_service.parse_text(header)[0] is not None
+                if not header_recognised:
+                    # Sarlavha tanilmadi - butun faylni AI o'qiydi (chunking bilan)
+                    print("CSV header not recognised. Trying AI fallback with chunks...")
+
+            block_text = "\n".join([header] + lines)
+            progress_range = (5 + int(previous_fraction * 80), 5 + int(fraction * 80))
+
+            if header_recognised:
+                batch = await self._parse_csv_block(block_text, task_id, business_type, progress_range)
+            else:
+                batch = await self._llm_block_to_batch(block_text, task_id, business_type, progress_range)
+
+            if task_id:
+                task_manager.update_task(task_id, progress=progress_range[1], message=f"Fayl o'qilmoqda... {int(fraction * 100)}%")
+            previous_fraction = fraction
+            yield batch
+
+    async def _parse_csv_block(
+        self,
+        text_content: str,
+        task_id: Optional[str] = None,
+        business_type: Optional[str] = None,
+        progress_range: Tuple[int, int] = (0, 90)
+    ) -> pd.DataFrame:
+        """CSV bo'lagini o'qish (Pandas -> qoidalar asosidagi mapper -> faqat qolgan qatorlar LLM'ga)."""
         try:
-            # 1. Standart o'qishga urinish
-            if task_id: task_manager.update_task(task_id, message="Fayl o'qilmoqda...", progress=5)
-            df = pd.read_csv(io.BytesIO(content))
-            return self._df_to_transactions(df)
+            # 1. Standart o'qishga urinish (sarlavha sinonimlari bilan)
+            df = csv_mapping_service.normalize_frame(pd.read_csv(io.StringIO(text_content)))
+            if df is not None:
+                return self._df_to_transactions(df)
         except Exception as e:
-            print(f"CSV Standard Parse Error: {e}. Trying AI fallback with chunks...")
-            
-            # 2. AI Fallback (Chunking)
-            text_content = content.decode('utf-8', errors='ignore')
-            return await self._process_chunks_with_llm(text_content, task_id, business_type)
-
-    async def _parse_excel(self, content: bytes, task_id: Optional[str] = None, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Excel faylni o'qish (Pandas -> Fallback to LLM)."""
+            print(f"CSV Standard Parse Error: {e}. Trying rule-based mapper...")
+
+        # 2. Qatorma-qator o'qish: aralash ajratuvchilar, sana/summa formatlari
+        df, unparsed_lines = csv_mapping_service.parse_text(text_content)
+        batch = self._df_to_transactions(df)
+        print(f"INFO: Rule-based CSV mapper: {len(df)} rows parsed, {len(unparsed_lines)} lines left for AI.")
+
+        # 3. Faqat o'qib bo'lmagan qatorlar AI'ga yuboriladi
+        if unparsed_lines:
+            llm_batch = await self._llm_block_to_batch("\n".join(unparsed_lines), task_id, business_type, progress_range)
+            batch = pd.concat([batch, llm_batch], ignore_index=True)
+        return batch
+
+    async def _llm_block_to_batch(
+        self,
+        text_content: str,
+        task_id: Optional[str] = None,
+        business_type: Optional[str] = None,
+        progress_range: Tuple[int, int] = (0, 90)
+    ) -> pd.DataFrame:
+        """Matn bo'lagini AI orqali o'qish; bo'lakda tranzaksiya bo'lmasa bo'sh batch."""
+        try:
+            return self.to_batch(await self._process_chunks_with_llm(text_content, task_id, business_type, progress_range))
+        except ValueError as e:
+            print(f"AI bo'lakni o'qiy olmadi: {e}")
+            return self.to_batch([])
+
+    async def _iter_text_batches(
+        self,
+        blocks: Iterator[Tuple[List[str], float]],
+        task_id: Optional[str] = None,
+        business_type: Optional[str] = None
+    ) -> AsyncIterator[pd.DataFrame]:
+        """Matnli fayl (PDF/Word/TXT) bo'laklarini LLM orqali o'qish."""
+        previous_fraction = 0.0
+        for lines, fraction in blocks:
+            progress_range = (5 + int(previous_fraction * 80), 5 + int(fraction * 80))
+            previous_fraction = fraction
+            yield await self._llm_block_to_batch("\n".join(lines), task_id, business_type, progress_range)
+
+    async def _iter_excel_batches(self, path: str, task_id: Optional[str] = None) -> AsyncIterator[pd.DataFrame]:
+        """
+        Excel faylni o'qish. xlsx - siqilgan XML arxiv, pandas uni bo'laklab o'qiy olmaydi,
+        shuning uchun varaq bir marta o'qiladi, lekin yozish baribir batch'larda bo'ladi.
+        """
         from app.infrastructure.task_manager import task_manager
         try:
             if task_id: task_manager.update_task(task_id, message="Excel o'qilmoqda...", progress=5)
-            df = pd.read_excel(io.BytesIO(content))
-            return self._df_to_transactions(df)
+            df = pd.read_excel(path)
+            batch = self._df_to_transactions(df)
         except Exception as e:
              # Excel fallback qiyinroq, lekin urinib ko'ramiz
              print(f"Excel Error: {e}")
              if task_id: task_manager.update_task(task_id, error="Excel fayli buzilgan va uni AI o'qiy olmadi.")
              raise ValueError(f"Excel fayli noto'g'ri formatda: {str(e)}")
 
-    async def _parse_pdf(self, content: bytes, task_id: Optional[str] = None, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """PDF fayldan matnni olish va LLM orqali parse qilish."""
-        from app.infrastructure.task_manager import task_manager
-        try:
-            if task_id: task_manager.update_task(task_id, message="PDF o'qilmoqda...", progress=5)
-            text = ""
-            pdf_file = io.BytesIO(content)
-            reader = pypdf.PdfReader(pdf_file)
-            
-            # To'liq textni olamiz (endi chunking bor)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return await self._process_chunks_with_llm(text, task_id, business_type)
-        except Exception as e:
-             if "No module named 'pypdf'" in str(e):
-                  raise ValueError("PDF o'qish tizimi o'rnatilmagan (pypdf).")
-             raise e
-             
-    async def _parse_docx(self, content: bytes, task_id: Optional[str] = None, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Word fayldan matnni olish va LLM orqali parse qilish."""
+        for start in range(0, len(batch), settings.upload_block_lines):
+            yield batch.iloc[start:start + settings.upload_block_lines]
+
+    def _file_line_blocks(self, path: str, block_lines: int) -> Iterator[Tuple[List[str], float]]:
+        """Faylni qatorlar bo'laklari sifatida o'qish: (qatorlar, o'qilgan qism 0..1)."""
+        size = os.path.getsize(path) or 1
+        with open(path, 'rb') as f:
+            block = []
+            for raw in f:
+                block.append(raw.decode('utf-8', errors='ignore').rstrip('\r\n'))
+                if len(block) >= block_lines:
+                    yield block, f.tell() / size
+                    block = []
+            if block:
+                yield block, 1.0
+
+    def _pdf_line_blocks(self, path: str, task_id: Optional[str] = None) -> Iterator[Tuple[List[str], float]]:
+        """PDF sahifalarini birma-bir (lazy) o'qib, qatorlarni bo'laklarga yig'ish."""
         from app.infrastructure.task_manager import task_manager
+        if task_id: task_manager.update_task(task_id, message="PDF o'qilmoqda...", progress=5)
         try:
-             if task_id: task_manager.update_task(task_id, message="Word fayl o'qilmoqda...", progress=5)
-             doc = docx.Document(io.BytesIO(content))
-             text = "\n".join([para.text for para in doc.paragraphs])
-             return await self._process_chunks_with_llm(text, task_id, business_type)
-        except Exception as e:
-             raise e
+            # pypdf og'ir - faqat PDF yuklanganda import qilinadi
+            import pypdf
+        except ImportError:
+            raise ValueError("PDF o'qish tizimi o'rnatilmagan (pypdf).")
 
-    async def _parse_txt(self, content: bytes, task_id: Optional[str] = None, business_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """TXT fayldan matnni olish va LLM orqali parse qilish."""
-        text = content.decode('utf-8', errors='ignore')
-        return await self._process_chunks_with_llm(text, task_id, business_type)
+        reader = pypdf.PdfReader(path)
+        total_pages = len(reader.pages) or 1
+        block = []
+        for page_number, page in enumerate(reader.pages, start=1):
+            block.extend((page.extract_text() or "").splitlines())
+            if len(block) >= settings.upload_llm_block_lines:
+                yield block, page_number / total_pages
+                block = []
+        if block:
+            yield block, 1.0
+
+    def _docx_line_blocks(self, path: str, task_id: Optional[str] = None) -> Iterator[Tuple[List[str], float]]:
+        """Word fayl paragraflarini bo'laklarga yig'ish."""
+        from app.infrastructure.task_manager import task_manager
+        if task_id: task_manager.update_task(task_id, message="Word fayl o'qilmoqda...", progress=5)
+        import docx
 
+        doc = docx.Document(path)
+        paragraphs = doc.paragraphs
+        total = len(paragraphs) or 1
+        step = settings.upload_llm_block_lines
+        for start in range(0, len(paragraphs), step):
+            yield [para.text for para in paragraphs[start:start + step]], min(start + step, total) / total
 
-    def _df_to_transactions(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """DataFrame'ni tranzaksiya formatiga o'tkazish (CSV/Excel uchun)."""
+    def _df_to_transactions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        DataFrame'ni tranzaksiyalar batch'iga o'tkazish (CSV/Excel uchun).
+        Barcha amallar ustunlar bo'yicha (vektorli) bajariladi.
+        """
         # Ustun nomlarini normallashtirish (kichik harflar)
-        df.columns = df.columns.str.lower()
-        
-        transactions = []
-        for _, row in df.iterrows():
-            # 1. Amount va Is_Expense aniqlash
-            amount_val = float(row.get('amount', 0))
-            raw_is_expense = row.get('is_expense')
-            
-            is_expense = True # Default fallback
-            
-            if pd.notna(raw_is_expense):
-                 is_expense = bool(raw_is_expense)
-            else:
-                 # Auto-detect based on SIGN
-                 if amount_val < 0:
-                      is_expense = True
-                 else:
-                      # Musbat bo'lsa, kategoriya yoki default Daromad deb olish
-                      cat_val = str(row.get('category', '')).lower()
-                      if "xarajat" in cat_val or "chiqim" in cat_val:
-                           is_expense = True
-                      else:
-                           is_expense = False # Default Daromad (agar musbat bo'lsa)
-            
-            # Sana formatini tekshirish (ToString)
-            date_val = str(row.get('date', ''))
-            
-            # Future Date Validation
-            try:
-                from datetime import datetime
-                # Pandas timestamp to python datetime conversion if needed, or string parsing
-                # Usually pandas reads date as Timestamp if format is standard. 
-                # Let's ensure we handle both Timestamp object and string.
-                txn_date = None
-                raw_date = row.get('date')
-                
-                if pd.isna(raw_date):
-                     # Agar sana yo'q bo'lsa, o'tkazib yuboramiz yoki bugungi kun?
-                     # User logic seems to imply strict date adherence. Let's keep empty string and let backend validataion handle or default.
-                     # But for future checking, we need a date.
-                     pass
-                else:
-                     if hasattr(raw_date, 'to_pydatetime'):
-                          txn_date = raw_date.to_pydatetime()
-                     else:
-                          # Try parsing string iso format or common formats
-                          # For simplicity, let pandas do it if it missed it
-                          txn_date = pd.to_datetime(raw_date).to_pydatetime()
-                
-                if txn_date:
-                     # Check if future
-                     if txn_date > datetime.now():
-                          continue # Skip future transactions
-                     
-                     # Normalize format to string YYYY-MM-DD for consistency
-                     date_val = txn_date.strftime('%Y-%m-%d')
-                     
-            except Exception as e:
-                # Agar sana formati buzilgan bo'lsa, warning berib o'tkazib yuboramiz yoki original string qoldiramiz
-                # Lekin "Future" checking ishlamaydi.
-                pass
-
-            txn = {
-                "date": date_val,
-                "amount": abs(amount_val), # DB uchun har doim musbat
-                "description": str(row.get('description', '')),
-                "category": str(row.get('category', 'Boshqa')),
-                "is_expense": is_expense,
-                "is_fixed": bool(row.get('is_fixed', False))
-            }
-            transactions.append(txn)
-            
-        return transactions
+        df = df.rename(columns=lambda column: str(column).lower())
+
+        def column(name: str, default: Any) -> pd.Series:
+            if name in df.columns:
+                return df[name]
+            return pd.Series(default, index=df.index)
+
+        # 1. Amount va Is_Expense aniqlash
+        amounts = pd.to_numeric(column('amount', 0), errors='raise').fillna(0.0).astype('float64')
+        categories = column('category', 'Boshqa').fillna('Boshqa').astype(str)
+
+        raw_is_expense = column('is_expense', np.nan)
+        has_flag = raw_is_expense.notna().to_numpy()
+        # Flag bo'lmasa: manfiy summa yoki kategoriyada "xarajat"/"chiqim" -> xarajat, aks holda daromad
+        auto_is_expense = (amounts < 0).to_numpy() | categories.str.lower().str.contains('xarajat|chiqim', regex=True).to_numpy()
+        is_expense = auto_is_expense.copy()
+        is_expense[has_flag] = raw_is_expense[has_flag].astype(bool).to_numpy()
+
+        # 2. Sanalar - bitta to_datetime o'tishi (format birinchi qiymatdan aniqlanadi)
+        dates = self._parse_dates(column('date', pd.NaT))
+
+        batch = pd.DataFrame({
+            'date': dates.dt.normalize(),
+            'amount': amounts.abs(),  # DB uchun har doim musbat
+            'description': column('description', '').fillna('').astype(str),
+            'category': categories,
+            'is_expense': is_expense.astype(bool),
+            'is_fixed': column('is_fixed', False).fillna(False).astype(bool),
+        })
+
+        # 3. Sanasi yo'q/buzilgan va kelajakdagi tranzaksiyalarni tashlab yuborish
+        invalid = batch['date'].isna()
+        if invalid.any():
+            print(f"WARNING: {int(invalid.sum())} rows skipped (invalid date).")
+        keep = ~invalid & (dates <= datetime.now())
+        return batch[keep.to_numpy()].reset_index(drop=True)
+
+    def _parse_dates(self, values: pd.Series) -> pd.Series:
+        """Sanalarni vektorli o'qish; aralash formatdagi qatorlar alohida qayta o'qiladi."""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values.dt.tz_localize(None) if values.dt.tz is not None else values
+
+        dates = pd.to_datetime(values, errors='coerce')
+        retry = dates.isna() & values.notna()
+        if retry.any():
+            dates[retry] = pd.to_datetime(values[retry].astype(str), errors='coerce', format='mixed', dayfirst=True)
+        return dates
+
+    def to_batch(self, transactions: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
+        """
+        Tranzaksiyalarni yagona batch formatiga keltirish:
+        date (datetime64), amount (musbat float64), description, category, is_expense, is_fixed.
+        LLM natijalari (dict ro'yxati) ham shu formatga o'tkaziladi.
+        """
+        if isinstance(transactions, pd.DataFrame):
+            return transactions
+
+        df = pd.DataFrame(transactions, columns=TRANSACTION_FRAME_COLUMNS)
+        dates = pd.to_datetime(df['date'], errors='coerce', format='%Y-%m-%d')
+        invalid = dates.isna()
+        if invalid.any():
+            print(f"WARNING: {int(invalid.sum())} AI rows skipped (invalid date).")
+
+        batch = pd.DataFrame({
+            'date': dates,
+            'amount': pd.to_numeric(df['amount'], errors='coerce').fillna(0.0).abs().astype('float64'),
+            'description': df['description'].fillna('').astype(str),
+            'category': df['category'],
+            'is_expense': df['is_expense'].fillna(True).astype(bool),
+            'is_fixed': df['is_fixed'].fillna(False).astype(bool),
+        })
+        return batch[~invalid.to_numpy()].reset_index(drop=True)
+
+    def batch_to_records(self, batch: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Batch'ni eski dict formatiga qaytarish (sana 'YYYY-MM-DD' string)."""
+        return batch.assign(date=batch['date'].dt.strftime('%Y-%m-%d')).to_dict('records')
 
 file_parsing_service = FileParsingService()
@@ -4,12 +4,56 @@ Domain Service - Forecasting Service
 Gibrid prognozlash logikasi (Prophet vs Cash Flow Simulation).
 """
 
+import asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from decimal import Decimal
 
+from app.infrastructure.forecast_executor import forecast_executor
+from app.infrastructure.ml.prophet_model_store import prophet_model_store
+
+
+# Prophet sozlamalari o'zgarsa, versiyani oshiring - saqlangan modellar eskiradi
+PROPHET_CONFIG_VERSION = "v1"
+
+# Tashqi faktor: konservativ yondashuv - o'rtacha o'sishni 10% pasaytirish (risk buffer)
+SIMULATION_GROWTH_BUFFER = 0.9
+
+# Oddiy mavsumiylik simulatsiyasi (sinusoida) - bozor tebranishi, 30 kunlik sikl.
+# Maksimal prognoz davri (365 kun) uchun oldindan hisoblanadi.
+SIMULATION_MAX_DAYS = 365
+_SEASONALITY = 1 + 0.05 * np.sin(2 * np.pi * np.arange(SIMULATION_MAX_DAYS) / 30)
+_SEASONALITY_CUMSUM = np.cumsum(_SEASONALITY)
+
+
+def _seasonality_cumsum(days: int) -> np.ndarray:
+    """Mavsumiylik koeffitsientlarining kumulyativ yig'indisi (birinchi `days` kun)."""
+    if days <= SIMULATION_MAX_DAYS:
+        return _SEASONALITY_CUMSUM[:days]
+    return np.cumsum(1 + 0.05 * np.sin(2 * np.pi * np.arange(days) / 30))
+
+
+def simulate_balances(last_balances, avg_daily_changes, forecast_days: int) -> np.ndarray:
+    """
+    Simulyatsiya balanslarini yopiq formulada hisoblash.
+    
+    balance[t] = last_balance + growth * sum(seasonality[0..t]), ya'ni kunma-kun
+    sikl o'rniga oldindan hisoblangan kumulyativ mavsumiylik vektori ishlatiladi.
+    
+    Args:
+        last_balances: Oxirgi balans(lar) - skalyar yoki (n,) massiv
+        avg_daily_changes: O'rtacha kunlik o'zgarish(lar) - skalyar yoki (n,) massiv
+        forecast_days: Prognoz kunlari (eng uzun gorizont; qisqalari kesib olinadi)
+        
+    Returns:
+        (n, forecast_days) massiv
+    """
+    last = np.atleast_1d(np.asarray(last_balances, dtype=float))
+    growth = np.atleast_1d(np.asarray(avg_daily_changes, dtype=float)) * SIMULATION_GROWTH_BUFFER
+    return last[:, None] + growth[:, None] * _seasonality_cumsum(forecast_days)[None, :]
+
 
 class ForecastingService:
     """Likvidlik prognozlash xizmati."""
@@ -17,35 +61,47 @@ class ForecastingService:
     def __init__(self):
         self.min_days_for_timeseries = 90
     
-    def prepare_data(self, transactions: List[Dict[str, Any]]) -> pd.DataFrame:
+    def prepare_data(self, transactions: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
         """
         Tranzaksiyalarni prognoz uchun tayyorlash.
         
         Args:
-            transactions: Tranzaksiyalar ro'yxati
+            transactions: Tranzaksiyalar ro'yxati yoki transaction_loader DataFrame'i
             
         Returns:
             Pandas DataFrame
         """
-        df = pd.DataFrame(transactions)
+        if isinstance(transactions, pd.DataFrame):
+            df = transactions.copy()
+        else:
+            df = pd.DataFrame(transactions)
         
         if df.empty:
             return df
         
+        return self._prepare_frame(df)
+    
+    def _prepare_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vektorli tayyorlash: sana/summa turlari, signed_amount va saralash.
+        prepare_data va predict_cash_flow uchun umumiy. Berilgan df'ga ustun yozadi.
+        """
         # Date ustunini datetime'ga aylantirish
         df['date'] = pd.to_datetime(df['date'])
         
         # Amount'ni float'ga
         df['amount'] = df['amount'].astype(float)
         
-        # Signed amount (daromad +, xarajat -)
-        df['signed_amount'] = df.apply(
-            lambda row: -row['amount'] if row.get('is_expense', True) else row['amount'],
-            axis=1
-        )
+        # Signed amount (daromad +, xarajat -) - qatorma-qator apply o'rniga np.where
+        if 'is_expense' in df.columns:
+            is_expense = df['is_expense'].fillna(True).astype(bool).to_numpy()
+        else:
+            is_expense = np.ones(len(df), dtype=bool)
+        amounts = df['amount'].to_numpy()
+        df['signed_amount'] = np.where(is_expense, -amounts, amounts)
         
         # Sanaga qarab saralash
-        df = df.sort_values('date')
+        df = df.sort_values('date', kind='stable')
         
         return df
     
@@ -69,10 +125,22 @@ class ForecastingService:
         
         return daily_df
     
+    def _build_prophet_model(self):
+        """Fit qilinmagan Prophet modeli (sozlamalar PROPHET_CONFIG_VERSION bilan bog'liq)."""
+        from prophet import Prophet
+        
+        return Prophet(
+            daily_seasonality=False,
+            weekly_seasonality=True,
+            yearly_seasonality=True,
+            changepoint_prior_scale=0.05
+        )
+    
     def forecast_with_prophet(
         self,
         df: pd.DataFrame,
-        forecast_days: int = 90
+        forecast_days: int = 90,
+        model_key: Optional[str] = None
     ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         Prophet yordamida time-series prognoz.
@@ -80,25 +148,26 @@ class ForecastingService:
         Args:
             df: Kunlik balans DataFrame
             forecast_days: Prognoz kunlari
+            model_key: Model ombori kaliti (user_id). Berilsa, fit qilingan model
+                qayta ishlatiladi yoki warm-start qilinadi.
             
         Returns:
             Prognoz DataFrame va metadata
         """
         try:
-            from prophet import Prophet
-            
             # Prophet uchun format
             prophet_df = df[['date', 'balance']].copy()
             prophet_df.columns = ['ds', 'y']
             
-            # Model
-            model = Prophet(
-                daily_seasonality=False,
-                weekly_seasonality=True,
-                yearly_seasonality=True,
-                changepoint_prior_scale=0.05
-            )
-            model.fit(prophet_df)
+            # Model (ombordan yoki yangi fit)
+            if model_key:
+                model, fit_mode = prophet_model_store.get_or_fit(
+                    model_key, prophet_df, self._build_prophet_model, PROPHET_CONFIG_VERSION
+                )
+            else:
+                model = self._build_prophet_model()
+                model.fit(prophet_df)
+                fit_mode = 'cold'
             
             # Future dates
             future = model.make_future_dataframe(periods=forecast_days)
@@ -112,7 +181,8 @@ class ForecastingService:
             metadata = {
                 'method': 'prophet',
                 'history_days': len(df),
-                'forecast_days': forecast_days
+                'forecast_days': forecast_days,
+                'fit_mode': fit_mode
             }
             
             return forecast_only, metadata
@@ -132,53 +202,108 @@ class ForecastingService:
         if df.empty:
             return pd.DataFrame(), {'method': 'simulation', 'error': 'No data'}
         
-        # O'rtacha kunlik o'zgarish
-        avg_daily_change = df['balance'].diff().mean()
+        forecasts = self.forecast_with_simulation_batch([df], forecast_days)
+        return forecasts[0]
+    
+    def forecast_with_simulation_batch(
+        self,
+        daily_dfs: List[pd.DataFrame],
+        forecast_days: int = 90
+    ) -> List[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Bir nechta foydalanuvchi (kunlik balans DataFrame'lari) uchun simulyatsiyani
+        bitta massiv hisoblashda bajarish.
         
-        # Tashqi faktor: Agar ma'lumot kam bo'lsa, konservativ yondashuv (xavfsizlik uchun)
-        # Masalan, o'rtacha o'sishni biroz pasaytirish (risk buffer)
-        adjusted_growth = avg_daily_change * 0.9  # 10% conservative buffer
+        Args:
+            daily_dfs: calculate_daily_balance natijalari (bo'sh bo'lmagan)
+            forecast_days: Prognoz kunlari
+            
+        Returns:
+            Har bir DataFrame uchun (forecast_df, metadata)
+        """
+        # O'rtacha kunlik o'zgarish va oxirgi balans (har bir user uchun)
+        avg_daily_changes = np.array([df['balance'].diff().mean() for df in daily_dfs], dtype=float)
+        last_balances = np.array([df['balance'].iloc[-1] for df in daily_dfs], dtype=float)
         
-        # Oxirgi balans
-        last_balance = df['balance'].iloc[-1]
-        last_date = df['date'].iloc[-1]
+        # (users, forecast_days) matritsa
+        predicted = simulate_balances(last_balances, avg_daily_changes, forecast_days)
         
-        # Prognoz
-        future_dates = pd.date_range(start=last_date + timedelta(days=1), periods=forecast_days)
+        results = []
+        for i, df in enumerate(daily_dfs):
+            last_date = df['date'].iloc[-1]
+            future_dates = pd.date_range(start=last_date + timedelta(days=1), periods=forecast_days)
+            
+            forecast_df = pd.DataFrame({
+                'date': future_dates,
+                'predicted_balance': predicted[i],
+                'lower_bound': predicted[i] * 0.85,  # Kengroq diapazon (risk)
+                'upper_bound': predicted[i] * 1.15
+            })
+            
+            metadata = {
+                'method': 'simulation_v2',
+                'avg_daily_change': avg_daily_changes[i],
+                'history_days': len(df),
+                'market_context': 'conservative_with_seasonality'
+            }
+            results.append((forecast_df, metadata))
         
-        predicted_balances = []
-        current_val = last_balance
+        return results
+    
+    async def forecast_with_prophet_async(
+        self,
+        df: pd.DataFrame,
+        forecast_days: int = 90,
+        model_key: Optional[str] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        forecast_with_prophet'ni forecast_executor (process pool) orqali bajarish.
+        Event loop bloklanmaydi; timeout bo'lsa xato metadata qaytadi.
+        """
+        try:
+            return await forecast_executor.run(_prophet_worker, df, forecast_days, model_key)
+        except asyncio.TimeoutError:
+            return pd.DataFrame(), {
+                'method': 'prophet',
+                'error': f'Prophet {forecast_executor.timeout_seconds}s ichida tugamadi (timeout)'
+            }
+        except Exception as e:
+            print(f"Prophet executor xatosi: {str(e)}")
+            return pd.DataFrame(), {'method': 'prophet', 'error': str(e)}
+    
+    async def forecast_hybrid(
+        self,
+        daily_df: pd.DataFrame,
+        forecast_days: int = 90,
+        user_id: Optional[Any] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Gibrid prognoz: tarix yetarli bo'lsa Prophet (process pool'da), aks holda
+        yoki Prophet xato/timeout bo'lsa - Simulation.
+        """
+        # Tarix uzunligini tekshirish
+        history_days = len(daily_df)
         
-        for i in range(forecast_days):
-            # Oddiy mavsumiylik simulatsiyasi (sinusoida) - bozor tebranishi
-            # 30 kunlik sikl
-            seasonality_factor = 1 + 0.05 * np.sin(2 * np.pi * i / 30)
-            
-            # Keyingi kun balansi
-            current_val += adjusted_growth * seasonality_factor
-            predicted_balances.append(current_val)
+        if history_days < self.min_days_for_timeseries:
+            return self.forecast_with_simulation(daily_df, forecast_days)
         
-        forecast_df = pd.DataFrame({
-            'date': future_dates,
-            'predicted_balance': predicted_balances,
-            'lower_bound': [b * 0.85 for b in predicted_balances],  # Kengroq diapazon (risk)
-            'upper_bound': [b * 1.15 for b in predicted_balances]
-        })
-        
-        metadata = {
-            'method': 'simulation_v2',
-            'avg_daily_change': avg_daily_change,
-            'history_days': len(df),
-            'market_context': 'conservative_with_seasonality'
-        }
+        forecast_df, metadata = await self.forecast_with_prophet_async(
+            daily_df, forecast_days, model_key=str(user_id) if user_id else None
+        )
+        # Agar Prophet xato bersa, Simulation'ga o'tish
+        if forecast_df.empty and 'error' in metadata:
+            print(f"Prophet failed, falling back to simulation: {metadata['error']}")
+            forecast_df, metadata = self.forecast_with_simulation(daily_df, forecast_days)
+            metadata['fallback'] = True
         
         return forecast_df, metadata
     
-    def run_forecast(
+    async def run_forecast(
         self,
-        transactions: List[Dict[str, Any]],
+        transactions: Union[pd.DataFrame, List[Dict[str, Any]]],
         initial_balance: float = 0,
-        forecast_days: int = 90
+        forecast_days: int = 90,
+        user_id: Optional[Any] = None
     ) -> Dict[str, Any]:
         """
         Asosiy prognoz funksiyasi (gibrid).
@@ -187,6 +312,7 @@ class ForecastingService:
             transactions: Tranzaksiyalar ro'yxati
             initial_balance: Boshlang'ich balans
             forecast_days: Prognoz kunlari
+            user_id: Berilsa, Prophet modeli shu user uchun omborda saqlanadi
             
         Returns:
             Prognoz natijalari
@@ -204,19 +330,8 @@ class ForecastingService:
         # Kunlik balans
         daily_df = self.calculate_daily_balance(df, initial_balance)
         
-        # Tarix uzunligini tekshirish
-        history_days = len(daily_df)
-        
         # Gibrid yondashuv
-        if history_days >= self.min_days_for_timeseries:
-            forecast_df, metadata = self.forecast_with_prophet(daily_df, forecast_days)
-            # Agar Prophet xato bersa, Simulation'ga o'tish
-            if forecast_df.empty and 'error' in metadata:
-                print(f"Prophet failed, falling back to simulation: {metadata['error']}")
-                forecast_df, metadata = self.forecast_with_simulation(daily_df, forecast_days)
-                metadata['fallback'] = True
-        else:
-            forecast_df, metadata = self.forecast_with_simulation(daily_df, forecast_days)
+        forecast_df, metadata = await self.forecast_hybrid(daily_df, forecast_days, user_id)
         
         if forecast_df.empty:
             return {
@@ -239,42 +354,22 @@ class ForecastingService:
             'current_balance': float(daily_df['balance'].iloc[-1])
         }
 
-    def predict_cash_flow(
+    async def predict_cash_flow(
         self,
         df: pd.DataFrame,
         initial_balance: float = 0,
-        days: int = 90
+        days: int = 90,
+        user_id: Optional[Any] = None
     ) -> pd.DataFrame:
         """
         Likvidlik analizi uchun prognoz qaytaruvchi yordamchi metod.
         """
-        # Agar df da 'signed_amount' yo'q bo'lsa (raw transactions), uni tayyorlash kerak.
-        # Lekin LiquidityAnalysisUseCase da biz shunchaki DataFrame(transactions) qilib yubordik.
-        # U yerda prepare_data ni chaqirish kerak edi yoki bu yerda handle qilish kerak.
-        
-        # Agar 'signed_amount' bo'lmasa, prepare_data ni chaqiramiz (lekin u dict list kutadi)
-        # Keling, df ni list of dicts ga o'girib prepare_data qilamiz yoki logikani takrorlaymiz.
-        # Yaxshirog'i, bu yerda logikani takrorlaymiz.
-        
+        # Agar df da 'signed_amount' bo'lmasa (raw transactions), prepare_data bilan bir xil tayyorlash
         if 'signed_amount' not in df.columns:
-            # Simple preparation
-            df['date'] = pd.to_datetime(df['date'])
-            df['amount'] = pd.to_numeric(df['amount'])
-            df['signed_amount'] = df.apply(
-                lambda row: -row['amount'] if row.get('is_expense', True) else row['amount'],
-                axis=1
-            )
-            df = df.sort_values('date')
+            df = self._prepare_frame(df.copy())
 
         daily_df = self.calculate_daily_balance(df, initial_balance)
-        history_days = len(daily_df)
-        
-        if history_days >= self.min_days_for_timeseries:
-            forecast_df, metadata = self.forecast_with_prophet(daily_df, days)
-            if forecast_df.empty and 'error' in metadata:
-                 forecast_df, metadata = self.forecast_with_simulation(daily_df, days)
-        else:
-            forecast_df, metadata = self.forecast_with_simulation(daily_df, days)
+        forecast_df, metadata = await self.forecast_hybrid(daily_df, days, user_id)
             
         return forecast_df
 
@@ -366,8 +461,8 @@ class ForecastingService:
         if prev_period.empty:
             return [] # Solishtirish uchun ma'lumot yo'q
             
-        current_stats = current_period.groupby('category')['amount'].sum().abs()
-        prev_stats = prev_period.groupby('category')['amount'].sum().abs()
+        current_stats = current_period.groupby('category', observed=True)['amount'].sum().abs()
+        prev_stats = prev_period.groupby('category', observed=True)['amount'].sum().abs()
         
         for category, current_amount in current_stats.items():
             prev_amount = prev_stats.get(category, 0)
@@ -429,7 +524,12 @@ class ForecastingService:
 forecasting_service = ForecastingService()
 
 
-# Global instance
-forecasting_service = ForecastingService()
+def _prophet_worker(
+    df: pd.DataFrame,
+    forecast_days: int,
+    model_key: Optional[str]
+) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """forecast_executor process pool'ida bajariladigan funksiya (pickle qilinadigan top-level)."""
+    return forecasting_service.forecast_with_prophet(df, forecast_days, model_key=model_key)
 
 
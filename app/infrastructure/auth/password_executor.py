@@ -0,0 +1,76 @@
+"""
+Infrastructure - Password Hashing Executor
+
+bcrypt hash/verify (har biri ~100-300ms CPU) event loop'dan tashqarida,
+chegaralangan thread pool'da bajariladi. bcrypt hisoblash vaqtida GIL'ni
+bo'shatadi, shuning uchun thread'lar yadrolar bo'yicha parallel ishlaydi,
+boshqa endpointlar esa login to'lqini paytida ham javob berishda davom etadi.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.infrastructure.db.database import settings
+
+
+class PasswordExecutor:
+    """Parol hash'lash uchun o'lchami cheklangan thread pool (navbat va metrikalar bilan)."""
+
+    def __init__(self, max_workers: int = 0):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Metrikalar
+        self.in_flight = 0
+        self.completed = 0
+        self.total_seconds = 0.0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password")
+            return self._pool
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Funksiyani pool'da bajarish (bir vaqtda ko'pi bilan max_workers ta, qolganlari navbatda)."""
+        future = self._get_pool().submit(fn, *args)
+
+        started_at = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+        future.add_done_callback(lambda f: self._on_done(f, started_at))
+
+        return await asyncio.wrap_future(future)
+
+    def _on_done(self, future: Future, started_at: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_seconds += time.monotonic() - started_at
+
+    def stats(self) -> Dict[str, Any]:
+        """Navbat chuqurligi va o'rtacha kutish+hisoblash vaqti."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.max_workers),
+                "completed": self.completed,
+                "avg_seconds": round(self.total_seconds / self.completed, 3) if self.completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Ilova to'xtaganda pool'ni yopish."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global instance
+password_executor = PasswordExecutor(max_workers=settings.password_hash_workers)
@@ -9,11 +9,12 @@ from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.infrastructure.auth.password_executor import password_executor
 from app.infrastructure.db.database import settings
 
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing (mavjud hash'lar o'z rounds qiymati bilan tekshiriladi)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
 
 def hash_password(password: str) -> str:
@@ -26,6 +27,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def hash_password_async(password: str) -> str:
+    """hash_password - password_executor'da (event loop bloklanmaydi)."""
+    return await password_executor.run(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password - password_executor'da (event loop bloklanmaydi)."""
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Access token yaratish.
@@ -68,15 +79,56 @@ def decode_access_token(token: str) -> Optional[dict]:
 
 
 # Dependency imports
+import uuid
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.infrastructure.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.infrastructure.db.database import get_async_db, release_connection
 from app.infrastructure.db.models import UserModel
+from app.infrastructure.auth.user_cache import UserSnapshot, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserModel:
+
+def parse_user_id(payload: Optional[dict]) -> Optional[uuid.UUID]:
+    """Token payload'idagi user_id (UUID) - yo'q yoki noto'g'ri bo'lsa None."""
+    if not payload or not payload.get("user_id"):
+        return None
+    try:
+        return uuid.UUID(str(payload["user_id"]))
+    except ValueError:
+        return None
+
+
+async def load_user(db: AsyncSession, user_id: uuid.UUID) -> Optional[UserModel]:
+    """
+    Foydalanuvchini async sessiya orqali o'qish. Ulanish darhol pool'ga qaytariladi -
+    endpoint sinxron sessiyadan ham foydalansa, so'rov bir vaqtda ikki ulanish ushlab turmaydi.
+    """
+    result = await db.execute(select(UserModel).where(UserModel.id == user_id))
+    user = result.scalars().first()
+    await release_connection(db)
+    return user
+
+
+async def get_user_snapshot(db: AsyncSession, user_id: uuid.UUID) -> Optional[UserSnapshot]:
+    """Foydalanuvchi snapshot'i: avval user_cache, bo'lmasa bazadan o'qib keshlanadi."""
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        return snapshot
+    
+    version = user_cache.version(user_id)
+    user = await load_user(db, user_id)
+    if user is None:
+        return None
+    snapshot = UserSnapshot.from_model(user)
+    user_cache.put(snapshot, version)
+    return snapshot
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserSnapshot:
     """Joriy foydalanuvchini aniqlash."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,11 +140,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if payload is None:
         raise credentials_exception
         
-    user_id: str = payload.get("user_id")
+    user_id = parse_user_id(payload)
     if user_id is None:
         raise credentials_exception
         
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await get_user_snapshot(db, user_id)
     if user is None:
         raise credentials_exception
         
@@ -0,0 +1,119 @@
+"""
+Infrastructure - Authenticated User Cache
+
+Autentifikatsiya qilingan foydalanuvchilarning jarayon ichidagi qisqa TTL keshi.
+Har bir so'rovda JWT decode qilinadi, lekin foydalanuvchi bazadan faqat kesh
+bo'sh yoki eskirgan bo'lsa o'qiladi. Keshda o'zgarmas snapshot saqlanadi
+(ORM obyekti emas) - u sessiyaga bog'lanmagan va so'rovlar o'rtasida umumiy.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.infrastructure.db.database import settings
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Foydalanuvchining o'zgarmas nusxasi (parol hash'isiz) - endpointlardagi current_user."""
+
+    id: uuid.UUID
+    email: str
+    auth_provider: str
+    business_type: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, user: Any) -> "UserSnapshot":
+        """UserModel'dan snapshot."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            auth_provider=user.auth_provider,
+            business_type=user.business_type,
+            created_at=user.created_at,
+        )
+
+
+class UserCache:
+    """
+    user_id -> UserSnapshot uchun chegaralangan LRU + TTL kesh.
+
+    update_user_me kabi yozuvlar invalidate() chaqiradi. TTL boshqa uvicorn
+    worker'laridagi o'zgarishlar uchun eskirish chegarasi.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # user_id -> (snapshot, cached_at)
+        self._entries: "OrderedDict[uuid.UUID, Tuple[UserSnapshot, float]]" = OrderedDict()
+        # Invalidatsiya hisoblagichi: yuklash davomida o'zgargan userni keshlamaslik uchun
+        self._versions: Dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: uuid.UUID) -> Optional[UserSnapshot]:
+        """Keshdagi snapshot (yo'q yoki TTL o'tgan bo'lsa - None)."""
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                snapshot, cached_at = entry
+                if time.monotonic() - cached_at < self.ttl_seconds:
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return snapshot
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def version(self, user_id: uuid.UUID) -> int:
+        """Bazadan o'qishdan oldin olinadi va put()'ga uzatiladi."""
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def put(self, snapshot: UserSnapshot, version: int) -> None:
+        """Snapshot'ni keshlash (o'qish davomida invalidate bo'lgan bo'lsa - keshlanmaydi)."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if self._versions.get(snapshot.id, 0) != version:
+                return
+            self._entries[snapshot.id] = (snapshot, time.monotonic())
+            self._entries.move_to_end(snapshot.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        """Foydalanuvchi ma'lumoti o'zgarganda chaqiriladi."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Kesh statistikasi."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+# Global instance
+user_cache = UserCache(
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    max_entries=settings.user_cache_max_entries,
+)
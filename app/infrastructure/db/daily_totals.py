@@ -0,0 +1,230 @@
+"""
+Infrastructure Layer - Daily Category Totals
+
+daily_category_totals jadvalini yuritish va o'qish. Jadval tranzaksiyalar bilan
+bitta tranzaksiyada yangilanadi: yuklashda batch agregatlari upsert qilinadi,
+tahrirlash/o'chirishda faqat tegishli (kun, kategoriya, turi) guruhlari qayta hisoblanadi.
+Dashboard va filtrlar shu jadvaldan o'qiydi - hajm tranzaksiyalar soniga emas, kunlar soniga bog'liq.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Any, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, cast, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import DailyCategoryTotalModel, TransactionModel
+
+
+# (kun, kategoriya, is_expense) - agregat guruhi kaliti
+GroupKey = Tuple[date, str, bool]
+
+# Agregat DataFrame'i: transaction_loader frame'i bilan bir xil nomlar,
+# amount - kunlik summa; count/min_amount/max_amount - qo'shimcha
+DAILY_FRAME_DTYPES = {
+    "date": "datetime64[ns]",
+    "category": "category",
+    "is_expense": "bool",
+    "amount": "float64",
+    "count": "int64",
+    "min_amount": "float64",
+    "max_amount": "float64",
+}
+
+
+def _group_key(day: Any, category: Any, is_expense: Any) -> GroupKey:
+    if isinstance(day, datetime):
+        day = day.date()
+    return day, category or "", bool(is_expense)
+
+
+class DailyTotalsStore:
+    """daily_category_totals jadvali ustidagi amallar (commit chaqiruvchi tomonida)."""
+
+    def group_key(self, transaction: TransactionModel) -> GroupKey:
+        """Tranzaksiya tegishli bo'lgan agregat guruhi."""
+        return _group_key(transaction.date, transaction.category, transaction.is_expense)
+
+    def apply_batch(self, db: Session, user_id: Any, batch: pd.DataFrame) -> None:
+        """
+        Yangi yozilgan batch'ni agregatga qo'shish (summa, soni, min/max).
+        PostgreSQL/SQLite'da bitta INSERT ... ON CONFLICT DO UPDATE.
+        """
+        if batch.empty:
+            return
+
+        grouped = (
+            pd.DataFrame({
+                "day": batch["date"].dt.normalize(),
+                "category": batch["category"].fillna("").astype(str),
+                "is_expense": batch["is_expense"].astype(bool),
+                "amount": batch["amount"].round(2),
+            })
+            .groupby(["day", "category", "is_expense"], sort=False)["amount"]
+            .agg(["sum", "count", "min", "max"])
+            .reset_index()
+        )
+        rows = [
+            {
+                "user_id": user_id,
+                "day": day.date(),
+                "category": category,
+                "is_expense": bool(is_expense),
+                "total_amount": round(total, 2),
+                "txn_count": int(count),
+                "min_amount": low,
+                "max_amount": high,
+            }
+            for day, category, is_expense, total, count, low, high in zip(
+                grouped["day"], grouped["category"], grouped["is_expense"],
+                grouped["sum"].tolist(), grouped["count"].tolist(),
+                grouped["min"].tolist(), grouped["max"].tolist(),
+            )
+        ]
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+            least, greatest = func.least, func.greatest
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+            # SQLite'da ko'p argumentli min()/max() skalyar funksiya
+            least, greatest = func.min, func.max
+        else:
+            # Boshqa bazalar: insert allaqachon bajarilgan, guruhlarni xom qatorlardan qayta hisoblaymiz
+            self.refresh_groups(db, user_id, [(r["day"], r["category"], r["is_expense"]) for r in rows])
+            return
+
+        table = DailyCategoryTotalModel.__table__
+        stmt = upsert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.day, table.c.category, table.c.is_expense],
+            set_={
+                "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+                "txn_count": table.c.txn_count + stmt.excluded.txn_count,
+                "min_amount": least(table.c.min_amount, stmt.excluded.min_amount),
+                "max_amount": greatest(table.c.max_amount, stmt.excluded.max_amount),
+            },
+        )
+        db.execute(stmt, rows)
+
+    def refresh_groups(self, db: Session, user_id: Any, keys: Iterable[GroupKey]) -> None:
+        """
+        Berilgan guruhlarni tranzaksiyalardan qayta hisoblash (tahrirlash/o'chirishdan keyin).
+        Sessiyadagi o'zgarishlar avval flush qilinadi.
+        """
+        db.flush()
+        table = DailyCategoryTotalModel.__table__
+
+        for day, category, is_expense in set(keys):
+            start = datetime.combine(day, time.min)
+            if category:
+                category_filter = TransactionModel.category == category
+            else:
+                category_filter = or_(TransactionModel.category.is_(None), TransactionModel.category == "")
+
+            total, count, low, high = db.execute(
+                select(
+                    func.sum(TransactionModel.amount),
+                    func.count(),
+                    func.min(TransactionModel.amount),
+                    func.max(TransactionModel.amount),
+                ).where(
+                    TransactionModel.user_id == user_id,
+                    TransactionModel.date >= start,
+                    TransactionModel.date < start + timedelta(days=1),
+                    category_filter,
+                    TransactionModel.is_expense == is_expense,
+                )
+            ).one()
+
+            db.execute(delete(table).where(
+                table.c.user_id == user_id,
+                table.c.day == day,
+                table.c.category == category,
+                table.c.is_expense == is_expense,
+            ))
+            if count:
+                db.execute(insert(table).values(
+                    user_id=user_id, day=day, category=category, is_expense=is_expense,
+                    total_amount=total, txn_count=count, min_amount=low, max_amount=high,
+                ))
+
+    def clear_user(self, db: Session, user_id: Any) -> None:
+        """Foydalanuvchining barcha agregatlarini o'chirish."""
+        db.execute(delete(DailyCategoryTotalModel).where(DailyCategoryTotalModel.user_id == user_id))
+
+    def rebuild(self, db: Session, user_id: Any = None) -> None:
+        """
+        Agregatni tranzaksiyalardan to'liq qayta qurish (user_id berilmasa - barcha userlar uchun).
+        Qo'lda tiklash uchun (migrate_db.py --rebuild-daily-totals).
+        """
+        table = DailyCategoryTotalModel.__table__
+        # date() - PostgreSQL va SQLite'da timestamp'dan kunni ajratadi
+        day = func.date(TransactionModel.date)
+        category = func.coalesce(TransactionModel.category, "")
+        source = select(
+            TransactionModel.user_id,
+            day,
+            category,
+            TransactionModel.is_expense,
+            func.sum(TransactionModel.amount),
+            func.count(),
+            func.min(TransactionModel.amount),
+            func.max(TransactionModel.amount),
+        ).group_by(TransactionModel.user_id, day, category, TransactionModel.is_expense)
+
+        cleanup = delete(table)
+        if user_id is not None:
+            source = source.where(TransactionModel.user_id == user_id)
+            cleanup = cleanup.where(table.c.user_id == user_id)
+
+        db.execute(cleanup)
+        db.execute(insert(table).from_select(
+            ["user_id", "day", "category", "is_expense", "total_amount", "txn_count", "min_amount", "max_amount"],
+            source,
+        ))
+
+    def load_frame(self, db: Session, user_id: Any) -> pd.DataFrame:
+        """
+        Foydalanuvchi agregatlarini DataFrame sifatida yuklash (DAILY_FRAME_DTYPES).
+        Faqat o'qiydi: mavjud tranzaksiyalar alembic migratsiyasida (0002) to'liq backfill qilinadi.
+        """
+        model = DailyCategoryTotalModel
+        rows = db.execute(
+            select(
+                model.day,
+                model.category,
+                model.is_expense,
+                cast(model.total_amount, Float),
+                model.txn_count,
+                cast(model.min_amount, Float),
+                cast(model.max_amount, Float),
+            ).where(model.user_id == user_id)
+        ).all()
+        return self.rows_to_frame(rows)
+
+    def rows_to_frame(self, rows) -> pd.DataFrame:
+        """Kursor qatorlarini agregat DataFrame'iga aylantirish."""
+        if not rows:
+            return pd.DataFrame({
+                column: pd.Series(dtype=dtype) for column, dtype in DAILY_FRAME_DTYPES.items()
+            })
+
+        days, categories, is_expense, totals, counts, lows, highs = zip(*rows)
+        return pd.DataFrame({
+            "date": pd.to_datetime(pd.Series(days)).to_numpy(dtype="datetime64[ns]"),
+            # '' - kategoriyasiz tranzaksiyalar (xom frame'dagi kabi NaN)
+            "category": pd.Categorical([category or None for category in categories]),
+            "is_expense": np.asarray(is_expense, dtype=bool),
+            "amount": np.asarray(totals, dtype="float64"),
+            "count": np.asarray(counts, dtype="int64"),
+            "min_amount": np.asarray(lows, dtype="float64"),
+            "max_amount": np.asarray(highs, dtype="float64"),
+        })
+
+
+# Global instance
+daily_totals = DailyTotalsStore()
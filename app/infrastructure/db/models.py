@@ -4,7 +4,7 @@ Infrastructure Layer - SQLAlchemy ORM Models
 Database models (tables).
 """
 
-from sqlalchemy import Column, String, DateTime, Boolean, DECIMAL, ForeignKey, Text
+from sqlalchemy import Column, String, Date, DateTime, Boolean, DECIMAL, ForeignKey, Index, Integer, JSON, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -34,6 +34,12 @@ class TransactionModel(Base):
     """Transaction table."""
     
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Har bir endpoint user_id bo'yicha, dashboard/ro'yxat sana oralig'i bo'yicha o'qiydi
+        Index("ix_transactions_user_id_date", "user_id", "date"),
+        # Kategoriya filtri (dashboard, summa filtrlari bilan) uchun
+        Index("ix_transactions_user_id_category_date", "user_id", "category", "date"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -47,3 +53,35 @@ class TransactionModel(Base):
     
     # Relationships
     user = relationship("UserModel", back_populates="transactions")
+
+
+class DailyCategoryTotalModel(Base):
+    """Kunlik agregat: (user, kun, kategoriya, turi) bo'yicha summa va soni - dashboard shundan o'qiydi."""
+    
+    __tablename__ = "daily_category_totals"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True, default="")  # Kategoriyasiz tranzaksiyalar '' da
+    is_expense = Column(Boolean, primary_key=True)
+    total_amount = Column(DECIMAL(18, 2), nullable=False, default=0)
+    txn_count = Column(Integer, nullable=False, default=0)
+    min_amount = Column(DECIMAL(15, 2), nullable=True)  # Filtr opsiyalari (summa oralig'i) uchun
+    max_amount = Column(DECIMAL(15, 2), nullable=True)
+
+
+class UploadTaskModel(Base):
+    """Background upload tasklari holati (bir nechta worker uchun umumiy)."""
+    
+    __tablename__ = "upload_tasks"
+    
+    id = Column(String(36), primary_key=True)
+    status = Column(String(20), nullable=False, default="pending")
+    progress = Column(Integer, nullable=False, default=0)
+    message = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    lease_owner = Column(String(255), nullable=True)  # Taskni bajarayotgan worker
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
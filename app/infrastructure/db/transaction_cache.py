@@ -0,0 +1,115 @@
+"""
+Infrastructure Layer - Transaction Frame Cache
+
+Foydalanuvchi tranzaksiyalari DataFrame'ining jarayon ichidagi (in-process) LRU keshi.
+Ma'lumot faqat yuklash, tahrirlash va o'chirishda o'zgaradi, shuning uchun
+kesh user_id + ma'lumot versiyasi bo'yicha saqlanadi va yozish endpointlari
+versiyani oshiradi (write-through invalidation).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.daily_totals import daily_totals
+from app.infrastructure.db.database import settings
+from app.infrastructure.db.transaction_loader import transaction_loader
+
+
+class TransactionFrameCache:
+    """
+    Per-user tayyor DataFrame'lar uchun chegaralangan LRU kesh.
+
+    Qaytarilgan DataFrame'lar so'rovlar o'rtasida umumiy - ularni o'zgartirmang
+    (servislar ishlashdan oldin nusxa oladi).
+    TTL bir nechta uvicorn worker holatida boshqa jarayondagi yozuvlar uchun
+    xavfsizlik chegarasi bo'lib xizmat qiladi.
+    """
+
+    def __init__(self, max_users: int = 256, ttl_seconds: int = 300):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        # (user_id, kind) -> (version, loaded_at, frame); kind: 'transactions' yoki 'daily'
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[int, float, pd.DataFrame]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_frame(self, db: Session, user_id: Any) -> pd.DataFrame:
+        """Foydalanuvchi DataFrame'ini keshdan olish yoki bazadan yuklash."""
+        return self._get(db, user_id, "transactions", transaction_loader.load_frame)
+
+    def get_daily_frame(self, db: Session, user_id: Any) -> pd.DataFrame:
+        """Foydalanuvchining kunlik agregatlari (daily_category_totals) DataFrame'i."""
+        return self._get(db, user_id, "daily", daily_totals.load_frame)
+
+    async def get_frame_async(self, db: AsyncSession, user_id: Any) -> pd.DataFrame:
+        """get_frame - async sessiya orqali (bazadan o'qish event loop'ni bloklamaydi)."""
+        return await db.run_sync(self._get, user_id, "transactions", transaction_loader.load_frame)
+
+    async def get_daily_frame_async(self, db: AsyncSession, user_id: Any) -> pd.DataFrame:
+        """get_daily_frame - async sessiya orqali."""
+        return await db.run_sync(self._get, user_id, "daily", daily_totals.load_frame)
+
+    def _get(self, db: Session, user_id: Any, kind: str, loader: Callable[[Session, Any], pd.DataFrame]) -> pd.DataFrame:
+        user_key = str(user_id)
+        key = (user_key, kind)
+
+        with self._lock:
+            version = self._versions.get(user_key, 0)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, loaded_at, frame = entry
+                if entry_version == version and time.monotonic() - loaded_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return frame
+                del self._entries[key]
+            self.misses += 1
+
+        # Bazadan o'qish lock'dan tashqarida (boshqa userlarni bloklamaslik uchun)
+        frame = loader(db, user_id)
+
+        with self._lock:
+            # Yuklash davomida versiya oshgan bo'lsa, eskirgan natijani keshlamaymiz
+            if self._versions.get(user_key, 0) == version:
+                self._entries[key] = (version, time.monotonic(), frame)
+                self._entries.move_to_end(key)
+                # Har bir user uchun ikki xil frame bo'lishi mumkin
+                while len(self._entries) > self.max_users * 2:
+                    self._entries.popitem(last=False)
+
+        return frame
+
+    def invalidate(self, user_id: Any) -> None:
+        """Foydalanuvchi ma'lumot versiyasini oshirish (yozishdan keyin chaqiriladi)."""
+        user_key = str(user_id)
+        with self._lock:
+            self._versions[user_key] = self._versions.get(user_key, 0) + 1
+            self._entries.pop((user_key, "transactions"), None)
+            self._entries.pop((user_key, "daily"), None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Kesh statistikasi."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_users": self.max_users,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+# Global instance
+transaction_cache = TransactionFrameCache(
+    max_users=settings.transaction_cache_max_users,
+    ttl_seconds=settings.transaction_cache_ttl_seconds,
+)
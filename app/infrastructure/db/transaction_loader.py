@@ -0,0 +1,118 @@
+"""
+Infrastructure Layer - Transaction Frame Loader
+
+Foydalanuvchi tranzaksiyalarini ORM obyektlarisiz, to'g'ridan-to'g'ri
+ustunli (columnar) pandas DataFrame ko'rinishida yuklash.
+"""
+
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Float, cast, select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import TransactionModel
+
+
+# Servislar ishlatadigan ustunlar va ularning turlari
+TRANSACTION_FRAME_DTYPES = {
+    "date": "datetime64[ns]",
+    "amount": "float64",
+    "description": "object",
+    "category": "category",
+    "is_expense": "bool",
+    "is_fixed": "bool",
+}
+
+TRANSACTION_FRAME_COLUMNS = list(TRANSACTION_FRAME_DTYPES.keys())
+
+
+class TransactionFrameLoader:
+    """
+    Tranzaksiyalarni faqat kerakli ustunlar bilan o'qib, tiplangan DataFrame qaytaradi.
+
+    Har bir qator uchun ORM obyekt yaratish, strftime va float(Decimal)
+    konvertatsiyalari o'rniga natija kursor qatorlaridan bir marta ustunlarga
+    ajratiladi va vektorli turlarga o'tkaziladi.
+    """
+
+    def build_query(
+        self,
+        user_id: Any,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+        category: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+    ):
+        """
+        Foydalanuvchi tranzaksiyalari uchun SELECT (faqat kerakli ustunlar).
+        Berilgan filtrlar WHERE'ga qo'shiladi - (user_id, date) va
+        (user_id, category, date) indekslari faqat kerakli qatorlarni o'qiydi.
+        """
+        query = select(
+            TransactionModel.date,
+            # Decimal -> float konvertatsiyasini bazaning o'ziga topshiramiz
+            cast(TransactionModel.amount, Float).label("amount"),
+            TransactionModel.description,
+            TransactionModel.category,
+            TransactionModel.is_expense,
+            TransactionModel.is_fixed,
+        ).where(TransactionModel.user_id == user_id)
+
+        # Frame sanalari kun boshiga normallashtiriladi - oraliq butun kunlargacha kengaytiriladi
+        if start is not None:
+            query = query.where(TransactionModel.date >= pd.Timestamp(start).normalize().to_pydatetime())
+        if end is not None:
+            next_day = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+            query = query.where(TransactionModel.date < next_day.to_pydatetime())
+        if category:
+            query = query.where(TransactionModel.category == category)
+        if min_amount is not None:
+            query = query.where(TransactionModel.amount >= min_amount)
+        if max_amount is not None:
+            query = query.where(TransactionModel.amount <= max_amount)
+        return query
+
+    def load_frame(self, db: Session, user_id: Any, **filters) -> pd.DataFrame:
+        """
+        Foydalanuvchining tranzaksiyalarini DataFrame sifatida yuklash.
+        filters - build_query filtrlari (start, end, category, min_amount, max_amount);
+        berilmasa - barcha tranzaksiyalar.
+
+        Returns:
+            date (datetime64, kun boshiga normallashtirilgan), amount (float64),
+            description, category (category), is_expense (bool), is_fixed (bool)
+            ustunli DataFrame. Tranzaksiya bo'lmasa - bo'sh DataFrame.
+        """
+        rows = db.execute(self.build_query(user_id, **filters)).all()
+        return self.rows_to_frame(rows)
+
+    def rows_to_frame(self, rows) -> pd.DataFrame:
+        """Kursor qatorlarini (tuple) tiplangan DataFrame'ga aylantirish."""
+        if not rows:
+            return self.empty_frame()
+
+        dates, amounts, descriptions, categories, is_expense, is_fixed = zip(*rows)
+
+        df = pd.DataFrame({
+            # Eski dict formatida sana '%Y-%m-%d' string edi - kun aniqligini saqlaymiz
+            "date": pd.to_datetime(np.asarray(dates, dtype="datetime64[ns]")).normalize(),
+            "amount": np.asarray(amounts, dtype="float64"),
+            "description": np.asarray(descriptions, dtype=object),
+            "category": pd.Categorical(categories),
+            "is_expense": np.asarray(is_expense, dtype=bool),
+            "is_fixed": np.asarray(is_fixed, dtype=bool),
+        })
+        return df
+
+    def empty_frame(self) -> pd.DataFrame:
+        """Kerakli ustun va turlarga ega bo'sh DataFrame."""
+        return pd.DataFrame({
+            column: pd.Series(dtype=dtype) for column, dtype in TRANSACTION_FRAME_DTYPES.items()
+        })
+
+
+# Global instance
+transaction_loader = TransactionFrameLoader()
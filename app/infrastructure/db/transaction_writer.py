@@ -0,0 +1,158 @@
+"""
+Infrastructure Layer - Transaction Bulk Writer
+
+Parse qilingan tranzaksiya batch'larini (ustunli DataFrame) bazaga ommaviy yozish.
+PostgreSQL (psycopg2) da COPY, boshqa drayverlarda (asyncpg, SQLite - testlar) executemany INSERT.
+"""
+
+import io
+import os
+import uuid
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.daily_totals import daily_totals
+from app.infrastructure.db.database import settings
+from app.infrastructure.db.models import TransactionModel
+from app.infrastructure.db.transaction_cache import transaction_cache
+
+
+# COPY/INSERT ustunlari tartibi
+WRITE_COLUMNS = [
+    "id", "user_id", "date", "amount", "description",
+    "category", "is_expense", "is_fixed", "created_at",
+]
+
+
+def generate_uuid4_bytes(count: int) -> np.ndarray:
+    """count ta UUID4 ni bitta urandom chaqiruvi bilan yaratish ((count, 16) uint8 massiv)."""
+    raw = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # versiya 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 varianti
+    return raw
+
+
+def uuid4_strings(count: int) -> pd.Series:
+    """count ta UUID4 ning '8-4-4-4-12' ko'rinishidagi string'lari (vektorli)."""
+    if count == 0:
+        return pd.Series([], dtype=object)
+    hexes = pd.Series(
+        np.frombuffer(generate_uuid4_bytes(count).tobytes().hex().encode("ascii"), dtype="S32").astype(str)
+    )
+    return (
+        hexes.str[:8] + "-" + hexes.str[8:12] + "-" + hexes.str[12:16]
+        + "-" + hexes.str[16:20] + "-" + hexes.str[20:]
+    )
+
+
+class TransactionBulkWriter:
+    """
+    Batch'larni settings.bulk_insert_batch_size o'lchamli bo'laklarda yozadi.
+    ORM obyektlari yaratilmaydi - har bir qator uchun alohida INSERT ham yo'q.
+    daily_category_totals agregati ham shu sessiyada yangilanadi.
+    """
+
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+
+    def write(self, db: Session, user_id: Any, batch: pd.DataFrame, commit: bool = True) -> int:
+        """
+        Batch'ni yozish.
+
+        Args:
+            db: Sessiya (yozuvlar shu sessiya tranzaksiyasida bajariladi)
+            user_id: Tranzaksiyalar egasi
+            batch: FileParsingService.to_batch formatidagi DataFrame
+            commit: True bo'lsa commit qilinadi va user keshi yangilanadi
+
+        Returns:
+            Yozilgan qatorlar soni
+        """
+        if batch.empty:
+            return 0
+
+        # COPY psycopg2 cursor'ini talab qiladi (async sessiyaning run_sync'ida - asyncpg, executemany)
+        dialect = db.get_bind().dialect
+        use_copy = dialect.name == "postgresql" and dialect.driver == "psycopg2"
+        created_at = datetime.utcnow()
+
+        for start in range(0, len(batch), self.batch_size):
+            part = batch.iloc[start:start + self.batch_size]
+            if use_copy:
+                self._copy(db, user_id, part, created_at)
+            else:
+                self._executemany(db, user_id, part, created_at)
+
+        # Kunlik agregat tranzaksiyalar bilan bitta tranzaksiyada yangilanadi
+        daily_totals.apply_batch(db, user_id, batch)
+
+        if commit:
+            db.commit()
+            transaction_cache.invalidate(user_id)
+        return len(batch)
+
+    def _copy(self, db: Session, user_id: Any, part: pd.DataFrame, created_at: datetime) -> None:
+        """PostgreSQL COPY ... FROM STDIN (CSV) orqali yozish."""
+        frame = pd.DataFrame({
+            "id": uuid4_strings(len(part)).to_numpy(),
+            "user_id": str(user_id),
+            "date": part["date"].dt.strftime("%Y-%m-%d %H:%M:%S").to_numpy(),
+            "amount": part["amount"].round(2).to_numpy(),
+            "description": part["description"].to_numpy(),
+            "category": part["category"].to_numpy(),
+            "is_expense": part["is_expense"].to_numpy(),
+            "is_fixed": part["is_fixed"].to_numpy(),
+            "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S.%f"),
+        }, columns=WRITE_COLUMNS)
+
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        # Sessiya ulanishining DBAPI (psycopg2) cursor'i - yozuv sessiya tranzaksiyasida qoladi
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {TransactionModel.__tablename__} ({', '.join(WRITE_COLUMNS)}) "
+                # Bo'sh description NULL emas, '' sifatida o'qilsin (NOT NULL ustun)
+                "FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (description))",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+    def _executemany(self, db: Session, user_id: Any, part: pd.DataFrame, created_at: datetime) -> None:
+        """Core insert() + executemany (SQLAlchemy insertmanyvalues bilan bitta statement)."""
+        ids = [uuid.UUID(bytes=raw.tobytes()) for raw in generate_uuid4_bytes(len(part))]
+        records = [
+            {
+                "id": txn_id,
+                "user_id": user_id,
+                "date": date.to_pydatetime(),
+                "amount": amount,
+                "description": description,
+                "category": category,
+                "is_expense": bool(is_expense),
+                "is_fixed": bool(is_fixed),
+                "created_at": created_at,
+            }
+            for txn_id, date, amount, description, category, is_expense, is_fixed in zip(
+                ids,
+                part["date"],
+                part["amount"].round(2).tolist(),
+                part["description"].tolist(),
+                part["category"].tolist(),
+                part["is_expense"].tolist(),
+                part["is_fixed"].tolist(),
+            )
+        ]
+        db.execute(insert(TransactionModel.__table__), records)
+
+
+# Global instance
+transaction_writer = TransactionBulkWriter(batch_size=settings.bulk_insert_batch_size)
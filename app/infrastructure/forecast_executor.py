@@ -0,0 +1,229 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from multiprocessing.pool import ThreadPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from app.infrastructure.db.database import settings
+
+
+def default_workers(web_concurrency: int = 1) -> int:
+    """
+    Bitta uvicorn worker jarayoni uchun fit slot'lari soni: yadrolar barcha
+    worker jarayonlari (WEB_CONCURRENCY) orasida bo'linadi.
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, web_concurrency))
+
+
+class ForecastExecutor:
+    """
+    Og'ir prognoz hisoblarini (Prophet/Stan fit) event loop'dan tashqarida bajarish.
+
+    Har bir slot - bitta worker'li alohida pool ("lane"). Vazifa bo'sh lane olgandan
+    keyin boshlanadi, shuning uchun timeout navbatda kutishni emas, faqat fit vaqtini
+    o'lchaydi. Timeout bo'lgan (yoki so'rovi bekor qilingan) fit'ning lane'i to'xtatiladi -
+    tashlab ketilgan fit yadroni band qilib turmaydi, boshqa lane'lar ishlashda davom etadi.
+    """
+
+    def __init__(self, max_workers: int = 0, timeout_seconds: float = 20.0, use_process_pool: bool = True):
+        self.max_workers = max_workers or default_workers()
+        self.timeout_seconds = timeout_seconds
+        self.use_process_pool = use_process_pool
+        # Barcha lane'lar, bo'sh lane'lar va bo'sh lane kutayotgan so'rovlar (loop, future)
+        self._lanes: Set[Any] = set()
+        self._idle: List[Any] = []
+        self._waiters: Deque = deque()
+        self._lock = threading.Lock()
+
+        # Metrikalar
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.recycled = 0
+        self.total_seconds = 0.0
+
+    def _new_lane_locked(self) -> Any:
+        """Yangi lane (self._lock ostida chaqiriladi - lane'lar soni max_workers'dan oshmasligi uchun)."""
+        if self.use_process_pool:
+            # spawn: uvicorn jarayonidagi thread/lock holatini meros qilib olmaslik uchun
+            lane = multiprocessing.get_context("spawn").Pool(processes=1)
+        else:
+            lane = ThreadPool(processes=1)
+        self._lanes.add(lane)
+        return lane
+
+    async def _acquire_lane(self) -> Any:
+        """Bo'sh lane olish: bo'sh lane yoki limitdan kam bo'lsa yangisi, aks holda navbat."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            if len(self._lanes) < self.max_workers:
+                return self._new_lane_locked()
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        return await waiter
+
+    def _release_lane(self, lane: Any) -> None:
+        """Lane'ni navbatdagi so'rovga berish yoki bo'sh lane'lar ro'yxatiga qaytarish."""
+        with self._lock:
+            if lane not in self._lanes:
+                return
+            if not self._waiters:
+                self._idle.append(lane)
+                return
+            loop, waiter = self._waiters.popleft()
+        try:
+            loop.call_soon_threadsafe(self._hand_over, waiter, lane)
+        except RuntimeError:
+            # loop yopilgan
+            self._release_lane(lane)
+
+    def _hand_over(self, waiter: asyncio.Future, lane: Any) -> None:
+        if waiter.done():
+            # Kutayotgan so'rov bekor qilingan - lane keyingisiga
+            self._release_lane(lane)
+        else:
+            waiter.set_result(lane)
+
+    def _recycle_lane(self, lane: Any) -> None:
+        """Lane'ni (ishlayotgan fit bilan birga) to'xtatish; o'rniga kerak bo'lganda yangisi yaratiladi."""
+        with self._lock:
+            self._lanes.discard(lane)
+            self.recycled += 1
+            # Bo'shagan slot uchun navbatdagi so'rovga yangi lane
+            waiter = self._waiters.popleft() if self._waiters else None
+            replacement = self._new_lane_locked() if waiter is not None else None
+        # terminate() worker jarayonini o'ldiradi va uning thread'larini kutadi - fonda
+        threading.Thread(target=lane.terminate, name="forecast-recycle", daemon=True).start()
+        if waiter is not None:
+            loop, future = waiter
+            try:
+                loop.call_soon_threadsafe(self._hand_over, future, replacement)
+            except RuntimeError:
+                self._release_lane(replacement)
+
+    async def run(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Funksiyani bo'sh lane'da bajarish va natijani kutish. Navbatda kutish timeout'ga kirmaydi.
+
+        Raises:
+            asyncio.TimeoutError: Vazifa boshlangandan keyin timeout ichida tugamasa
+        """
+        lane = await self._acquire_lane()
+        loop = asyncio.get_running_loop()
+        result = loop.create_future()
+        # Metrikalar fit tugaganda yoki tashlab ketilganda - bir marta yoziladi
+        task = {"started_at": time.monotonic(), "finished": False}
+        with self._lock:
+            self.in_flight += 1
+            self.submitted += 1
+
+        def on_done(value: Any, error: Optional[BaseException] = None) -> None:
+            # Pool'ning natija thread'ida chaqiriladi
+            self._on_done(task, error is None)
+            try:
+                loop.call_soon_threadsafe(_set_future, result, value, error)
+            except RuntimeError:
+                pass
+
+        lane.apply_async(fn, args, callback=on_done, error_callback=lambda error: on_done(None, error))
+
+        try:
+            value = await asyncio.wait_for(result, timeout or self.timeout_seconds)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            self._abandon(lane, task)
+            raise
+        except asyncio.CancelledError:
+            # So'rov bekor qilindi (mijoz uzildi) - fit natijasi endi kerak emas
+            self._abandon(lane, task)
+            raise
+        self._release_lane(lane)
+        return value
+
+    def _abandon(self, lane: Any, task: Dict[str, Any]) -> None:
+        """Natijasi kutilmaydigan fit: lane to'xtatiladi, fit muvaffaqiyatsiz hisoblanadi."""
+        self._on_done(task, False)
+        self._recycle_lane(lane)
+
+    def warm_up(self, modules: List[str]) -> None:
+        """
+        Lane'larni oldindan ishga tushirish va ularda modullarni import qilish,
+        shunda birinchi prognoz so'rovi spawn + import vaqtini kutmaydi.
+        """
+        with self._lock:
+            lanes = [self._new_lane_locked() for _ in range(self.max_workers - len(self._lanes))]
+        pending = [lane.apply_async(_import_modules, (modules,)) for lane in lanes]
+        try:
+            for item in pending:
+                item.get()
+        finally:
+            for lane in lanes:
+                self._release_lane(lane)
+
+    def _on_done(self, task: Dict[str, Any], ok: bool) -> None:
+        with self._lock:
+            if task["finished"]:
+                return
+            task["finished"] = True
+            self.in_flight -= 1
+            self.total_seconds += time.monotonic() - task["started_at"]
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Navbat chuqurligi va bajarilish metrikalari."""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "max_workers": self.max_workers,
+                "lanes": len(self._lanes),
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiters),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "recycled": self.recycled,
+                "avg_seconds": round(self.total_seconds / finished, 3) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Ilova to'xtaganda barcha lane'larni yopish."""
+        with self._lock:
+            lanes, self._lanes, self._idle = list(self._lanes), set(), []
+        for lane in lanes:
+            lane.terminate()
+
+
+def _set_future(future: asyncio.Future, value: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+
+
+def _import_modules(modules: List[str]) -> None:
+    """Worker jarayonida modullarni import qilish (warm-up uchun)."""
+    import importlib
+
+    for name in modules:
+        importlib.import_module(name)
+
+
+forecast_executor = ForecastExecutor(
+    max_workers=settings.forecast_workers or default_workers(settings.web_concurrency),
+    timeout_seconds=settings.forecast_timeout_seconds,
+    use_process_pool=settings.forecast_use_process_pool,
+)
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.infrastructure.db.database import settings
+from app.infrastructure.task_manager import task_manager
+
+
+class IngestionQueueFull(RuntimeError):
+    """Ingestion navbati to'la - yangi upload hozircha qabul qilinmaydi."""
+
+
+class IngestionWorker:
+    """
+    Uploadlarni qayta ishlash uchun uzoq yashovchi worker.
+    Bitta fon thread'ida bitta event loop, navbat va `concurrency` ta consumer ishlaydi:
+    uploadlar Starlette threadpool'ini band qilmaydi va LLM client ulanishlarini bo'lishadi.
+    heartbeat berilsa, u shu loop'da har heartbeat_interval_seconds'da (thread'da) chaqiriladi.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        queue_size: int = 100,
+        shutdown_timeout_seconds: float = 30.0,
+        heartbeat: Optional[Callable[[], None]] = None,
+        heartbeat_interval_seconds: float = 60.0,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.shutdown_timeout_seconds = shutdown_timeout_seconds
+        self.heartbeat = heartbeat
+        self.heartbeat_interval_seconds = heartbeat_interval_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+        # Metrikalar
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    def start(self) -> None:
+        """Worker thread'ini ishga tushirish (takroriy chaqiruvlar e'tiborsiz)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name="ingestion-worker", daemon=True)
+            self._thread.start()
+        self._ready.wait()
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """
+        Async funksiyani navbatga qo'yish (worker loop'ida bajariladi).
+
+        Raises:
+            IngestionQueueFull: Navbatda queue_size ta ish kutib turgan bo'lsa
+        """
+        self.start()
+        with self._lock:
+            if self.queued >= self.queue_size:
+                raise IngestionQueueFull("Yuklash navbati to'la, birozdan keyin qayta urinib ko'ring.")
+            self.queued += 1
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (fn, args))
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._consumers = [loop.create_task(self._consume()) for _ in range(self.concurrency)]
+        if self.heartbeat is not None:
+            self._consumers.append(loop.create_task(self._heartbeat()))
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def _consume(self) -> None:
+        while True:
+            fn, args = await self._queue.get()
+            started_at = time.monotonic()
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+            try:
+                await fn(*args)
+                with self._lock:
+                    self.completed += 1
+            except Exception as e:
+                print(f"Ingestion worker xatosi: {e}")
+                with self._lock:
+                    self.failed += 1
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.total_seconds += time.monotonic() - started_at
+                self._queue.task_done()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval_seconds)
+            try:
+                await asyncio.to_thread(self.heartbeat)
+            except Exception as e:
+                print(f"Ingestion worker heartbeat xatosi: {e}")
+
+    def shutdown(self) -> None:
+        """Navbatdagi va ishlayotgan uploadlarni timeout ichida kutish, keyin consumer'larni to'xtatish."""
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = None
+        if thread is None:
+            return
+
+        async def stop():
+            try:
+                await asyncio.wait_for(self._queue.join(), self.shutdown_timeout_seconds)
+            except asyncio.TimeoutError:
+                print(f"Ingestion worker: {self.running} ta upload tugamay to'xtatildi")
+            for consumer in self._consumers:
+                consumer.cancel()
+            await asyncio.gather(*self._consumers, return_exceptions=True)
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(stop(), loop)
+        thread.join(self.shutdown_timeout_seconds + 5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Navbat metrikalari."""
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "alive": self._thread is not None and self._thread.is_alive(),
+                "concurrency": self.concurrency,
+                "queue_size": self.queue_size,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_seconds": round(self.total_seconds / finished, 3) if finished else None
+            }
+
+
+# Global instance
+ingestion_worker = IngestionWorker(
+    concurrency=settings.ingestion_concurrency,
+    queue_size=settings.ingestion_queue_size,
+    # Navbatdagi va bajarilayotgan upload tasklari lease'ini muddati tugashidan oldin uzaytirish
+    heartbeat=task_manager.renew_leases,
+    heartbeat_interval_seconds=settings.task_lease_seconds / 3,
+)
@@ -4,10 +4,24 @@ Infrastructure Layer - OpenAI Client
 OpenAI GPT modellari bilan ishlash (Local LLM o'rniga).
 """
 
-from openai import AsyncOpenAI
-from typing import Optional, Dict, Any, List
+import asyncio
+import re
+import weakref
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 from app.infrastructure.db.database import settings
+from app.infrastructure.llm.response_cache import llm_response_cache
+
+
+# Tranzaksiya parsing prompti o'zgarsa, versiyani oshiring - LLM keshi eskiradi
+TRANSACTION_PROMPT_VERSION = "v1"
+
+# Aniq sana (01.03.2026, 2026-03-01, 1/3/26)
+_EXPLICIT_DATE_RE = re.compile(r"\d{1,4}[./-]\d{1,2}[./-]\d{1,4}")
+
+
+class NoTransactionsFound(ValueError):
+    """LLM javobi to'g'ri, lekin matnda tranzaksiya yo'q (qayta urinish shart emas)."""
 
 
 class OpenAIClient:
@@ -19,22 +33,49 @@ class OpenAIClient:
         # Ollama Configuration
         self.use_local = False
         import os
-        ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+        self.ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
         ollama_model = os.getenv("OLLAMA_MODEL", "qwen2.5:3b")
 
         if self.api_key and "sk-" in self.api_key:
              # Use OpenAI
-             self.client = AsyncOpenAI(api_key=self.api_key)
              self.model = "gpt-4-turbo-preview"
         else:
              # Fallback to Ollama (Local LLM)
-             print(f"INFO: OpenAI key topilmadi. Ollama ({ollama_host}) ishlatilmoqda.")
+             print(f"INFO: OpenAI key topilmadi. Ollama ({self.ollama_host}) ishlatilmoqda.")
              self.use_local = True
-             self.client = AsyncOpenAI(
-                 base_url=f"{ollama_host}/v1",
-                 api_key="ollama" # required but ignored
-             )
              self.model = ollama_model
+
+        # openai SDK importi ~1s oladi - client birinchi so'rovda (yoki warm-up'da) yaratiladi.
+        # httpx ulanishlari event loop'ga bog'langan: har bir loop (API, ingestion worker) o'z client'iga ega
+        self._client = None
+        self._loop_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self):
+        """AsyncOpenAI client (lazy, joriy event loop uchun bitta)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None  # warm-up thread'i
+
+        client = self._loop_clients.get(loop) if loop is not None else self._client
+        if client is None:
+            client = self._create_client()
+            if loop is not None:
+                self._loop_clients[loop] = client
+            else:
+                self._client = client
+        return client
+
+    def _create_client(self):
+        from openai import AsyncOpenAI
+
+        if self.use_local:
+            return AsyncOpenAI(
+                base_url=f"{self.ollama_host}/v1",
+                api_key="ollama" # required but ignored
+            )
+        return AsyncOpenAI(api_key=self.api_key)
     
     async def generate(
         self,
@@ -66,11 +107,56 @@ class OpenAIClient:
             print(f"OpenAI xatosi: {str(e)}")
             return ""
     
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 500
+    ) -> AsyncIterator[str]:
+        """
+        GPT javobini bo'laklab (token kelishi bilan) qaytarish.
+        Xatoda generate kabi: xato chop etiladi va stream shu joyda tugaydi.
+        """
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        
+        messages.append({"role": "user", "content": prompt})
+        
+        stream = None
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                # Oxirgi (usage) chunk'larda choices bo'sh bo'lishi mumkin
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            print(f"OpenAI xatosi: {str(e)}")
+        finally:
+            # Mijoz uzilganda (stream bekor qilinganda) HTTP ulanishini darhol yopish
+            if stream is not None:
+                await stream.close()
+    
     async def parse_text_to_transactions(self, text: str, business_type: Optional[str] = None) -> list[Dict[str, Any]]:
         """
         Oddiy matnni tranzaksiyalarga aylantirish (GPT orqali).
         business_type: 'savdo', 'oquv_markazi', 'ishlab_chiqarish'
+        Natijalar llm_response_cache'da saqlanadi - bir xil chunk qayta yuborilmaydi.
         """
+        cache_key = None
+        if settings.llm_cache_enabled:
+            cache_key = self._parsing_cache_key(text, business_type)
+            cached = llm_response_cache.get(cache_key)
+            # Bo'sh natija (eski keshdagi "tranzaksiya yo'q") ishonchli emas - LLM qayta so'raladi
+            if cached:
+                return cached
         
         # Biznes turiga qarab maxsus prompt va mantiqiy zanjir (CoT)
         biz_context = "Umumiy moliya"
@@ -188,7 +274,7 @@ Faqat JSON qaytar.
                  raise ValueError("LLM javobi kutilgan formatda emas (list).")
                  
             if not transactions:
-                 raise ValueError("Matnda moliyaviy tranzaksiyalar topilmadi.")
+                 raise NoTransactionsFound("Matnda moliyaviy tranzaksiyalar topilmadi.")
 
             # --- Post-Processing & Validation (STRICT OVERRIDE) ---
             for t in transactions:
@@ -221,7 +307,12 @@ Faqat JSON qaytar.
                 if "xarajat" in cat_lower or "chiqim" in cat_lower:
                     t['is_expense'] = True
             
+            if cache_key:
+                llm_response_cache.set(cache_key, transactions)
             return transactions
+        except NoTransactionsFound:
+            # Salbiy natija keshlanmaydi: LLM javobi deterministik emas, chunk keyingi yuklashda qayta tahlil qilinadi
+            raise
         except json.JSONDecodeError as je:
              print(f"JSON Decode Error: {je}")
              print(f"Bad JSON: {cleaned}")
@@ -229,6 +320,21 @@ Faqat JSON qaytar.
         except Exception as e:
             raise ValueError(f"Ma'lumotlarni tahlil qilib bo'lmadi: {str(e)}")
     
+    def _parsing_cache_key(self, text: str, business_type: Optional[str]) -> str:
+        """
+        Parsing keshi kaliti: model, prompt versiyasi, business_type va chunk matni.
+        Sanasiz qatorlar prompt'dagi "bugungi sana"ga bog'liq, shuning uchun
+        bunday chunklar kalitiga bugungi sana ham qo'shiladi.
+        """
+        date_dependent = any(
+            any(ch.isdigit() for ch in line) and not _EXPLICIT_DATE_RE.search(line)
+            for line in text.splitlines()
+        )
+        today_str = datetime.now().strftime('%Y-%m-%d') if date_dependent else ""
+        return llm_response_cache.make_key(
+            self.model, TRANSACTION_PROMPT_VERSION, business_type, today_str, text
+        )
+    
     async def generate_recommendation(
         self,
         forecast_data: Dict[str, Any],
@@ -293,6 +399,23 @@ SHOSHILINCH TAVSIYA BER:
         Foydalanuvchi bilan interaktiv muloqot.
         Context data ichida: forecast, risk, anomalies, liquidity_check bo'lishi mumkin.
         """
+        prompt, system_prompt = self._advisor_prompt(user_message, context_data)
+        return await self.generate(prompt, system_prompt=system_prompt, temperature=0.7)
+    
+    async def chat_with_advisor_stream(
+        self,
+        user_message: str,
+        context_data: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """
+        chat_with_advisor'ning stream varianti - javob tokenlari kelishi bilan qaytariladi.
+        """
+        prompt, system_prompt = self._advisor_prompt(user_message, context_data)
+        async for token in self.generate_stream(prompt, system_prompt=system_prompt, temperature=0.7):
+            yield token
+    
+    def _advisor_prompt(self, user_message: str, context_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Maslahatchi chat'i uchun (prompt, system_prompt)."""
         system_prompt = """Sen LQX AI - biznes egalari uchun professional moliyaviy maslahatchisan.
 Sening yagona vazifang - biznes egasiga moliya, hisobotlar va biznes rivoji bo'yicha yordam berish.
 
@@ -350,7 +473,7 @@ Foydalanuvchi savoli: {user_message}
 
 Javob:
 """
-        return await self.generate(prompt, system_prompt=system_prompt, temperature=0.7)
+        return prompt, system_prompt
 
 
 # Global instance - nomini 'llm_client' deb qoldiramiz, shunda boshqa fayllarni o'zgartirish shart emas
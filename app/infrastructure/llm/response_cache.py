@@ -0,0 +1,124 @@
+"""
+Infrastructure Layer - LLM Response Cache
+
+Tranzaksiya parsing natijalarining diskdagi (SQLite) keshi.
+Kalit - (model, prompt versiyasi, business_type, chunk matni) hash'i, shuning uchun
+bir xil yoki qisman takrorlangan fayllar qayta yuklanganda LLM chaqirilmaydi.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.infrastructure.db.database import settings
+
+
+class LLMResponseCache:
+    """
+    Hajmi cheklangan (LRU) persistent kesh.
+
+    SQLite fayl bir nechta uvicorn worker'lari o'rtasida umumiy bo'ladi;
+    hit/miss hisoblagichlari esa har bir jarayon uchun alohida.
+    """
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, *parts: Optional[str]) -> str:
+        """Kalit qismlaridan sha256 hash."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_used ON llm_responses (last_used_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Keshdagi natija (topilmasa None)."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT value FROM llm_responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+                self.hits += 1
+            return json.loads(row[0])
+        except Exception as e:
+            # Kesh ishlamasa ham parsing to'xtamasligi kerak
+            print(f"LLM kesh o'qish xatosi: {e}")
+            return None
+
+    def set(self, key: str, value: List[Dict[str, Any]]) -> None:
+        """Natijani saqlash va limitdan oshgan eng eski yozuvlarni o'chirish."""
+        try:
+            now = time.time()
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, value, created_at, last_used_at) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now),
+                )
+                count = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM llm_responses WHERE key IN ("
+                        " SELECT key FROM llm_responses ORDER BY last_used_at LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+                conn.commit()
+        except Exception as e:
+            print(f"LLM kesh yozish xatosi: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Kesh statistikasi."""
+        with self._lock:
+            total = self.hits + self.misses
+            entries = None
+            try:
+                entries = self._connect().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            except Exception:
+                pass
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+# Global instance
+llm_response_cache = LLMResponseCache(
+    path=settings.llm_cache_path,
+    max_entries=settings.llm_cache_max_entries,
+)
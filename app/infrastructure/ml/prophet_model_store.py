@@ -0,0 +1,165 @@
+"""
+Infrastructure Layer - Prophet Model Store
+
+Har bir foydalanuvchi uchun fit qilingan Prophet modellarini saqlash.
+Kunlik balans seriyasi o'zgarmagan bo'lsa model qayta ishlatiladi,
+o'zgargan bo'lsa oldingi parametrlardan warm-start qilinadi.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from app.infrastructure.db.database import settings
+
+
+class ProphetModelStore:
+    """
+    Diskdagi (JSON) va xotiradagi (LRU) Prophet modellari ombori.
+
+    Disk qatlami jarayonlar (uvicorn worker'lari, forecast process pool) o'rtasida
+    umumiy, xotira qatlami esa model_from_json deserializatsiyasini tejaydi.
+    """
+
+    def __init__(self, directory: str, memory_entries: int = 32):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        # model_key -> (series_hash, model)
+        self._memory: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"cached": 0, "warm": 0, "cold": 0}
+
+    def series_hash(self, prophet_df: pd.DataFrame, config_version: str) -> str:
+        """Kunlik balans seriyasi (ds, y) va model konfiguratsiyasi hash'i."""
+        digest = hashlib.sha256(config_version.encode("utf-8"))
+        digest.update(prophet_df["ds"].to_numpy(dtype="datetime64[ns]").astype("int64").tobytes())
+        digest.update(prophet_df["y"].to_numpy(dtype="float64").tobytes())
+        return digest.hexdigest()
+
+    def get_or_fit(
+        self,
+        model_key: str,
+        prophet_df: pd.DataFrame,
+        build_model: Callable[[], Any],
+        config_version: str,
+    ) -> Tuple[Any, str]:
+        """
+        Modelni ombordan olish yoki fit qilish.
+
+        Args:
+            model_key: Foydalanuvchi kaliti (odatda user_id)
+            prophet_df: 'ds', 'y' ustunli DataFrame
+            build_model: Yangi (fit qilinmagan) Prophet modelini yaratuvchi funksiya
+            config_version: Model sozlamalari versiyasi (o'zgarsa eski modellar ishlatilmaydi)
+
+        Returns:
+            (fit qilingan model, rejim: 'cached' | 'warm' | 'cold')
+        """
+        series_hash = self.series_hash(prophet_df, config_version)
+        previous = self._load(model_key, config_version)
+
+        if previous is not None and previous[0] == series_hash:
+            self._count("cached")
+            return previous[1], "cached"
+
+        model = None
+        mode = "cold"
+        if previous is not None:
+            # Yangi kunlar qo'shilgan (yoki ma'lumot tahrirlangan) - oldingi parametrlardan boshlaymiz
+            try:
+                model = build_model()
+                model.fit(prophet_df, init=self._stan_init(previous[1]))
+                mode = "warm"
+            except Exception as e:
+                print(f"Prophet warm-start xatosi, cold fit qilinadi: {e}")
+                model = None
+
+        if model is None:
+            model = build_model()
+            model.fit(prophet_df)
+
+        self._save(model_key, series_hash, config_version, model)
+        self._count(mode)
+        return model, mode
+
+    def _stan_init(self, model: Any) -> Dict[str, Any]:
+        """Fit qilingan modeldan Stan boshlang'ich qiymatlari (Prophet warm-start retsepti)."""
+        init = {}
+        for name in ["k", "m", "sigma_obs"]:
+            init[name] = model.params[name][0][0]
+        for name in ["delta", "beta"]:
+            init[name] = model.params[name][0]
+        return init
+
+    def _path(self, model_key: str) -> str:
+        safe_key = hashlib.sha1(model_key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{safe_key}.json")
+
+    def _load(self, model_key: str, config_version: str) -> Optional[Tuple[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(model_key)
+            if entry is not None:
+                self._memory.move_to_end(model_key)
+                return entry
+
+        path = self._path(model_key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            from prophet.serialize import model_from_json
+
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("config_version") != config_version:
+                return None
+            entry = (payload["series_hash"], model_from_json(payload["model"]))
+        except Exception as e:
+            print(f"Prophet modelini o'qishda xato ({path}): {e}")
+            return None
+
+        self._remember(model_key, entry)
+        return entry
+
+    def _save(self, model_key: str, series_hash: str, config_version: str, model: Any) -> None:
+        self._remember(model_key, (series_hash, model))
+
+        try:
+            from prophet.serialize import model_to_json
+
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(model_key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "series_hash": series_hash,
+                    "config_version": config_version,
+                    "model": model_to_json(model),
+                }, f)
+            # Atomik almashtirish - boshqa jarayonlar yarim yozilgan faylni ko'rmaydi
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Prophet modelini saqlashda xato: {e}")
+
+    def _remember(self, model_key: str, entry: Tuple[str, Any]) -> None:
+        with self._lock:
+            self._memory[model_key] = entry
+            self._memory.move_to_end(model_key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, mode: str) -> None:
+        with self._lock:
+            self.stats[mode] += 1
+
+
+# Global instance
+prophet_model_store = ProphetModelStore(
+    directory=settings.prophet_model_dir,
+    memory_entries=settings.prophet_model_memory_entries,
+)
@@ -1,36 +1,447 @@
-
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import os
+import socket
+import threading
+import time
 import uuid
 
+from app.infrastructure.db.database import settings
+
+
+# Shu jarayonning lease egasi sifatidagi nomi
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Bajarilayotgan va yakunlangan holatlar (yakunlangan tasklar qayta bajarilmaydi va TTL bo'yicha o'chiriladi)
+ACTIVE_STATUSES = ("pending", "processing")
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Worker qulagan yoki qayta ishga tushgan: spool fayl o'sha hostda qolgan, task davom ettirilmaydi
+ABANDONED_ERROR = "Server qayta ishga tushirildi, faylni qayta yuklang."
+
+
+def _new_task_state() -> Dict[str, Any]:
+    return {
+        "status": "pending",
+        "progress": 0,
+        "message": "Jarayon boshlanmoqda...",
+        "result": None,
+        "error": None
+    }
+
+
+def _apply_update(task: Dict[str, Any], status: str = None, progress: int = None, message: str = None, result: Any = None, error: str = None):
+    if status: task["status"] = status
+    if progress is not None: task["progress"] = progress
+    if message: task["message"] = message
+    if result: task["result"] = result
+    if error:
+        task["error"] = error
+        task["status"] = "failed"
+
+
+class MemoryTaskBackend:
+    """
+    Jarayon ichidagi (in-memory) backend - bitta worker va testlar uchun.
+    Bir nechta uvicorn worker'ida task boshqa jarayonda ko'rinmaydi.
+    """
+
+    def __init__(self, ttl_seconds: int, lease_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        # task_id -> holat; task_id -> updated_at / lease ma'lumotlari
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._meta: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, task_id: str, state: Dict[str, Any], owner: str) -> None:
+        with self._lock:
+            self._tasks[task_id] = state
+            now = time.time()
+            self._meta[task_id] = {"updated_at": now, "lease_owner": owner, "lease_expires_at": now + self.lease_seconds}
+
+    def update(self, task_id: str, **changes) -> None:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            _apply_update(task, **changes)
+            meta = self._meta[task_id]
+            meta["updated_at"] = time.time()
+            if meta["lease_owner"] == WORKER_ID:
+                meta["lease_expires_at"] = time.time() + self.lease_seconds
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return None
+            if self._is_abandoned(task_id, time.time()):
+                self._fail_abandoned(task_id)
+            return dict(task)
+
+    def fail_abandoned(self) -> int:
+        now = time.time()
+        with self._lock:
+            abandoned = [task_id for task_id in self._tasks if self._is_abandoned(task_id, now)]
+            for task_id in abandoned:
+                self._fail_abandoned(task_id)
+        return len(abandoned)
+
+    def _is_abandoned(self, task_id: str, now: float) -> bool:
+        # Lease olingan bo'lsa - uning muddati, aks holda (navbatda) oxirgi o'zgarishdan beri lease_seconds
+        meta = self._meta[task_id]
+        if self._tasks[task_id]["status"] not in ACTIVE_STATUSES:
+            return False
+        if meta["lease_owner"] is not None:
+            return meta["lease_expires_at"] < now
+        return meta["updated_at"] < now - self.lease_seconds
+
+    def _fail_abandoned(self, task_id: str) -> None:
+        _apply_update(self._tasks[task_id], error=ABANDONED_ERROR)
+        self._meta[task_id].update(updated_at=time.time(), lease_owner=None, lease_expires_at=0.0)
+
+    def acquire_lease(self, task_id: str, owner: str) -> bool:
+        with self._lock:
+            meta = self._meta.get(task_id)
+            if meta is None or self._tasks[task_id]["status"] not in ACTIVE_STATUSES:
+                return False
+            if meta["lease_owner"] not in (None, owner) and meta["lease_expires_at"] > time.time():
+                return False
+            meta["lease_owner"] = owner
+            meta["lease_expires_at"] = time.time() + self.lease_seconds
+            return True
+
+    def renew_leases(self, owner: str) -> int:
+        with self._lock:
+            renewed = [
+                meta for task_id, meta in self._meta.items()
+                if meta["lease_owner"] == owner and self._tasks[task_id]["status"] in ACTIVE_STATUSES
+            ]
+            for meta in renewed:
+                meta["lease_expires_at"] = time.time() + self.lease_seconds
+        return len(renewed)
+
+    def release_lease(self, task_id: str, owner: str) -> None:
+        with self._lock:
+            meta = self._meta.get(task_id)
+            if meta is not None and meta["lease_owner"] == owner:
+                meta["lease_owner"] = None
+                meta["lease_expires_at"] = 0.0
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [
+                task_id for task_id, meta in self._meta.items()
+                if self._tasks[task_id]["status"] in TERMINAL_STATUSES and meta["updated_at"] < cutoff
+            ]
+            for task_id in expired:
+                self._tasks.pop(task_id, None)
+                self._meta.pop(task_id, None)
+        return len(expired)
+
+
+class SqlTaskBackend:
+    """
+    Ma'lumotlar bazasidagi upload_tasks jadvali - barcha worker'lar va restart'lar uchun umumiy.
+    Har bir amal o'zining qisqa sessiyasida bajariladi.
+    """
+
+    def __init__(self, ttl_seconds: int, lease_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+
+    def _session(self):
+        from app.infrastructure.db.database import SessionLocal
+        return SessionLocal()
+
+    def create(self, task_id: str, state: Dict[str, Any], owner: str) -> None:
+        from app.infrastructure.db.models import UploadTaskModel
+
+        db = self._session()
+        try:
+            expires_at = datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+            db.add(UploadTaskModel(id=task_id, lease_owner=owner, lease_expires_at=expires_at, **state))
+            db.commit()
+        finally:
+            db.close()
+
+    def update(self, task_id: str, **changes) -> None:
+        from app.infrastructure.db.models import UploadTaskModel
+
+        db = self._session()
+        try:
+            row = db.get(UploadTaskModel, task_id)
+            if row is None:
+                return
+            task = self._to_dict(row)
+            _apply_update(task, **changes)
+            for key, value in task.items():
+                setattr(row, key, value)
+            now = datetime.utcnow()
+            row.updated_at = now
+            if row.lease_owner == WORKER_ID:
+                # Progress yozish lease'ni ham uzaytiradi (heartbeat)
+                row.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+            db.commit()
+        except Exception as e:
+            # Progress yozilmasa ham upload to'xtamasligi kerak
+            db.rollback()
+            print(f"Task holatini yozishda xato ({task_id}): {e}")
+        finally:
+            db.close()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        from app.infrastructure.db.models import UploadTaskModel
+
+        db = self._session()
+        try:
+            row = db.get(UploadTaskModel, task_id)
+            if row is None:
+                return None
+            if row.status in ACTIVE_STATUSES and self._is_abandoned(row.lease_expires_at, row.updated_at, datetime.utcnow()):
+                task = self._to_dict(row)
+                _apply_update(task, error=ABANDONED_ERROR)
+                for key, value in task.items():
+                    setattr(row, key, value)
+                row.updated_at = datetime.utcnow()
+                row.lease_owner = None
+                row.lease_expires_at = None
+                db.commit()
+            return self._to_dict(row)
+        finally:
+            db.close()
+
+    def fail_abandoned(self) -> int:
+        from sqlalchemy import and_, or_, update
+        from app.infrastructure.db.models import UploadTaskModel
+
+        now = datetime.utcnow()
+        db = self._session()
+        try:
+            result = db.execute(
+                update(UploadTaskModel)
+                .where(UploadTaskModel.status.in_(ACTIVE_STATUSES))
+                .where(or_(
+                    UploadTaskModel.lease_expires_at < now,
+                    and_(
+                        UploadTaskModel.lease_expires_at.is_(None),
+                        UploadTaskModel.updated_at < now - timedelta(seconds=self.lease_seconds),
+                    ),
+                ))
+                .values(status="failed", error=ABANDONED_ERROR, lease_owner=None, lease_expires_at=None, updated_at=now)
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def _is_abandoned(self, lease_expires_at: Optional[datetime], updated_at: datetime, now: datetime) -> bool:
+        # Lease olingan bo'lsa - uning muddati, aks holda (navbatda) oxirgi o'zgarishdan beri lease_seconds
+        if lease_expires_at is not None:
+            return lease_expires_at < now
+        return updated_at < now - timedelta(seconds=self.lease_seconds)
+
+    def acquire_lease(self, task_id: str, owner: str) -> bool:
+        from sqlalchemy import or_, update
+        from app.infrastructure.db.models import UploadTaskModel
+
+        now = datetime.utcnow()
+        db = self._session()
+        try:
+            # Atomik: faqat task yakunlanmagan va lease bo'sh, muddati o'tgan yoki o'zimizniki bo'lsa egallaymiz
+            result = db.execute(
+                update(UploadTaskModel)
+                .where(UploadTaskModel.id == task_id)
+                .where(UploadTaskModel.status.in_(ACTIVE_STATUSES))
+                .where(or_(
+                    UploadTaskModel.lease_owner.is_(None),
+                    UploadTaskModel.lease_owner == owner,
+                    UploadTaskModel.lease_expires_at < now,
+                ))
+                .values(lease_owner=owner, lease_expires_at=now + timedelta(seconds=self.lease_seconds))
+            )
+            db.commit()
+            return result.rowcount == 1
+        finally:
+            db.close()
+
+    def renew_leases(self, owner: str) -> int:
+        from sqlalchemy import update
+        from app.infrastructure.db.models import UploadTaskModel
+
+        db = self._session()
+        try:
+            result = db.execute(
+                update(UploadTaskModel)
+                .where(UploadTaskModel.lease_owner == owner, UploadTaskModel.status.in_(ACTIVE_STATUSES))
+                .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def release_lease(self, task_id: str, owner: str) -> None:
+        from sqlalchemy import update
+        from app.infrastructure.db.models import UploadTaskModel
+
+        db = self._session()
+        try:
+            db.execute(
+                update(UploadTaskModel)
+                .where(UploadTaskModel.id == task_id, UploadTaskModel.lease_owner == owner)
+                .values(lease_owner=None, lease_expires_at=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def evict_expired(self) -> int:
+        from sqlalchemy import delete
+        from app.infrastructure.db.models import UploadTaskModel
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        db = self._session()
+        try:
+            result = db.execute(
+                delete(UploadTaskModel)
+                .where(UploadTaskModel.status.in_(TERMINAL_STATUSES))
+                .where(UploadTaskModel.updated_at < cutoff)
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    def _to_dict(self, row) -> Dict[str, Any]:
+        return {
+            "status": row.status,
+            "progress": row.progress,
+            "message": row.message,
+            "result": row.result,
+            "error": row.error
+        }
+
+
 class TaskManager:
     """
-    Background tasklarning statusini kuzatish uchun oddiy in-memory menejer.
-    Production uchun Redis/Celery ishlatish kerak, lekin MVP uchun shu yetadi.
+    Background tasklarning statusini kuzatish uchun menejer.
+    Holat settings.task_backend ('sql' yoki 'memory') da saqlanadi.
+    Lease'i tugagan (worker qulagan/qayta ishga tushgan) pending/processing tasklar
+    'failed' deb belgilanadi - startup'da, get_task'da va tozalash paytida;
+    yakunlangan yozuvlar settings.task_ttl_seconds dan keyin o'chiriladi.
     """
-    _tasks: Dict[str, Dict[str, Any]] = {}
 
-    def create_task(self) -> str:
+    # TTL tozalash ko'pi bilan shu oraliqda bir marta ishlaydi
+    EVICTION_INTERVAL_SECONDS = 60
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._last_eviction = 0.0
+        # task_id -> [(loop, asyncio.Event)] - shu jarayondagi stream obunachilari
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._subscribers_lock = threading.Lock()
+
+    def create_task(self, owner: str = WORKER_ID) -> str:
+        """
+        Yangi task. Lease darhol shu jarayonga beriladi (task shu jarayonning ingestion
+        navbatiga qo'yiladi) - navbatda kutish paytida ham renew_leases bilan uzaytiriladi.
+        """
+        self._maybe_evict()
         task_id = str(uuid.uuid4())
-        self._tasks[task_id] = {
-            "status": "pending",
-            "progress": 0,
-            "message": "Jarayon boshlanmoqda...",
-            "result": None,
-            "error": None
-        }
+        self.backend.create(task_id, _new_task_state(), owner)
         return task_id
 
     def update_task(self, task_id: str, status: str = None, progress: int = None, message: str = None, result: Any = None, error: str = None):
-        if task_id in self._tasks:
-            if status: self._tasks[task_id]["status"] = status
-            if progress is not None: self._tasks[task_id]["progress"] = progress
-            if message: self._tasks[task_id]["message"] = message
-            if result: self._tasks[task_id]["result"] = result
-            if error: 
-                self._tasks[task_id]["error"] = error
-                self._tasks[task_id]["status"] = "failed"
+        self.backend.update(task_id, status=status, progress=progress, message=message, result=result, error=error)
+        self._notify(task_id)
 
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
-        return self._tasks.get(task_id)
+        return self.backend.get(task_id)
+
+    def recover_abandoned(self) -> None:
+        """Bajarilmay qolgan tasklarni 'failed' deb belgilash (startup'da chaqiriladi)."""
+        try:
+            failed = self.backend.fail_abandoned()
+            if failed:
+                print(f"TaskManager: {failed} ta tugallanmagan task 'failed' deb belgilandi")
+        except Exception as e:
+            print(f"TaskManager recovery xatosi: {e}")
+
+    def acquire_lease(self, task_id: str, owner: str = WORKER_ID) -> bool:
+        """
+        Taskni bajarish huquqini olish. Boshqa worker lease'i hali amalda bo'lsa False.
+        Lease update_task chaqiruvlari bilan uzaytiriladi (heartbeat).
+        """
+        return self.backend.acquire_lease(task_id, owner)
+
+    def release_lease(self, task_id: str, owner: str = WORKER_ID) -> None:
+        self.backend.release_lease(task_id, owner)
+
+    def renew_leases(self, owner: str = WORKER_ID) -> None:
+        """
+        Shu jarayonga tegishli barcha yakunlanmagan tasklar lease'ini uzaytirish (heartbeat).
+        Jarayon qulasa, uzaytirish to'xtaydi va tasklar lease muddatidan keyin 'failed' bo'ladi.
+        """
+        try:
+            self.backend.renew_leases(owner)
+        except Exception as e:
+            print(f"TaskManager lease heartbeat xatosi: {e}")
+
+    def subscribe(self, task_id: str) -> asyncio.Event:
+        """
+        Task o'zgarishlari uchun event (joriy event loop'da). Shu jarayondagi update_task
+        chaqiruvlari uni darhol o'rnatadi; boshqa worker'lardagi o'zgarishlarni
+        obunachi get_task orqali davriy tekshirishi kerak.
+        """
+        event = asyncio.Event()
+        with self._subscribers_lock:
+            self._subscribers.setdefault(task_id, []).append((asyncio.get_running_loop(), event))
+        return event
+
+    def unsubscribe(self, task_id: str, event: asyncio.Event) -> None:
+        with self._subscribers_lock:
+            subscribers = [item for item in self._subscribers.get(task_id, []) if item[1] is not event]
+            if subscribers:
+                self._subscribers[task_id] = subscribers
+            else:
+                self._subscribers.pop(task_id, None)
+
+    def _notify(self, task_id: str) -> None:
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers.get(task_id, []))
+        for loop, event in subscribers:
+            try:
+                # update_task ingestion worker thread'idan chaqiriladi
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # loop yopilgan
+
+    def _maybe_evict(self) -> None:
+        now = time.monotonic()
+        if now - self._last_eviction < self.EVICTION_INTERVAL_SECONDS:
+            return
+        self._last_eviction = now
+        self.recover_abandoned()
+        try:
+            evicted = self.backend.evict_expired()
+            if evicted:
+                print(f"TaskManager: {evicted} ta eskirgan task o'chirildi")
+        except Exception as e:
+            print(f"TaskManager eviction xatosi: {e}")
+
+
+def _create_backend():
+    backend = settings.task_backend
+    if backend == "auto":
+        # SQLite'da bitta yozuvchi bor: upload tranzaksiyasi davomida task jadvaliga yozib bo'lmaydi
+        backend = "memory" if settings.database_url.startswith("sqlite") else "sql"
+    if backend == "memory":
+        return MemoryTaskBackend(settings.task_ttl_seconds, settings.task_lease_seconds)
+    return SqlTaskBackend(settings.task_ttl_seconds, settings.task_lease_seconds)
+
 
-task_manager = TaskManager()
+task_manager = TaskManager(_create_backend())
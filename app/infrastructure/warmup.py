@@ -0,0 +1,82 @@
+"""
+Infrastructure Layer - Startup Warm-up
+
+Og'ir kutubxonalar (openai, prophet, pypdf, docx) modul import vaqtida
+yuklanmaydi - birinchi ishlatilganda yoki startup'dan keyin fonda
+oldindan yuklanadi. Har bir qadam vaqti /metrics orqali ko'rinadi.
+"""
+
+import importlib
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+# Fonda oldindan yuklanadigan modullar (yuklash tartibida)
+WARMUP_MODULES = ["openai", "prophet", "pypdf", "docx"]
+
+# Forecast process pool worker'larida import qilinadigan modullar
+FORECAST_WORKER_MODULES = ["app.domain.services.forecasting_service", "prophet"]
+
+
+class StartupWarmup:
+    """Startup hisobotini yuritish va fon warm-up'ni boshqarish."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.status = "pending"
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, name: str, started_at: float) -> None:
+        """Startup qadami vaqtini (soniyada) yozib qo'yish."""
+        self.timings[name] = round(time.perf_counter() - started_at, 3)
+
+    def start(self) -> None:
+        """Warm-up'ni fon thread'ida boshlash (so'rovlarni bloklamaydi)."""
+        if self._thread is not None:
+            return
+        self.status = "running"
+        self._thread = threading.Thread(target=self._run, name="startup-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        from app.infrastructure.forecast_executor import forecast_executor
+        from app.infrastructure.llm.local_llm_client import llm_client
+
+        for name in WARMUP_MODULES:
+            started_at = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                self.record(f"import:{name}", started_at)
+            except Exception as e:
+                self.errors[name] = str(e)
+
+        started_at = time.perf_counter()
+        try:
+            llm_client.client
+            self.record("llm_client", started_at)
+        except Exception as e:
+            self.errors["llm_client"] = str(e)
+
+        started_at = time.perf_counter()
+        try:
+            forecast_executor.warm_up(FORECAST_WORKER_MODULES)
+            self.record("forecast_pool", started_at)
+        except Exception as e:
+            self.errors["forecast_pool"] = str(e)
+
+        self.status = "done"
+        print(f"Startup warm-up tugadi: {self.timings}")
+
+    def report(self) -> Dict[str, Any]:
+        """Startup hisoboti."""
+        return {
+            "status": self.status,
+            "timings": dict(self.timings),
+            "errors": dict(self.errors),
+        }
+
+
+# Global instance
+startup_warmup = StartupWarmup()
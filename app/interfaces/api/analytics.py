@@ -1,16 +1,37 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.infrastructure.db.database import get_db
-from app.infrastructure.db.models import UserModel, TransactionModel
+from app.infrastructure.db.database import get_async_db, release_connection
+from app.infrastructure.auth.user_cache import UserSnapshot
+from app.infrastructure.db.transaction_cache import transaction_cache
+from app.infrastructure.db.transaction_loader import transaction_loader
 from app.infrastructure.auth.security import get_current_user
-from app.interfaces.schemas.schemas import LiquidityAnalysisRequest, LiquidityAnalysisResponse, DashboardResponse, FilterOptionsResponse
+from app.interfaces.schemas.schemas import LiquidityAnalysisRequest, LiquidityAnalysisResponse, DashboardResponse, FilterOptionsResponse, DashboardBatchRequest, DashboardBatchResponse
 from app.use_cases.liquidity_analysis import liquidity_analysis_use_case
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+async def _load_amount_filtered_rows(db: AsyncSession, user_id, spec: dict):
+    """
+    Summa filtri bor dashboard uchun xom qatorlar: davr, kategoriya va summa filtrlari
+    bazada (WHERE, indekslar orqali) qo'llanadi - butun tarix yuklanmaydi.
+    """
+    from app.domain.services.analytics_service import analytics_service
+    
+    start, end = analytics_service.resolve_period(spec['filter_type'], spec.get('start_date'), spec.get('end_date'))
+    return await db.run_sync(
+        transaction_loader.load_frame,
+        user_id,
+        start=start,
+        end=end,
+        category=spec.get('category'),
+        min_amount=spec.get('min_amount'),
+        max_amount=spec.get('max_amount'),
+    )
+
+
 @router.post(
     "/liquidity", 
     response_model=LiquidityAnalysisResponse,
@@ -24,33 +45,23 @@ router = APIRouter(prefix="/analytics", tags=["Analytics"])
 )
 async def analyze_liquidity(
     request: LiquidityAnalysisRequest,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Likvidlikni chuqur tahlil qilish endpointi.
     """
     
-    # Userning tranzaksiyalarini olish
-    transactions_orm = db.query(TransactionModel).filter(TransactionModel.user_id == current_user.id).all()
+    # Userning tranzaksiyalarini olish (columnar DataFrame, per-user kesh orqali)
+    transactions = await transaction_cache.get_frame_async(db, current_user.id)
+    # Prognoz davomida ulanish pool'da bo'sh turadi
+    await release_connection(db)
     
-    if not transactions_orm:
+    if transactions.empty:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Analiz uchun tranzaksiyalar mavjud emas"
         )
-    
-    # ORM -> Dict conversion
-    transactions = []
-    for t in transactions_orm:
-        transactions.append({
-            "date": t.date.strftime('%Y-%m-%d'),
-            "amount": float(t.amount),
-            "description": t.description,
-            "category": t.category,
-            "is_expense": t.is_expense,
-            "is_fixed": t.is_fixed
-        })
         
     result = await liquidity_analysis_use_case.run(
         user_id=current_user.id,
@@ -77,30 +88,18 @@ async def analyze_liquidity(
     description="Frontenddagi filterlar (category dropdown, date range, amount range) uchun mavjud qiymatlarni qaytaradi."
 )
 async def get_filter_options(
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Filtrlash uchun mavjud opsiyalar endpointi.
     """
     from app.domain.services.analytics_service import analytics_service
     
-    # Userning tranzaksiyalarini olish (optimallashtirish mumkin, lekin hozircha shu yetarli)
-    transactions_orm = db.query(TransactionModel).filter(TransactionModel.user_id == current_user.id).all()
-    
-    # ORM -> Dict conversion
-    transactions = []
-    for t in transactions_orm:
-        transactions.append({
-            "date": t.date.strftime('%Y-%m-%d'),
-            "amount": float(t.amount),
-            "description": t.description,
-            "category": t.category,
-            "is_expense": t.is_expense,
-            "is_fixed": t.is_fixed
-        })
+    # Kunlik agregatlar yetarli (kategoriyalar, sana va summa oralig'i)
+    daily = await transaction_cache.get_daily_frame_async(db, current_user.id)
         
-    options = analytics_service.get_filter_options(transactions)
+    options = analytics_service.get_filter_options(daily)
     
     return FilterOptionsResponse(**options)
 
@@ -122,27 +121,22 @@ async def get_dashboard(
     category: Optional[str] = Query(None, description="Kategoriya bo'yicha filtrlash"),
     min_amount: Optional[float] = Query(None, description="Minimal summa"),
     max_amount: Optional[float] = Query(None, description="Maksimal summa"),
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Dashboard analitikasi.
     """
     from app.domain.services.analytics_service import analytics_service
     
-    # Userning tranzaksiyalarini olish
-    transactions_orm = db.query(TransactionModel).filter(TransactionModel.user_id == current_user.id).all()
-    
-    # ORM -> Dict conversion
-    transactions = []
-    for t in transactions_orm:
-        transactions.append({
-            "date": t.date.strftime('%Y-%m-%d'),
-            "amount": float(t.amount),
-            "description": t.description,
-            "category": t.category,
-            "is_expense": t.is_expense,
-            "is_fixed": t.is_fixed
+    # Dashboard kunlik agregatlardan hisoblanadi (hajm kunlar soniga bog'liq).
+    # Summa filtrlari alohida tranzaksiyalarga tegishli - ular uchun faqat kerakli xom qatorlar o'qiladi.
+    transactions = await transaction_cache.get_daily_frame_async(db, current_user.id)
+    rows = None
+    if min_amount is not None or max_amount is not None:
+        rows = await _load_amount_filtered_rows(db, current_user.id, {
+            'filter_type': filter_type, 'start_date': start_date, 'end_date': end_date,
+            'category': category, 'min_amount': min_amount, 'max_amount': max_amount
         })
         
     data = analytics_service.get_dashboard_data(
@@ -152,7 +146,8 @@ async def get_dashboard(
         end_date,
         category=category,
         min_amount=min_amount,
-        max_amount=max_amount
+        max_amount=max_amount,
+        rows=rows
     )
     
     return DashboardResponse(
@@ -160,3 +155,43 @@ async def get_dashboard(
         data=data
     )
 
+
+@router.post(
+    "/dashboard/batch",
+    response_model=DashboardBatchResponse,
+    summary="Bir nechta dashboardni bitta so'rovda olish",
+    description="Filtrlar ro'yxati (masalan, last_7_days, this_month, last_month, this_year) uchun dashboardlar va filtrlash opsiyalarini bitta yuklash va bitta agregatsiya bilan qaytaradi.",
+    responses={
+        200: {"description": "Dashboard ma'lumotlari muvaffaqiyatli olindi"},
+        422: {"description": "Noto'g'ri filtrlar ro'yxati"}
+    }
+)
+async def get_dashboard_batch(
+    request: DashboardBatchRequest,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Dashboard analitikasi (bir nechta filtr).
+    """
+    from app.domain.services.analytics_service import analytics_service
+    
+    filters = [spec.model_dump() for spec in request.filters]
+    
+    # Bitta kunlik agregat frame'i; summa filtri bor filtrlar uchun - faqat kerakli xom qatorlar
+    transactions = await transaction_cache.get_daily_frame_async(db, current_user.id)
+    for spec in filters:
+        if spec['min_amount'] is not None or spec['max_amount'] is not None:
+            spec['rows'] = await _load_amount_filtered_rows(db, current_user.id, spec)
+    
+    dashboards = analytics_service.get_dashboard_batch(transactions, filters)
+    filter_options = None
+    if request.include_filter_options:
+        filter_options = FilterOptionsResponse(**analytics_service.get_filter_options(transactions))
+    
+    return DashboardBatchResponse(
+        success=True,
+        data=dashboards,
+        filter_options=filter_options
+    )
+
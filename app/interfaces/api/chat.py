@@ -1,11 +1,15 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.infrastructure.db.database import get_db
+from app.infrastructure.db.database import get_async_db, release_connection
 from app.infrastructure.auth.security import get_current_user
-from app.infrastructure.db.models import UserModel, TransactionModel
+from app.infrastructure.auth.user_cache import UserSnapshot
+from app.infrastructure.db.transaction_cache import transaction_cache
+from app.interfaces.api.sse import SSE_HEADERS, sse_event
 from app.interfaces.schemas.schemas import ChatRequest, ChatResponse
 from app.use_cases.chat_advisor import chat_advisor_use_case
 
@@ -14,25 +18,16 @@ router = APIRouter()
 @router.post("/ask", response_model=ChatResponse)
 async def ask_advisor(
     request: ChatRequest,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Moliyaviy maslahatchi bilan suhbat.
     """
-    # Userning tranzaksiyalarini olish
-    transactions_orm = db.query(TransactionModel).filter(TransactionModel.user_id == current_user.id).all()
-    
-    # ORM -> Dict conversion
-    transactions = []
-    for t in transactions_orm:
-        transactions.append({
-            "date": t.date,
-            "amount": float(t.amount),
-            "description": t.description,
-            "category": t.category,
-            "is_expense": t.is_expense
-        })
+    # Userning tranzaksiyalarini olish (columnar DataFrame, per-user kesh orqali)
+    transactions = await transaction_cache.get_frame_async(db, current_user.id)
+    # LLM javobini kutish davomida ulanish pool'da bo'sh turadi
+    await release_connection(db)
         
     result = await chat_advisor_use_case.run(
         user_id=current_user.id,
@@ -45,3 +40,43 @@ async def ask_advisor(
         response=result['response'],
         context=result.get('context_used')
     )
+
+
+@router.post(
+    "/ask/stream",
+    summary="Moliyaviy maslahatchi (stream)",
+    description="Javob Server-Sent Events ko'rinishida keladi: avval `context` eventi (context_used), "
+                "so'ng har bir bo'lak uchun `token` eventi (`{\"text\": ...}`), oxirida `done` eventi (`{\"response\": to'liq javob}`)."
+)
+async def ask_advisor_stream(
+    request: ChatRequest,
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Moliyaviy maslahatchi bilan suhbat - tokenlar kelishi bilan uzatiladi.
+    """
+    transactions = await transaction_cache.get_frame_async(db, current_user.id)
+    # LLM javobini kutish davomida ulanish pool'da bo'sh turadi
+    await release_connection(db)
+    
+    context_data, tokens = await chat_advisor_use_case.run_stream(
+        user_id=current_user.id,
+        message=request.message,
+        transactions=transactions,
+        initial_balance=request.initial_balance
+    )
+    
+    async def events():
+        yield sse_event("context", jsonable_encoder(context_data or {}))
+        parts = []
+        async for token in tokens:
+            parts.append(token)
+            yield sse_event("token", {"text": token})
+        yield sse_event("done", {"response": "".join(parts)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
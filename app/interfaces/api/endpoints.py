@@ -4,17 +4,27 @@ API Endpoints - FastAPI routers
 Barcha API endpointlari.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, BackgroundTasks
-from fastapi.responses import RedirectResponse
+import asyncio
+import os
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi.responses import RedirectResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 from datetime import datetime
 
-from app.infrastructure.db.database import get_db, settings
+from app.infrastructure.db.database import get_async_db, get_db, release_connection, settings
 from app.infrastructure.db.models import UserModel, TransactionModel
-from app.infrastructure.auth.security import hash_password, verify_password, create_access_token, decode_access_token
+from app.infrastructure.db.daily_totals import daily_totals
+from app.infrastructure.db.transaction_cache import transaction_cache
+from app.infrastructure.db.transaction_writer import transaction_writer
+from app.infrastructure.auth.security import hash_password_async, verify_password_async, create_access_token, decode_access_token, get_user_snapshot, load_user, parse_user_id
+from app.infrastructure.auth.user_cache import UserSnapshot, user_cache
 from app.interfaces.schemas.schemas import (
     UserRegisterRequest, UserLoginRequest, TokenResponse,
     UserUpdateRequest, UserResponse,
@@ -22,7 +32,9 @@ from app.interfaces.schemas.schemas import (
     ForecastRequest, ForecastResponse,
     TransactionResponse
 )
+from app.interfaces.api.sse import SSE_HEADERS, sse_event
 from app.use_cases.upload_data import upload_data_use_case
+from app.domain.services.file_parsing_service import file_parsing_service
 from app.use_cases.run_forecast import run_forecast_use_case
 
 
@@ -39,9 +51,9 @@ security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> UserModel:
-    """Joriy foydalanuvchini olish."""
+    db: AsyncSession = Depends(get_async_db)
+) -> UserSnapshot:
+    """Joriy foydalanuvchini olish (qisqa TTL kesh orqali)."""
     token = credentials.credentials
     payload = decode_access_token(token)
     
@@ -51,14 +63,14 @@ async def get_current_user(
             detail="Token noto'g'ri yoki muddati tugagan"
         )
     
-    user_id = payload.get("user_id")
+    user_id = parse_user_id(payload)
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token ma'lumotlari noto'liq"
         )
     
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await get_user_snapshot(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -85,7 +97,7 @@ async def register(request: UserRegisterRequest, db: Session = Depends(get_db)):
     # Yangi foydalanuvchi
     new_user = UserModel(
         email=request.email,
-        password_hash=hash_password(request.password),
+        password_hash=await hash_password_async(request.password),
         auth_provider="email",
         business_type=request.business_type
     )
@@ -116,7 +128,7 @@ async def login(request: UserLoginRequest, db: Session = Depends(get_db)):
         )
     
     # Parolni tekshirish
-    if not verify_password(request.password, user.password_hash):
+    if not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email yoki parol noto'g'ri"
@@ -215,7 +227,7 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
 
 
 @auth_router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: UserModel = Depends(get_current_user)):
+async def read_users_me(current_user: UserSnapshot = Depends(get_current_user)):
     """Joriy foydalanuvchi ma'lumotlarini olish."""
     return current_user
 
@@ -223,16 +235,25 @@ async def read_users_me(current_user: UserModel = Depends(get_current_user)):
 @auth_router.patch("/me", response_model=UserResponse)
 async def update_user_me(
     request: UserUpdateRequest,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Joriy foydalanuvchi ma'lumotlarini yangilash (masalan, business_type)."""
+    # current_user - o'zgarmas snapshot; yozish uchun ORM obyektini o'qiymiz
+    user = await load_user(db, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Foydalanuvchi topilmadi"
+        )
+    
     if request.business_type:
-        current_user.business_type = request.business_type
-        db.commit()
-        db.refresh(current_user)
+        user.business_type = request.business_type
+        await db.commit()
+        await db.refresh(user)
+        user_cache.invalidate(user.id)
     
-    return current_user
+    return user
 
 
 # ==================== Data Endpoints ====================
@@ -250,8 +271,8 @@ async def update_user_me(
 )
 async def upload_text(
     request: TextUploadRequest,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Oddiy matn orqali tranzaksiya yuklash."""
     
@@ -270,25 +291,22 @@ async def upload_text(
             detail="Matndan tranzaksiya aniqlanmadi"
         )
     
-    # Ma'lumotlar bazasiga saqlash
-    for txn_data in transactions:
-        txn = TransactionModel(
-            user_id=current_user.id,
-            date=datetime.strptime(txn_data['date'], '%Y-%m-%d'),
-            amount=txn_data['amount'],
-            description=txn_data['description'],
-            category=txn_data.get('category'),
-            is_expense=txn_data.get('is_expense', True),
-            is_fixed=txn_data.get('is_fixed', False)
+    # Ma'lumotlar bazasiga ommaviy saqlash
+    batch = file_parsing_service.to_batch(transactions)
+    if batch.empty:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Matndan tranzaksiya aniqlanmadi"
         )
-        db.add(txn)
-    
-    db.commit()
+    # get_current_user bilan bitta sessiya (LLM kutilayotganda ulanish pool'da)
+    await db.run_sync(transaction_writer.write, current_user.id, batch, commit=False)
+    await db.commit()
+    transaction_cache.invalidate(current_user.id)
     
     return UploadResponse(
         success=True,
-        message=f"{len(transactions)} ta tranzaksiya qo'shildi",
-        transactions_count=len(transactions)
+        message=f"{len(batch)} ta tranzaksiya qo'shildi",
+        transactions_count=len(batch)
     )
 
 
@@ -303,93 +321,33 @@ async def upload_text(
     }
 )
 async def upload_file(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Yuklanadigan fayl (max 10MB)"),
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """
     Fayl yuklash va orqa fonda tahlil qilish.
     """
     from app.infrastructure.task_manager import task_manager
+    from app.infrastructure.ingestion_worker import ingestion_worker, IngestionQueueFull
     from app.use_cases.upload_data import upload_data_use_case
     
-    # 1. Create Task
-    task_id = task_manager.create_task()
-    
-    # 2. Read file content into memory (UploadFile is spool file, need to read before async processing)
-    # Background task faylni o'qiy olmaydi (chunki request yopiladi), shuning uchun contentni uzatamiz.
-    # Lekin use_case UploadFile kutyapti. 
-    # Yechim: process_upload_task metodini usecase'da emas, shu yerda yozib, usecase'ni to'g'irlash.
-    # Yoki faylni vaqtincha saqlash. Memory'da saqlash (BytesIO) eng osoni.
+    # 1. Create Task (SQL backend'da sinxron so'rov - event loop'dan tashqarida)
+    task_id = await asyncio.to_thread(task_manager.create_task)
     
-    content = await file.read()
-    filename = file.filename
+    # 2. Faylni vaqtinchalik faylga bo'laklab yozish (butun fayl xotiraga olinmaydi).
+    # Worker request yopilgandan keyin ishlaydi, shuning uchun UploadFile emas, fayl yo'li uzatiladi.
+    spool_path = await file_parsing_service.spool_upload(file)
     
-    
-    # Background Task function
-    async def process_upload(t_id: str, f_content: bytes, f_name: str, u_id: UUID, db_local: Session, biz_type: str = None):
-        try:
-             # Virtual UploadFile for compatibility
-            from starlette.datastructures import UploadFile as StarletteUploadFile
-            from io import BytesIO
-            
-            # Recreate UploadFile like object
-            file_obj = StarletteUploadFile(filename=f_name, file=BytesIO(f_content))
-            
-            from app.domain.services.file_parsing_service import file_parsing_service
-            
-            # Parse (with business_type)
-            task_manager.update_task(t_id, status="processing", progress=5, message=f"Fayl tahlil qilinmoqda ({biz_type or 'General'})...")
-            transactions_data = await file_parsing_service.parse_file(file_obj, task_id=t_id, business_type=biz_type)
-            
-            # Save to DB
-            task_manager.update_task(t_id, progress=90, message="Ma'lumotlar saqlanmoqda...")
-            
-            saved_count = 0
-            for txn_data in transactions_data:
-                txn = TransactionModel(
-                    user_id=u_id,
-                    date=datetime.strptime(txn_data['date'], '%Y-%m-%d'),
-                    amount=txn_data['amount'],
-                    description=txn_data['description'],
-                    category=txn_data.get('category'),
-                    is_expense=txn_data.get('is_expense', True),
-                    is_fixed=txn_data.get('is_fixed', False)
-                )
-                db_local.add(txn)
-                saved_count += 1
-            
-            db_local.commit()
-            
-            task_manager.update_task(
-                t_id, 
-                status="completed", 
-                progress=100, 
-                message=f"Tayyor! {saved_count} ta tranzaksiya yuklandi.",
-                result={"count": saved_count}
-            )
-            
-        except Exception as e:
-            print(f"Background Task Error: {e}")
-            task_manager.update_task(t_id, status="failed", error=str(e))
-    
-    # 3. Add to background tasks
-    from app.infrastructure.db.database import SessionLocal
-    def bg_wrapper(t_id, f_content, f_name, u_id, biz_type):
-        # Create fresh session for background thread
-        db_bg = SessionLocal()
-        try:
-             import asyncio
-             # Async functionni sync wrapper ichida yurgizish
-             loop = asyncio.new_event_loop()
-             asyncio.set_event_loop(loop)
-             loop.run_until_complete(process_upload(t_id, f_content, f_name, u_id, db_bg, biz_type))
-             loop.close()
-        finally:
-            db_bg.close()
-
-    background_tasks.add_task(bg_wrapper, task_id, content, filename, current_user.id, current_user.business_type)
+    # 3. Ingestion worker navbatiga qo'yish (parse + DB yozish worker'ning event loop'ida)
+    try:
+        ingestion_worker.submit(
+            upload_data_use_case.ingest_file,
+            task_id, spool_path, file.filename, current_user.id, current_user.business_type
+        )
+    except IngestionQueueFull as e:
+        os.remove(spool_path)
+        await asyncio.to_thread(task_manager.update_task, task_id, status="failed", error=str(e))
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     
     return {"task_id": task_id, "message": "Jarayon boshlandi"}
 
@@ -401,25 +359,85 @@ async def get_upload_status(task_id: str):
     """
     from app.infrastructure.task_manager import task_manager
     
-    task = task_manager.get_task(task_id)
+    # SQL backend'da sinxron so'rov - event loop'dan tashqarida
+    task = await asyncio.to_thread(task_manager.get_task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task topilmadi")
         
     return task
 
 
+@data_router.get(
+    "/upload/stream/{task_id}",
+    summary="Upload progress stream (SSE)",
+    description="Task holati o'zgarganda `progress` eventi, oxirida `completed` yoki `failed` eventi yuboriladi. "
+                "`data` - /upload/status javobi bilan bir xil JSON (`result.count` - hozirgacha o'qilgan tranzaksiyalar)."
+)
+async def stream_upload_status(task_id: str):
+    """
+    Background task statusini polling o'rniga Server-Sent Events orqali uzatish.
+    """
+    from app.infrastructure.task_manager import task_manager
+    
+    # get_task SQL backend'da sinxron so'rov - har bir tekshiruv event loop'dan tashqarida
+    if not await asyncio.to_thread(task_manager.get_task, task_id):
+        raise HTTPException(status_code=404, detail="Task topilmadi")
+    
+    async def events():
+        changed = task_manager.subscribe(task_id)
+        last_sent = None
+        last_write = time.monotonic()
+        deadline = last_write + settings.task_stream_max_seconds
+        try:
+            while time.monotonic() < deadline:
+                changed.clear()
+                task = await asyncio.to_thread(task_manager.get_task, task_id)
+                if task is None:
+                    yield sse_event("failed", {"status": "failed", "error": "Task topilmadi"})
+                    return
+                
+                if task != last_sent:
+                    event = task["status"] if task["status"] in ("completed", "failed") else "progress"
+                    yield sse_event(event, task)
+                    if event != "progress":
+                        return
+                    last_sent = task
+                    last_write = time.monotonic()
+                elif time.monotonic() - last_write >= settings.task_stream_heartbeat_seconds:
+                    # Proxy'lar bo'sh ulanishni uzmasligi uchun
+                    yield ": keep-alive\n\n"
+                    last_write = time.monotonic()
+                
+                # Shu jarayondagi update_task darhol uyg'otadi; boshqa worker'lar uchun davriy tekshiruv
+                try:
+                    await asyncio.wait_for(changed.wait(), settings.task_stream_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+            # Task muddat ichida yakunlanmadi - stream yopiladi, mijoz /upload/status polling'ga o'tadi
+        finally:
+            task_manager.unsubscribe(task_id, changed)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+
 @data_router.get("/transactions", response_model=List[TransactionResponse])
 async def get_transactions(
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Foydalanuvchi tranzaksiyalarini olish."""
     
-    transactions = db.query(TransactionModel).filter(
-        TransactionModel.user_id == current_user.id
-    ).order_by(TransactionModel.date.desc()).all()
+    result = await db.execute(
+        select(TransactionModel)
+        .where(TransactionModel.user_id == current_user.id)
+        .order_by(TransactionModel.date.desc())
+    )
     
-    return transactions
+    return result.scalars().all()
 
 
 # ==================== Forecast Endpoints ====================
@@ -427,34 +445,22 @@ async def get_transactions(
 @forecast_router.post("/run", response_model=ForecastResponse)
 async def run_forecast(
     request: ForecastRequest,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Prognoz ishga tushirish."""
     
-    # Tranzaksiyalarni olish
-    transactions_db = db.query(TransactionModel).filter(
-        TransactionModel.user_id == current_user.id
-    ).all()
+    # Tranzaksiyalarni olish (columnar DataFrame, per-user kesh orqali)
+    transactions = await transaction_cache.get_frame_async(db, current_user.id)
+    # Prognoz davomida ulanish pool'da bo'sh turadi
+    await release_connection(db)
     
-    if not transactions_db:
+    if transactions.empty:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Avval tranzaksiyalar yuklanishi kerak"
         )
     
-    # Tranzaksiyalarni dict formatga aylantirish
-    transactions = []
-    for txn in transactions_db:
-        transactions.append({
-            'date': txn.date.strftime('%Y-%m-%d'),
-            'amount': float(txn.amount),
-            'description': txn.description,
-            'category': txn.category,
-            'is_expense': txn.is_expense,
-            'is_fixed': txn.is_fixed
-        })
-    
     # Prognoz
     forecast_result = await run_forecast_use_case.run(
         user_id=current_user.id,
@@ -475,11 +481,22 @@ async def run_forecast(
 
 # ==================== Transaction Management ====================
 
+async def _get_user_transaction(db: AsyncSession, transaction_id: UUID, user_id: UUID):
+    """Foydalanuvchiga tegishli tranzaksiya (topilmasa None)."""
+    result = await db.execute(
+        select(TransactionModel).where(
+            TransactionModel.id == transaction_id,
+            TransactionModel.user_id == user_id
+        )
+    )
+    return result.scalars().first()
+
+
 @data_router.delete("/transaction/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_transaction(
     transaction_id: str,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Tranzaksiyani o'chirish."""
     try:
@@ -487,29 +504,31 @@ async def delete_transaction(
     except ValueError:
         raise HTTPException(status_code=400, detail="Noto'g'ri ID formati")
 
-    transaction = db.query(TransactionModel).filter(
-        TransactionModel.id == txn_uuid,
-        TransactionModel.user_id == current_user.id
-    ).first()
+    transaction = await _get_user_transaction(db, txn_uuid, current_user.id)
 
     if not transaction:
         raise HTTPException(status_code=404, detail="Tranzaksiya topilmadi")
 
-    db.delete(transaction)
-    db.commit()
+    group_key = daily_totals.group_key(transaction)
+    await db.delete(transaction)
+    await db.run_sync(daily_totals.refresh_groups, current_user.id, [group_key])
+    await db.commit()
+    transaction_cache.invalidate(current_user.id)
     return None
 
 
 @data_router.delete("/analytics/clear", status_code=status.HTTP_204_NO_CONTENT)
 async def clear_all_transactions(
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Barcha tranzaksiyalarni o'chirish."""
-    db.query(TransactionModel).filter(
-        TransactionModel.user_id == current_user.id
-    ).delete()
-    db.commit()
+    await db.execute(
+        delete(TransactionModel).where(TransactionModel.user_id == current_user.id)
+    )
+    await db.run_sync(daily_totals.clear_user, current_user.id)
+    await db.commit()
+    transaction_cache.invalidate(current_user.id)
     return None
 
 
@@ -519,8 +538,8 @@ from app.interfaces.schemas.schemas import TransactionUpdateRequest
 async def update_transaction(
     transaction_id: str,
     request: TransactionUpdateRequest,
-    current_user: UserModel = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Tranzaksiyani tahrirlash."""
     try:
@@ -528,14 +547,14 @@ async def update_transaction(
     except ValueError:
         raise HTTPException(status_code=400, detail="Noto'g'ri ID formati")
 
-    transaction = db.query(TransactionModel).filter(
-        TransactionModel.id == txn_uuid,
-        TransactionModel.user_id == current_user.id
-    ).first()
+    transaction = await _get_user_transaction(db, txn_uuid, current_user.id)
 
     if not transaction:
         raise HTTPException(status_code=404, detail="Tranzaksiya topilmadi")
 
+    # Eski va yangi agregat guruhlari qayta hisoblanadi
+    old_group_key = daily_totals.group_key(transaction)
+
     # Update logic
     if request.date:
         transaction.date = datetime.strptime(request.date, '%Y-%m-%d')
@@ -550,6 +569,8 @@ async def update_transaction(
     if request.is_fixed is not None:
         transaction.is_fixed = request.is_fixed
 
-    db.commit()
-    db.refresh(transaction)
+    await db.run_sync(daily_totals.refresh_groups, current_user.id, [old_group_key, daily_totals.group_key(transaction)])
+    await db.commit()
+    transaction_cache.invalidate(current_user.id)
+    await db.refresh(transaction)
     return transaction
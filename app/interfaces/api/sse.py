@@ -0,0 +1,16 @@
+"""
+API - Server-Sent Events yordamchilari
+
+Upload progress va chat token stream'lari uchun umumiy format.
+"""
+
+import json
+
+
+# Brauzer/proxy (nginx) javobni keshlamasligi va buferlamasligi uchun
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Server-Sent Events formatidagi bitta xabar."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
@@ -322,3 +322,29 @@ class FilterOptionsResponse(BaseModel):
     max_date: Optional[str]
     min_amount: float
     max_amount: float
+
+
+class DashboardBatchRequest(BaseModel):
+    """Bir nechta dashboard filtri uchun bitta so'rov."""
+    filters: List[DashboardRequest] = Field(..., min_length=1, max_length=12, description="Dashboard filtrlari ro'yxati")
+    include_filter_options: bool = Field(True, description="Filtrlash opsiyalarini ham qaytarish")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "filters": [
+                    {"filter_type": "last_7_days"},
+                    {"filter_type": "this_month"},
+                    {"filter_type": "last_month"},
+                    {"filter_type": "this_year"}
+                ],
+                "include_filter_options": True
+            }
+        }
+
+
+class DashboardBatchResponse(BaseModel):
+    """Bir nechta dashboard javobi (filters tartibida)."""
+    success: bool
+    data: List[DashboardData]
+    filter_options: Optional[FilterOptionsResponse] = None
@@ -4,17 +4,27 @@ LQX AI - Main Application
 FastAPI application entrypoint.
 """
 
+import time
+
+_import_started_at = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.interfaces.api.endpoints import auth_router, data_router, forecast_router
 from app.interfaces.api.analytics import router as analytics_router
 from app.interfaces.api.chat import router as chat_router
-from app.infrastructure.db.database import Base, engine
-
+from app.infrastructure.auth.password_executor import password_executor
+from app.infrastructure.auth.user_cache import user_cache
+from app.infrastructure.db.database import Base, async_engine, engine, pool_stats, settings
+from app.infrastructure.db.transaction_cache import transaction_cache
+from app.infrastructure.forecast_executor import forecast_executor
+from app.infrastructure.ingestion_worker import ingestion_worker
+from app.infrastructure.task_manager import task_manager
+from app.infrastructure.llm.response_cache import llm_response_cache
+from app.infrastructure.warmup import startup_warmup
 
-# Ma'lumotlar bazasi jadvallarini yaratish
-Base.metadata.create_all(bind=engine)
+startup_warmup.record("import:app.main", _import_started_at)
 
 
 # FastAPI app
@@ -59,6 +69,63 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Ichki navbat va keshlar holati (shu worker jarayoni uchun)."""
+    return {
+        "forecast_executor": forecast_executor.stats(),
+        "ingestion_worker": ingestion_worker.stats(),
+        "password_executor": password_executor.stats(),
+        "db_pool": pool_stats(),
+        "transaction_cache": transaction_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "llm_cache": llm_response_cache.stats(),
+        "startup": startup_warmup.report()
+    }
+
+
+@app.on_event("startup")
+def startup():
+    """Jadvallarni yaratish va og'ir kutubxonalarni fonda yuklashni boshlash."""
+    started_at = time.perf_counter()
+    # Ma'lumotlar bazasi jadvallarini yaratish (import vaqtida emas, worker ishga tushganda)
+    Base.metadata.create_all(bind=engine)
+    startup_warmup.record("create_all", started_at)
+
+    # Oldingi ishga tushishdan qolgan (lease'i tugagan) upload tasklari
+    task_manager.recover_abandoned()
+
+    # Upload'larni qayta ishlovchi worker (bitta uzoq yashovchi event loop)
+    ingestion_worker.start()
+
+    if settings.startup_warmup:
+        startup_warmup.start()
+
+
+@app.on_event("shutdown")
+def shutdown_forecast_executor():
+    """Prophet process pool'ini yopish."""
+    forecast_executor.shutdown()
+
+
+@app.on_event("shutdown")
+def shutdown_ingestion_worker():
+    """Navbatdagi uploadlarni tugatib, ingestion worker'ni to'xtatish."""
+    ingestion_worker.shutdown()
+
+
+@app.on_event("shutdown")
+def shutdown_password_executor():
+    """Parol hash'lash pool'ini yopish."""
+    password_executor.shutdown()
+
+
+@app.on_event("shutdown")
+async def shutdown_async_engine():
+    """Async engine ulanishlarini yopish."""
+    await async_engine.dispose()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
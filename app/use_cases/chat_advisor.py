@@ -1,11 +1,16 @@
 
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
 from uuid import UUID
 import re
+import pandas as pd
 
 from app.domain.services.forecasting_service import forecasting_service
 from app.infrastructure.llm.local_llm_client import llm_client
 
+# Tranzaksiyalar bo'lmaganda LLM chaqirilmaydi
+NO_DATA_RESPONSE = "Hali yetarli ma'lumot yo'q. Iltimos, oldin tranzaksiyalarni yuklang (CSV yoki kiritish orqali)."
+
+
 class ChatAdvisorUseCase:
     """Chat orqali maslahat berish use case."""
     
@@ -13,18 +18,60 @@ class ChatAdvisorUseCase:
         self,
         user_id: UUID,
         message: str,
-        transactions: List[Dict[str, Any]], # Context uchun transaction history kerak
+        transactions: Union[pd.DataFrame, List[Dict[str, Any]]], # Context uchun transaction history kerak
         initial_balance: float = 0
     ) -> Dict[str, Any]:
         
+        context_data = self._build_context(message, transactions, initial_balance)
+        
+        # Agar transactionlar bo'lmasa
+        if context_data is None:
+             return {
+                'response': NO_DATA_RESPONSE
+            }
+        
+        llm_response = await llm_client.chat_with_advisor(message, context_data)
+        
+        return {
+            'response': llm_response,
+            'context_used': context_data
+        }
+    
+    async def run_stream(
+        self,
+        user_id: UUID,
+        message: str,
+        transactions: Union[pd.DataFrame, List[Dict[str, Any]]],
+        initial_balance: float = 0
+    ) -> Tuple[Optional[Dict[str, Any]], AsyncIterator[str]]:
+        """
+        run'ning stream varianti: (context_used, javob tokenlari iteratori).
+        Kontekst (prognoz, anomaliyalar) oldindan hisoblanadi, LLM javobi esa token-token keladi.
+        """
+        context_data = self._build_context(message, transactions, initial_balance)
+        
+        if context_data is None:
+            return None, self._single_chunk(NO_DATA_RESPONSE)
+        
+        return context_data, llm_client.chat_with_advisor_stream(message, context_data)
+    
+    async def _single_chunk(self, text: str) -> AsyncIterator[str]:
+        yield text
+    
+    def _build_context(
+        self,
+        message: str,
+        transactions: Union[pd.DataFrame, List[Dict[str, Any]]],
+        initial_balance: float
+    ) -> Optional[Dict[str, Any]]:
+        """LLM uchun kontekst (risk, prognoz, anomaliyalar, oylik statistika); tranzaksiya bo'lmasa - None."""
+        
         # 1. Ma'lumotlarni tayyorlash va tahlil qilish
         raw_df = forecasting_service.prepare_data(transactions)
         
         # Agar transactionlar bo'lmasa
         if raw_df.empty:
-             return {
-                'response': "Hali yetarli ma'lumot yo'q. Iltimos, oldin tranzaksiyalarni yuklang (CSV yoki kiritish orqali)."
-            }
+            return None
             
         daily_df = forecasting_service.calculate_daily_balance(raw_df, initial_balance)
         
@@ -64,7 +111,7 @@ class ChatAdvisorUseCase:
         expense_data = this_month_data[this_month_data['is_expense'] == True]
         top_expenses = []
         if not expense_data.empty:
-            category_totals = expense_data.groupby('category')['amount'].sum().sort_values(ascending=False)
+            category_totals = expense_data.groupby('category', observed=True)['amount'].sum().sort_values(ascending=False)
             for cat, amt in category_totals.head(5).items():
                 top_expenses.append({
                     'category': cat,
@@ -91,12 +138,7 @@ class ChatAdvisorUseCase:
             'top_expenses': top_expenses
         }
         
-        llm_response = await llm_client.chat_with_advisor(message, context_data)
-        
-        return {
-            'response': llm_response,
-            'context_used': context_data
-        }
+        return context_data
         
     def _detect_expense_intent(self, text: str) -> Optional[float]:
         """
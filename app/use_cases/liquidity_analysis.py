@@ -1,5 +1,5 @@
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
 from datetime import datetime, timedelta
 import pandas as pd
 
@@ -15,7 +15,7 @@ class LiquidityAnalysisUseCase:
     async def run(
         self, 
         user_id: Any, 
-        transactions: List[Dict[str, Any]], 
+        transactions: Union[pd.DataFrame, List[Dict[str, Any]]], 
         initial_balance: float, 
         period_days: int,
         business_type: str = None
@@ -25,16 +25,14 @@ class LiquidityAnalysisUseCase:
         """
         # 1. Forecasting Service orqali prognoz qilish
         # Kichik hack: forecast_days ni period_days ga tenglaymiz
-        df = pd.DataFrame(transactions)
-        df['date'] = pd.to_datetime(df['date'])
-        df['amount'] = pd.to_numeric(df['amount'])
+        # Ma'lumotni tayyorlash (vektorli pipeline, signed_amount bilan)
+        df = forecasting_service.prepare_data(transactions)
         
-        # Prepare data (Forecast servisi ichidagi metodni chaqirishimiz mumkin, lekin u private bo'lishi mumkin)
-        # Shuning uchun forecasting_service.predict_cash_flow ni ishlatamiz
-        forecast_df = forecasting_service.predict_cash_flow(
+        forecast_df = await forecasting_service.predict_cash_flow(
             df, 
             initial_balance=initial_balance, 
-            days=period_days
+            days=period_days,
+            user_id=user_id
         )
         
         if forecast_df.empty:
@@ -4,7 +4,7 @@ Use Case - Run Forecast
 Prognoz va risk hisoblash.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from uuid import UUID
 import pandas as pd
 
@@ -46,7 +46,7 @@ class RunForecastUseCase:
     async def run(
         self,
         user_id: UUID,
-        transactions: List[Dict[str, Any]],
+        transactions: Union[pd.DataFrame, List[Dict[str, Any]]],
         initial_balance: float = 0,
         forecast_days: int = 90,
         business_type: Optional[str] = None  # Yangi argument
@@ -64,10 +64,11 @@ class RunForecastUseCase:
             Prognoz natijalari
         """
         # Prognoz
-        forecast_result = forecasting_service.run_forecast(
+        forecast_result = await forecasting_service.run_forecast(
             transactions=transactions,
             initial_balance=initial_balance,
-            forecast_days=forecast_days
+            forecast_days=forecast_days,
+            user_id=user_id
         )
         
         if not forecast_result.get('success'):
@@ -1,10 +1,19 @@
 
+import asyncio
+import os
+import pickle
+import threading
 from fastapi import UploadFile
 from typing import List, Dict, Any, Optional
+from uuid import UUID
 from datetime import datetime
 
 from app.domain.services.file_parsing_service import file_parsing_service
+from app.infrastructure.db.database import SessionLocal
+from app.infrastructure.db.transaction_cache import transaction_cache
+from app.infrastructure.db.transaction_writer import transaction_writer
 from app.infrastructure.llm.local_llm_client import llm_client
+from app.infrastructure.task_manager import ABANDONED_ERROR, task_manager
 
 class UploadDataUseCase:
     """Ma'lumot yuklash va parse qilish use case."""
@@ -21,7 +30,8 @@ class UploadDataUseCase:
         Har qanday qo'llab-quvvatlanadigan faylni (CSV, XLSX, PDF, DOCX) parse qilish.
         """
         try:
-            transactions = await file_parsing_service.parse_file(file)
+            batch = await file_parsing_service.parse_file(file)
+            transactions = file_parsing_service.batch_to_records(batch)
             
             # Qo'shimcha validatsiya yoki tozalash kerak bo'lsa shu yerda
             validation = self.validate_transactions(transactions)
@@ -41,6 +51,87 @@ class UploadDataUseCase:
             print(f"Upload Error: {e}")
             return {"success": False, "error": "Tizim xatosi: Faylni qayta ishlash imkonsiz."}
     
+    async def ingest_file(self, task_id: str, path: str, filename: str, user_id: UUID, business_type: Optional[str] = None) -> None:
+        """
+        Vaqtinchalik faylni parse qilib bazaga yozish (ingestion worker'da bajariladi).
+        Task holati task_manager orqali yangilanadi; fayl oxirida o'chiriladi.
+        """
+        # Parse qilingan batch'lar shu faylga yoziladi (xotira fayl hajmiga bog'liq emas)
+        staging_path = f"{path}.batches"
+        cancelled = threading.Event()
+        try:
+            # Taskni faqat bitta worker bajaradi (yakunlangan/bekor qilingan task qayta bajarilmaydi)
+            if not task_manager.acquire_lease(task_id):
+                print(f"Task {task_id} boshqa worker tomonidan bajarilmoqda yoki yakunlangan")
+                return
+
+            # 1. Parse (with business_type) - LLM javoblari kutilayotganda bazaga ulanish olinmaydi
+            task_manager.update_task(task_id, status="processing", progress=5, message=f"Fayl tahlil qilinmoqda ({business_type or 'General'})...")
+
+            parsed_count = 0
+            with open(staging_path, "wb") as staging:
+                async for batch in file_parsing_service.iter_file_batches(path, filename, task_id=task_id, business_type=business_type):
+                    if batch.empty:
+                        continue
+                    pickle.dump(batch, staging, protocol=pickle.HIGHEST_PROTOCOL)
+                    parsed_count += len(batch)
+                    # Oraliq natija: hozirgacha o'qilgan tranzaksiyalar soni (status/stream uchun)
+                    task_manager.update_task(task_id, result={"count": parsed_count})
+
+            # 2. Save to DB - barcha batch'lar bitta qisqa tranzaksiyada, worker loop'idan tashqarida
+            task_manager.update_task(task_id, progress=90, message="Ma'lumotlar saqlanmoqda...")
+            saved_count = await asyncio.to_thread(self._write_staged, staging_path, user_id, cancelled)
+            transaction_cache.invalidate(user_id)
+
+            task_manager.update_task(
+                task_id,
+                status="completed",
+                progress=100,
+                message=f"Tayyor! {saved_count} ta tranzaksiya yuklandi.",
+                result={"count": saved_count}
+            )
+
+        except asyncio.CancelledError:
+            # Server to'xtatilmoqda - yozish thread'i commit qilmasdan rollback qiladi
+            cancelled.set()
+            task_manager.update_task(task_id, status="failed", error=ABANDONED_ERROR)
+            raise
+        except Exception as e:
+            print(f"Background Task Error: {e}")
+            task_manager.update_task(task_id, status="failed", error=str(e))
+        finally:
+            task_manager.release_lease(task_id)
+            os.remove(path)
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+    
+    def _write_staged(self, staging_path: str, user_id: UUID, cancelled: threading.Event) -> int:
+        """
+        Diskdagi batch'larni bitta tranzaksiyada yozish (thread'da bajariladi).
+        Xato yoki bekor qilinganda hech narsa yozilmaydi.
+        """
+        db = SessionLocal()
+        try:
+            saved_count = 0
+            with open(staging_path, "rb") as staging:
+                while True:
+                    try:
+                        batch = pickle.load(staging)
+                    except EOFError:
+                        break
+                    saved_count += transaction_writer.write(db, user_id, batch, commit=False)
+
+            if cancelled.is_set():
+                db.rollback()
+                return 0
+            db.commit()
+            return saved_count
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
     def validate_transactions(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         Tranzaksiyalarni tekshirish.
@@ -0,0 +1,62 @@
+
+import sys
+import os
+import time
+import asyncio
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.infrastructure.auth.password_executor import password_executor
+from app.infrastructure.auth.security import hash_password, verify_password, verify_password_async
+
+
+PASSWORD = "secret12"
+
+
+async def probe_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Boshqa endpointlar ko'radigan kechikish: event loop tick'ining eng katta kechikishi (s)."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def login_burst(n_logins: int, hashed: str, offload: bool):
+    """n_logins ta bir vaqtdagi login: eski (verify event loop'da) yoki yangi (password_executor)."""
+    async def login():
+        if offload:
+            assert await verify_password_async(PASSWORD, hashed)
+        else:
+            assert verify_password(PASSWORD, hashed)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(stop))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(n_logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    return elapsed, await probe
+
+
+def benchmark_login(burst_sizes=(8, 32)):
+    hashed = hash_password(PASSWORD)
+    rounds = hashed.split("$")[2]
+    print(f"=== Login throughput (bcrypt rounds={rounds}, password_executor workers={password_executor.max_workers}) ===")
+    print(f"{'logins':>7} | {'mode':>10} | {'total':>8} | {'logins/s':>9} | {'max loop lag':>12}")
+
+    for n in burst_sizes:
+        for mode, offload in (("inline", False), ("executor", True)):
+            elapsed, lag = asyncio.run(login_burst(n, hashed, offload))
+            print(f"{n:>7} | {mode:>10} | {elapsed:>7.2f}s | {n / elapsed:>9.1f} | {lag * 1000:>10.0f}ms")
+
+    password_executor.shutdown()
+
+
+if __name__ == "__main__":
+    benchmark_login()
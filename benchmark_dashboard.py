@@ -0,0 +1,182 @@
+
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.domain.services.analytics_service import analytics_service
+
+
+def make_transactions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """transaction_loader formatidagi sintetik tranzaksiyalar (oxirgi 3 yil, bugungacha)."""
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.now().normalize()
+    return pd.DataFrame({
+        'date': (today - pd.to_timedelta(rng.integers(0, 3 * 365, n_rows), unit='D')).astype('datetime64[ns]'),
+        'amount': rng.uniform(10_000, 5_000_000, n_rows).round(2),
+        'description': 'txn',
+        'category': pd.Categorical(rng.choice(['Ijara', 'Maosh', 'Savdo', 'Kommunal', 'Soliq'], n_rows)),
+        'is_expense': rng.random(n_rows) < 0.6,
+        'is_fixed': False,
+    })
+
+
+def make_daily(df: pd.DataFrame) -> pd.DataFrame:
+    """daily_category_totals formatidagi agregat (transaction_cache.get_daily_frame kabi)."""
+    daily = df.groupby(['date', 'category', 'is_expense'], observed=True)['amount'].agg(['sum', 'count', 'min', 'max'])
+    return daily.reset_index().rename(columns={'sum': 'amount', 'min': 'min_amount', 'max': 'max_amount'})
+
+
+def legacy_get_dashboard_data(transactions: pd.DataFrame, filter_type: str) -> dict:
+    """Eski get_dashboard_data (mask'lar, alohida groupby/resample, iterrows) - solishtirish uchun."""
+    df_all = transactions.copy()
+    df_all['date'] = pd.to_datetime(df_all['date'])
+    current_balance = df_all[df_all['is_expense'] == False]['amount'].sum() - df_all[df_all['is_expense'] == True]['amount'].sum()
+
+    df = analytics_service.filter_transactions(df_all, filter_type)
+    total_income = df[df['is_expense'] == False]['amount'].sum()
+    total_expense = df[df['is_expense'] == True]['amount'].sum()
+    df[df['is_expense'] == False]['amount'].mean() if not df[df['is_expense'] == False].empty else 0
+    df[df['is_expense'] == True]['amount'].mean() if not df[df['is_expense'] == True].empty else 0
+
+    growth_percentage = 0.0
+    prev_start, prev_end = analytics_service._previous_period(filter_type)
+    if prev_start and prev_end:
+        prev_df = df_all[(df_all['date'] >= prev_start) & (df_all['date'] <= prev_end)]
+        prev_income = prev_df[prev_df['is_expense'] == False]['amount'].sum()
+        if prev_income > 0:
+            growth_percentage = ((total_income - prev_income) / prev_income) * 100
+        elif total_income > 0:
+            growth_percentage = 100.0
+
+    expenses_df = df[df['is_expense'] == True]
+    expenses_df.groupby('category', observed=True)['amount'].sum().sort_values(ascending=False)
+
+    chart_start_date, chart_end_date, resample_rule, date_format = analytics_service._chart_range(filter_type)
+    full_idx = pd.date_range(start=chart_start_date, end=chart_end_date, freq=resample_rule)
+    chart_df = df.copy()
+    chart_df['date'] = pd.to_datetime(chart_df['date']).dt.normalize()
+    income_grouped = chart_df[chart_df['is_expense'] == False].set_index('date').resample(resample_rule)['amount'].sum()
+    expense_grouped = chart_df[chart_df['is_expense'] == True].set_index('date').resample(resample_rule)['amount'].sum()
+    trend_df = pd.DataFrame({
+        'income': income_grouped.reindex(full_idx, fill_value=0),
+        'expense': expense_grouped.reindex(full_idx, fill_value=0),
+    })
+    trend_df['net_change'] = trend_df['income'] - trend_df['expense']
+    chart_points = []
+    for date, row in trend_df.iterrows():
+        chart_points.append({
+            "date": date.strftime(date_format),
+            "income": float(row['income']),
+            "expense": float(row['expense']),
+            "net_change": float(row['net_change'])
+        })
+
+    def get_category_details(sub_df, total):
+        if sub_df.empty or total == 0:
+            return []
+        groups = sub_df.groupby('category', observed=True)['amount'].sum().sort_values(ascending=False)
+        return [
+            {'category': cat, 'amount': float(amount), 'percentage': round((amount / total) * 100, 1)}
+            for cat, amount in groups.items()
+        ]
+
+    income_details = get_category_details(df[df['is_expense'] == False], total_income)
+    expense_details = get_category_details(df[df['is_expense'] == True], total_expense)
+    period_days = (chart_end_date - chart_start_date).days + 1
+
+    return {
+        "current_balance": float(current_balance),
+        "growth_percentage": round(growth_percentage, 1),
+        "top_expenses": expense_details[:3],
+        "summary": {"total_income": float(total_income), "total_expense": float(total_expense)},
+        "charts": chart_points,
+        "details": {
+            "income_by_category": income_details,
+            "expense_by_category": expense_details,
+            "avg_stats": {"daily_income": float(total_income / period_days), "daily_expense": float(total_expense / period_days)},
+        },
+    }
+
+
+def cpu_time(fn, *args, repeat: int = 10) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.process_time()
+        fn(*args)
+        best = min(best, time.process_time() - t0)
+    return best
+
+
+def same_dashboard(legacy: dict, new: dict) -> bool:
+    """Umumiy maydonlar mosligi (float'lar nisbiy xatolik bilan)."""
+    def close(a, b):
+        if isinstance(a, dict):
+            return all(close(value, b[key]) for key, value in a.items())
+        if isinstance(a, list):
+            return len(a) == len(b) and all(close(x, y) for x, y in zip(a, b))
+        if isinstance(a, float):
+            return bool(np.isclose(a, b, rtol=1e-9))
+        return a == b
+    return close(legacy, new)
+
+
+def benchmark_dashboard(sizes=(10_000, 100_000, 1_000_000), filter_types=('this_month', 'this_year', 'last_7_days')):
+    print("=== AnalyticsService.get_dashboard_data (CPU ms/call) ===")
+    print(f"{'rows':>10} | {'filter':>12} | {'legacy':>9} | {'raw rows':>9} | {'daily agg':>9} | {'speedup':>8}")
+
+    for n in sizes:
+        df = make_transactions(n)
+        daily = make_daily(df)
+        for filter_type in filter_types:
+            legacy_t = cpu_time(legacy_get_dashboard_data, df, filter_type, repeat=3)
+            new_t = cpu_time(analytics_service.get_dashboard_data, df, filter_type)
+            daily_t = cpu_time(analytics_service.get_dashboard_data, daily, filter_type)
+
+            # Natijalar bir xil ekanini tekshirish
+            expected = legacy_get_dashboard_data(df, filter_type)
+            assert same_dashboard(expected, analytics_service.get_dashboard_data(df, filter_type)), "Natijalar mos kelmadi!"
+            assert same_dashboard(expected, analytics_service.get_dashboard_data(daily, filter_type)), "Agregat natijasi mos kelmadi!"
+
+            print(
+                f"{n:>10} | {filter_type:>12} | {legacy_t * 1000:>7.1f}ms | {new_t * 1000:>7.1f}ms | "
+                f"{daily_t * 1000:>7.1f}ms | {legacy_t / new_t:>7.1f}x"
+            )
+
+
+def benchmark_batch(sizes=(10_000, 100_000, 1_000_000), filter_types=('last_7_days', 'this_month', 'last_month', 'this_year')):
+    """Sahifa yuklanishi: har bir filtr uchun alohida so'rov + /filters vs bitta batch so'rov."""
+    print("=== Dashboard sahifasi: alohida chaqiruvlar vs get_dashboard_batch (CPU ms) ===")
+    print(f"{'rows':>10} | {'separate':>9} | {'batch':>9} | {'speedup':>8}")
+
+    specs = [{'filter_type': filter_type} for filter_type in filter_types]
+
+    def separate(df):
+        for filter_type in filter_types:
+            analytics_service.get_dashboard_data(df, filter_type)
+        analytics_service.get_filter_options(df)
+
+    def batch(df):
+        analytics_service.get_dashboard_batch(df, specs)
+        analytics_service.get_filter_options(df)
+
+    for n in sizes:
+        df = make_transactions(n)
+        expected = [analytics_service.get_dashboard_data(df, filter_type) for filter_type in filter_types]
+        assert analytics_service.get_dashboard_batch(df, specs) == expected, "Batch natijasi mos kelmadi!"
+
+        separate_t = cpu_time(separate, df, repeat=5)
+        batch_t = cpu_time(batch, df, repeat=5)
+        print(f"{n:>10} | {separate_t * 1000:>7.1f}ms | {batch_t * 1000:>7.1f}ms | {separate_t / batch_t:>7.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark_dashboard()
+    print()
+    benchmark_batch()
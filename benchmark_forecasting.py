@@ -0,0 +1,101 @@
+
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.domain.services.forecasting_service import ForecastingService, simulate_balances
+
+
+def make_transactions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """transaction_loader formatidagi sintetik tranzaksiyalar."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2022-01-01')
+    return pd.DataFrame({
+        'date': start + rng.integers(0, 3 * 365, n_rows).astype('timedelta64[D]'),
+        'amount': rng.uniform(10_000, 5_000_000, n_rows).round(2),
+        'description': 'txn',
+        'category': pd.Categorical(rng.choice(['Ijara', 'Maosh', 'Savdo', 'Kommunal'], n_rows)),
+        'is_expense': rng.random(n_rows) < 0.6,
+        'is_fixed': False,
+    })
+
+
+def legacy_prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Eski (df.apply axis=1) tayyorlash - solishtirish uchun."""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    df['amount'] = df['amount'].astype(float)
+    df['signed_amount'] = df.apply(
+        lambda row: -row['amount'] if row.get('is_expense', True) else row['amount'],
+        axis=1
+    )
+    return df.sort_values('date')
+
+
+def timeit(fn, *args, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def benchmark_prepare_data(sizes=(1_000, 10_000, 100_000, 1_000_000), legacy_limit: int = 100_000):
+    print("=== ForecastingService.prepare_data (signed_amount) ===")
+    print(f"{'rows':>10} | {'vectorised':>12} | {'legacy apply':>12} | {'speedup':>8}")
+    service = ForecastingService()
+
+    for n in sizes:
+        df = make_transactions(n)
+        new_t = timeit(service.prepare_data, df)
+
+        if n <= legacy_limit:
+            legacy_t = timeit(legacy_prepare, df, repeat=1)
+            # Natijalar bir xil ekanini tekshirish
+            expected = legacy_prepare(df)['signed_amount'].sort_index()
+            actual = service.prepare_data(df)['signed_amount'].sort_index()
+            assert np.allclose(expected.to_numpy(), actual.to_numpy()), "signed_amount mos kelmadi!"
+            print(f"{n:>10} | {new_t * 1000:>10.1f}ms | {legacy_t * 1000:>10.1f}ms | {legacy_t / new_t:>7.1f}x")
+        else:
+            print(f"{n:>10} | {new_t * 1000:>10.1f}ms | {'-':>12} | {'-':>8}")
+
+
+def legacy_simulation(last_balance: float, avg_daily_change: float, forecast_days: int) -> list:
+    """Eski kunma-kun simulyatsiya sikli - solishtirish uchun."""
+    adjusted_growth = avg_daily_change * 0.9
+    predicted_balances = []
+    current_val = last_balance
+    for i in range(forecast_days):
+        seasonality_factor = 1 + 0.05 * np.sin(2 * np.pi * i / 30)
+        current_val += adjusted_growth * seasonality_factor
+        predicted_balances.append(current_val)
+    return predicted_balances
+
+
+def benchmark_simulation(user_counts=(1, 100, 10_000), forecast_days: int = 365):
+    print(f"\n=== forecast_with_simulation engine ({forecast_days} kun) ===")
+    print(f"{'users':>10} | {'batched':>12} | {'legacy loop':>12} | {'speedup':>8}")
+    rng = np.random.default_rng(0)
+
+    for n in user_counts:
+        last_balances = rng.uniform(0, 1e8, n)
+        changes = rng.normal(0, 1e5, n)
+
+        new_t = timeit(simulate_balances, last_balances, changes, forecast_days)
+        legacy_t = timeit(lambda: [legacy_simulation(b, c, forecast_days) for b, c in zip(last_balances, changes)], repeat=1)
+
+        expected = np.array(legacy_simulation(last_balances[0], changes[0], forecast_days))
+        actual = simulate_balances(last_balances, changes, forecast_days)[0]
+        assert np.allclose(expected, actual), "Simulyatsiya natijasi mos kelmadi!"
+        print(f"{n:>10} | {new_t * 1000:>10.2f}ms | {legacy_t * 1000:>10.1f}ms | {legacy_t / new_t:>7.0f}x")
+
+
+if __name__ == "__main__":
+    benchmark_prepare_data()
+    benchmark_simulation()
@@ -0,0 +1,89 @@
+
+import sys
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from app.domain.services.file_parsing_service import file_parsing_service
+
+
+def make_export(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Excel/CSV eksportiga o'xshash sintetik jadval (sana string, ishorali summa)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Date': pd.date_range('2020-01-01', periods=n_rows, freq='h').strftime('%Y-%m-%d'),
+        'Amount': rng.normal(0, 1e6, n_rows).round(2),
+        'Description': 'txn',
+        'Category': rng.choice(['Xarajat', 'Daromad', 'Ijara', 'Chiqim'], n_rows),
+    })
+
+
+def legacy_df_to_transactions(df: pd.DataFrame) -> list:
+    """Eski (iterrows, qatorma-qator to_datetime) konvertatsiya - solishtirish uchun."""
+    df = df.copy()
+    df.columns = df.columns.str.lower()
+    transactions = []
+    for _, row in df.iterrows():
+        amount_val = float(row.get('amount', 0))
+        raw_is_expense = row.get('is_expense')
+        if pd.notna(raw_is_expense):
+            is_expense = bool(raw_is_expense)
+        elif amount_val < 0:
+            is_expense = True
+        else:
+            cat_val = str(row.get('category', '')).lower()
+            is_expense = "xarajat" in cat_val or "chiqim" in cat_val
+
+        date_val = str(row.get('date', ''))
+        txn_date = pd.to_datetime(row.get('date')).to_pydatetime()
+        if txn_date > datetime.now():
+            continue
+        date_val = txn_date.strftime('%Y-%m-%d')
+
+        transactions.append({
+            "date": date_val,
+            "amount": abs(amount_val),
+            "description": str(row.get('description', '')),
+            "category": str(row.get('category', 'Boshqa')),
+            "is_expense": is_expense,
+            "is_fixed": bool(row.get('is_fixed', False))
+        })
+    return transactions
+
+
+def timeit(fn, *args, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def benchmark_df_to_transactions(sizes=(1_000, 10_000, 100_000), legacy_limit: int = 10_000):
+    print("=== FileParsingService._df_to_transactions ===")
+    print(f"{'rows':>10} | {'vectorised':>12} | {'legacy loop':>12} | {'speedup':>8}")
+
+    for n in sizes:
+        df = make_export(n)
+        new_t = timeit(file_parsing_service._df_to_transactions, df)
+
+        if n <= legacy_limit:
+            legacy_t = timeit(legacy_df_to_transactions, df, repeat=1)
+            # Natijalar bir xil ekanini tekshirish
+            expected = legacy_df_to_transactions(df)
+            actual = file_parsing_service.batch_to_records(file_parsing_service._df_to_transactions(df))
+            assert expected == actual, "Tranzaksiyalar mos kelmadi!"
+            print(f"{n:>10} | {new_t * 1000:>10.1f}ms | {legacy_t * 1000:>10.1f}ms | {legacy_t / new_t:>7.1f}x")
+        else:
+            print(f"{n:>10} | {new_t * 1000:>10.1f}ms | {'-':>12} | {'-':>8}")
+
+
+if __name__ == "__main__":
+    benchmark_df_to_transactions()
@@ -0,0 +1,60 @@
+
+import sys
+import os
+import subprocess
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+# Startup'da import qilinmasligi kerak bo'lgan og'ir modullar
+LAZY_MODULES = ["openai", "prophet", "pypdf", "docx", "openpyxl"]
+
+
+def importtime(statement: str) -> list:
+    """`python -X importtime` natijasi: (modul, self_us, cumulative_us, chuqurlik)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, cwd=os.getcwd()
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(proc.returncode)
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        name = name[1:]  # '|' dan keyingi bitta probel
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report_app_import(top: int = 15):
+    print("=== import app.main ===")
+    rows = importtime("import app.main")
+    total = next(cum for name, _, cum, _ in rows if name == "app.main")
+    print(f"Jami: {total / 1000:.0f}ms\n")
+
+    print(f"{'cumulative':>12} | modul (eng og'ir {top} ta, top-level paketlar)")
+    top_level = [r for r in rows if r[3] <= 2 and r[0] != "app.main"]
+    for name, _, cum, depth in sorted(top_level, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cum / 1000:>10.0f}ms | {'  ' * depth}{name}")
+
+    loaded = {r[0] for r in rows}
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    print("\nStartup'da yuklangan og'ir modullar:", ", ".join(eager) if eager else "yo'q")
+
+
+def report_lazy_modules():
+    print("\n=== Lazy modullar (birinchi ishlatishda / warm-up'da yuklanadi) ===")
+    for module in LAZY_MODULES:
+        rows = importtime(f"import {module}")
+        cum = next(c for name, _, c, _ in rows if name == module)
+        print(f"{module:>10}: {cum / 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    report_app_import()
+    report_lazy_modules()
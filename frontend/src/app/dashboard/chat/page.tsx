@@ -39,26 +39,33 @@ export default function ChatPage() {
             const dashRes = await api.get("/analytics/dashboard?filter_type=this_month");
             const currentBal = dashRes.data.data.current_balance || 0;
 
-            // 2. Call Chat endpoint
-            const res = await api.post("/chat/ask", {
-                message: userMessage,
-                initial_balance: currentBal
-            });
+            // 2. Call streaming Chat endpoint - the AI message grows as tokens arrive
+            setMessages(prev => [...prev, { role: "assistant", content: "" }]);
+            setLoading(false);
 
-            const aiResponse = res.data.response;
+            const appendToLast = (text: string) => {
+                setMessages(prev => {
+                    const last = prev[prev.length - 1];
+                    return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+                });
+            };
 
-            // 3. Add AI message
-            setMessages(prev => [...prev, {
-                role: "assistant",
-                content: aiResponse
-            }]);
+            const aiResponse = await api.streamChat(userMessage, currentBal, appendToLast);
+
+            // 3. Final AI message (full text from the "done" event)
+            setMessages(prev => [...prev.slice(0, -1), { role: "assistant", content: aiResponse }]);
 
         } catch (error) {
             console.error("Chat error:", error);
-            setMessages(prev => [...prev, {
-                role: "assistant",
-                content: "Uzr, tizimda xatolik yuz berdi. Iltimos keyinroq urinib ko'ring."
-            }]);
+            setMessages(prev => {
+                const last = prev[prev.length - 1];
+                // Drop the empty streaming placeholder, if any
+                const base = last.role === "assistant" && !last.content ? prev.slice(0, -1) : prev;
+                return [...base, {
+                    role: "assistant",
+                    content: "Uzr, tizimda xatolik yuz berdi. Iltimos keyinroq urinib ko'ring."
+                }];
+            });
         } finally {
             setLoading(false);
         }
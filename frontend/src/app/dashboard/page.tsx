@@ -81,51 +81,41 @@ function RecentTransactions({ limit = 5 }: { limit?: number }) {
     );
 }
 
+const FILTER_TYPES = ["last_7_days", "this_month", "last_month", "this_year"];
+
 export default function DashboardPage() {
     const { user, logout } = useAuth();
     const router = useRouter();
 
     // State
-    const [dashboardData, setDashboardData] = useState<DashboardData | null>(null);
+    const [dashboards, setDashboards] = useState<Record<string, DashboardData>>({});
     const [loading, setLoading] = useState(true);
     const [filterType, setFilterType] = useState("this_year"); // Default to 2026 support
     const [categories, setCategories] = useState<string[]>([]);
     const [selectedCategory, setSelectedCategory] = useState<string | null>(null);
 
-    // Fetch Filter Options (Categories)
-    useEffect(() => {
-        const fetchCategories = async () => {
-            try {
-                const options = await api.getFilterOptions();
-                if (options && options.categories) {
-                    setCategories(options.categories);
-                }
-            } catch (error) {
-                console.error("Categories fetch error:", error);
-            }
-        };
-
-        if (user) {
-            fetchCategories();
-        }
-    }, [user]);
+    const dashboardData = dashboards[filterType] || null;
 
-    // Fetch Dashboard Data
+    // Fetch all time ranges (and filter options) in one batch request;
+    // switching the time filter then needs no extra request
     useEffect(() => {
-        const fetchDashboardData = async () => {
+        const fetchDashboards = async () => {
             try {
                 setLoading(true);
-                // Construct query with category if selected
-                const query = new URLSearchParams({
-                    filter_type: filterType,
-                    ...(selectedCategory && selectedCategory !== "all" && { category: selectedCategory })
-                }).toString();
-
-                // Using generic get for flexibility as we updated api.ts but want to be sure
-                const response = await api.get<{ success: boolean, data: DashboardData }>(`/analytics/dashboard?${query}`);
+                const category = selectedCategory && selectedCategory !== "all" ? selectedCategory : undefined;
+                const response = await api.getDashboardBatch(
+                    FILTER_TYPES.map((type) => ({ filter_type: type, ...(category && { category }) }))
+                );
 
-                if (response.data.success) {
-                    setDashboardData(response.data.data);
+                if (response.success) {
+                    const byType: Record<string, DashboardData> = {};
+                    FILTER_TYPES.forEach((type, i) => {
+                        byType[type] = response.data[i];
+                    });
+                    setDashboards(byType);
+                }
+                if (response.filter_options && response.filter_options.categories) {
+                    setCategories(response.filter_options.categories);
                 }
             } catch (error) {
                 console.error("Dashboard data fetch error:", error);
@@ -135,9 +125,9 @@ export default function DashboardPage() {
         };
 
         if (user) {
-            fetchDashboardData();
+            fetchDashboards();
         }
-    }, [user, filterType, selectedCategory]);
+    }, [user, selectedCategory]);
 
     const handleLogout = () => {
         logout();
@@ -76,36 +76,57 @@ export function UploadZone() {
             }
 
             if (taskId) {
-                // 2. Poll Status
-                const interval = setInterval(async () => {
-                    try {
-                        const statusRes = await api.get(`/data/upload/status/${taskId}`);
-                        const data = statusRes.data;
-
-                        setProgress(data.progress || 0);
-                        setProcessMessage(data.message || "Jarayon ketmoqda...");
-
-                        if (data.status === "completed") {
-                            clearInterval(interval);
-                            setStatus({
-                                type: "success",
-                                message: data.message || "Muvaffaqiyatli yakunlandi!"
-                            });
-                            setFile(null);
-                            setIsUploading(false);
-                        } else if (data.status === "failed") {
-                            clearInterval(interval);
-                            setStatus({
-                                type: "error",
-                                message: data.error || "Xatolik yuz berdi"
-                            });
-                            setIsUploading(false);
+                // 2. Progress: server-sent events; stream uzilsa polling'ga o'tamiz
+                const handleStatus = (data: any) => {
+                    setProgress(data.progress || 0);
+                    setProcessMessage(data.message || "Jarayon ketmoqda...");
+
+                    if (data.status === "completed") {
+                        setStatus({
+                            type: "success",
+                            message: data.message || "Muvaffaqiyatli yakunlandi!"
+                        });
+                        setFile(null);
+                        setIsUploading(false);
+                        return true;
+                    } else if (data.status === "failed") {
+                        setStatus({
+                            type: "error",
+                            message: data.error || "Xatolik yuz berdi"
+                        });
+                        setIsUploading(false);
+                        return true;
+                    }
+                    return false;
+                };
+
+                const pollStatus = () => {
+                    const interval = setInterval(async () => {
+                        try {
+                            const statusRes = await api.get(`/data/upload/status/${taskId}`);
+                            if (handleStatus(statusRes.data)) {
+                                clearInterval(interval);
+                            }
+                        } catch (e) {
+                            console.error("Polling error", e);
+                            // Don't stop polling on single error, maybe network hiccup
                         }
-                    } catch (e) {
-                        console.error("Polling error", e);
-                        // Don't stop polling on single error, maybe network hiccup
+                    }, 1000);
+                };
+
+                const source = new EventSource(`/api/data/upload/stream/${taskId}`);
+                const onEvent = (event: MessageEvent) => {
+                    if (handleStatus(JSON.parse(event.data))) {
+                        source.close();
                     }
-                }, 1000);
+                };
+                source.addEventListener("progress", onEvent);
+                source.addEventListener("completed", onEvent);
+                source.addEventListener("failed", onEvent);
+                source.onerror = () => {
+                    source.close();
+                    pollStatus();
+                };
             }
 
         } catch (error: any) {
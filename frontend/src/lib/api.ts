@@ -121,6 +121,65 @@ class ApiService {
         return response.data;
     }
 
+    public async getDashboardBatch(filters: { filter_type: string, category?: string }[]): Promise<{ success: boolean, data: DashboardData[], filter_options: { categories: string[], min_amount: number, max_amount: number } | null }> {
+        const response = await this.client.post('/analytics/dashboard/batch', { filters });
+        return response.data;
+    }
+
+    // Chat javobini token-token olish (POST /chat/ask/stream, Server-Sent Events).
+    // EventSource faqat GET qiladi - shuning uchun fetch + ReadableStream.
+    public async streamChat(
+        message: string,
+        initialBalance: number,
+        onToken: (text: string) => void
+    ): Promise<string> {
+        const token = getCookie('access_token');
+        const response = await fetch('/api/chat/ask/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                ...(token && { Authorization: `Bearer ${token}` }),
+            },
+            body: JSON.stringify({ message, initial_balance: initialBalance }),
+        });
+        if (!response.ok || !response.body) {
+            throw new Error(`Chat stream error: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let fullText = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE xabarlari bo'sh qator bilan ajratiladi
+            let boundary = buffer.indexOf('\n\n');
+            while (boundary !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                boundary = buffer.indexOf('\n\n');
+
+                const event = frame.match(/^event: (.*)$/m)?.[1];
+                const data = frame.match(/^data: (.*)$/m)?.[1];
+                if (!event || !data) continue;
+
+                if (event === 'token') {
+                    const text = JSON.parse(data).text as string;
+                    fullText += text;
+                    onToken(text);
+                } else if (event === 'done') {
+                    fullText = JSON.parse(data).response ?? fullText;
+                }
+            }
+        }
+
+        return fullText;
+    }
+
     public async getTransactions(page: number = 1, limit: number = 50, search: string = ''): Promise<{ items: Transaction[], total: number }> {
         const response = await this.client.get(`/data/transactions?page=${page}&limit=${limit}&search=${search}`);
         return response.data;
@@ -1,15 +1,34 @@
-from app.infrastructure.db.database import Base, engine, SessionLocal
-from sqlalchemy import text
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+
+from app.infrastructure.db.database import SessionLocal
+
 
 def migrate():
-    # Oddiy migration: ustun qo'shish
+    # Alembic migratsiyalari (alembic/versions) - qayta ishga tushirish xavfsiz
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    command.upgrade(config, "head")
+    print("Migration successful: database is at alembic head")
+
+def backfill_daily_totals():
+    # daily_category_totals jadvalini tranzaksiyalardan to'liq qayta qurish (qo'lda: --rebuild-daily-totals)
+    from app.infrastructure.db.daily_totals import daily_totals
+
+    db = SessionLocal()
     try:
-        with engine.connect() as conn:
-            conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS business_type VARCHAR(100)"))
-            conn.commit()
-            print("Migration successful: business_type added")
+        daily_totals.rebuild(db)
+        db.commit()
+        print("Migration successful: daily_category_totals rebuilt")
     except Exception as e:
+        db.rollback()
         print(f"Migration error: {e}")
+    finally:
+        db.close()
 
 if __name__ == "__main__":
     migrate()
+    if "--rebuild-daily-totals" in sys.argv:
+        backfill_daily_totals()